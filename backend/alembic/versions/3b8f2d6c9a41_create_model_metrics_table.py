@@ -0,0 +1,55 @@
+"""create_model_metrics_table
+
+Revision ID: 3b8f2d6c9a41
+Revises: 97e98559e8b5
+Create Date: 2025-06-02 10:12:44.318907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8f2d6c9a41'
+down_revision: Union[str, None] = '97e98559e8b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('model_metrics',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('model_version', sa.String(), nullable=False),
+        sa.Column('parent_version', sa.String(), nullable=True),
+        sa.Column('training_mode', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('n_train_rows', sa.Integer(), nullable=True),
+        sa.Column('n_eval_rows', sa.Integer(), nullable=True),
+        sa.Column('positive_rate', sa.Float(), nullable=True),
+        sa.Column('auc', sa.Float(), nullable=True),
+        sa.Column('log_loss', sa.Float(), nullable=True),
+        sa.Column('brier_score', sa.Float(), nullable=True),
+        sa.Column('expected_calibration_error', sa.Float(), nullable=True),
+        sa.Column('calibration', sa.JSON(), nullable=True),
+        sa.Column('threshold', sa.Float(), nullable=True),
+        sa.Column('precision_at_threshold', sa.Float(), nullable=True),
+        sa.Column('recall_at_threshold', sa.Float(), nullable=True),
+        sa.Column('k', sa.Integer(), nullable=True),
+        sa.Column('precision_at_k', sa.Float(), nullable=True),
+        sa.Column('latency_p50_ms', sa.Float(), nullable=True),
+        sa.Column('latency_p95_ms', sa.Float(), nullable=True),
+        sa.Column('latency_p99_ms', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('id', name=op.f('pk_model_metrics'))
+    )
+    op.create_index(op.f('ix_model_metrics_id'), 'model_metrics', ['id'], unique=False)
+    op.create_index(op.f('ix_model_metrics_model_version'), 'model_metrics', ['model_version'], unique=True)
+    op.create_index(op.f('ix_model_metrics_created_at'), 'model_metrics', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_model_metrics_created_at'), table_name='model_metrics')
+    op.drop_index(op.f('ix_model_metrics_model_version'), table_name='model_metrics')
+    op.drop_index(op.f('ix_model_metrics_id'), table_name='model_metrics')
+    op.drop_table('model_metrics')
@@ -0,0 +1,30 @@
+"""add_decision_engine_columns
+
+Revision ID: 5d1e7a3c2b90
+Revises: 3b8f2d6c9a41
+Create Date: 2025-06-04 09:41:27.503112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e7a3c2b90'
+down_revision: Union[str, None] = '3b8f2d6c9a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('budget', sa.Float(), nullable=True))
+    op.add_column('bids', sa.Column('predicted_success_proba', sa.Float(), nullable=True))
+    op.add_column('autobid_settings', sa.Column('min_success_proba', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('autobid_settings', 'min_success_proba')
+    op.drop_column('bids', 'predicted_success_proba')
+    op.drop_column('jobs', 'budget')
@@ -0,0 +1,48 @@
+"""add_jobs_created_at_and_search
+
+Revision ID: 6e2a9c4d8b17
+Revises: 8c4b1f7e2d63
+Create Date: 2025-06-07 15:20:08.640512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.job import POSTGRES_SEARCH_DDL, SQLITE_SEARCH_DDL
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2a9c4d8b17'
+down_revision: Union[str, None] = '8c4b1f7e2d63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('created_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+    op.create_index('ix_jobs_created_at_id', 'jobs', ['created_at', 'id'], unique=False)
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for statement in POSTGRES_SEARCH_DDL:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        op.execute("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_jobs_search_vector")
+        op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('jobs_fts_ai', 'jobs_fts_ad', 'jobs_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS jobs_fts")
+
+    op.drop_index('ix_jobs_created_at_id', table_name='jobs')
+    op.drop_column('jobs', 'created_at')
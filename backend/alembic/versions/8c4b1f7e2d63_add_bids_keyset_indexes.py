@@ -0,0 +1,34 @@
+"""add_bids_keyset_indexes
+
+Revision ID: 8c4b1f7e2d63
+Revises: 5d1e7a3c2b90
+Create Date: 2025-06-06 11:02:45.118934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4b1f7e2d63'
+down_revision: Union[str, None] = '5d1e7a3c2b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # submitted_at is the keyset sort key; NULLs would fall out of every page
+    op.execute("UPDATE bids SET submitted_at = CURRENT_TIMESTAMP WHERE submitted_at IS NULL")
+    op.alter_column('bids', 'submitted_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index('ix_bids_submitted_at_id', 'bids', ['submitted_at', 'id'], unique=False)
+    op.create_index('ix_bids_profile_id_submitted_at_id', 'bids', ['profile_id', 'submitted_at', 'id'], unique=False)
+    op.create_index('ix_bids_status_submitted_at_id', 'bids', ['status', 'submitted_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bids_status_submitted_at_id', table_name='bids')
+    op.drop_index('ix_bids_profile_id_submitted_at_id', table_name='bids')
+    op.drop_index('ix_bids_submitted_at_id', table_name='bids')
+    op.alter_column('bids', 'submitted_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,50 @@
+"""add_autobid_log_analytics
+
+Revision ID: 9f3e5a1b7c24
+Revises: 6e2a9c4d8b17
+Create Date: 2025-06-09 10:14:52.771203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3e5a1b7c24'
+down_revision: Union[str, None] = '6e2a9c4d8b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE autobid_logs SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL")
+    op.alter_column('autobid_logs', 'created_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index(
+        'ix_autobid_logs_profile_id_created_at', 'autobid_logs', ['profile_id', 'created_at', 'id'],
+        unique=False, postgresql_include=['status', 'score'],
+    )
+    op.create_table(
+        'autobid_log_daily_rollups',
+        sa.Column('profile_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('score_bucket', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('profile_id', 'day', 'status', 'score_bucket'),
+    )
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('rollup_watermarks')
+    op.drop_table('autobid_log_daily_rollups')
+    op.drop_index('ix_autobid_logs_profile_id_created_at', table_name='autobid_logs')
+    op.alter_column('autobid_logs', 'created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,115 @@
+"""partition_autobid_logs_by_month
+
+Revision ID: b4d7e2f91a56
+Revises: 9f3e5a1b7c24
+Create Date: 2025-06-11 08:37:19.205846
+
+PostgreSQL only: rebuilds autobid_logs as a table partitioned by month on
+created_at, so retention can detach and drop whole months (see
+app/services/retention_service.py). Other databases keep the plain table and
+are trimmed by batch archive-and-delete instead.
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4d7e2f91a56'
+down_revision: Union[str, None] = '9f3e5a1b7c24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, profile_id, job_title, job_link, bid_text, status, score, error_message, created_at"
+MONTHS_AHEAD = 3
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE autobid_logs RENAME TO autobid_logs_unpartitioned")
+    op.execute("ALTER TABLE autobid_logs_unpartitioned RENAME CONSTRAINT autobid_logs_pkey TO autobid_logs_unpartitioned_pkey")
+    op.execute("ALTER INDEX ix_autobid_logs_id RENAME TO ix_autobid_logs_unpartitioned_id")
+    op.execute("ALTER INDEX ix_autobid_logs_profile_id_created_at RENAME TO ix_autobid_logs_unpartitioned_profile_id_created_at")
+    # The id sequence must outlive the old table
+    op.execute("ALTER SEQUENCE autobid_logs_id_seq OWNED BY NONE")
+
+    op.execute("""
+        CREATE TABLE autobid_logs (
+            id INTEGER NOT NULL DEFAULT nextval('autobid_logs_id_seq'),
+            profile_id VARCHAR NOT NULL REFERENCES profiles(id),
+            job_title VARCHAR NOT NULL,
+            job_link VARCHAR NOT NULL,
+            bid_text TEXT,
+            status VARCHAR,
+            score DOUBLE PRECISION,
+            error_message TEXT,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("ALTER SEQUENCE autobid_logs_id_seq OWNED BY autobid_logs.id")
+    op.execute("CREATE TABLE autobid_logs_default PARTITION OF autobid_logs DEFAULT")
+
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM autobid_logs_unpartitioned")).scalar()
+    today = date.today()
+    month = date(oldest.year, oldest.month, 1) if oldest else date(today.year, today.month, 1)
+    last = date(today.year, today.month, 1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE autobid_logs_p{month:%Y%m} PARTITION OF autobid_logs "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+
+    op.execute(
+        f"INSERT INTO autobid_logs ({COLUMNS}) "
+        f"SELECT id, profile_id::varchar, job_title, job_link, bid_text, status, score, error_message, created_at "
+        f"FROM autobid_logs_unpartitioned"
+    )
+    op.execute(
+        "CREATE INDEX ix_autobid_logs_profile_id_created_at ON autobid_logs "
+        "(profile_id, created_at, id) INCLUDE (status, score)"
+    )
+    op.execute("DROP TABLE autobid_logs_unpartitioned")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE autobid_logs RENAME TO autobid_logs_partitioned")
+    op.execute("ALTER INDEX ix_autobid_logs_profile_id_created_at RENAME TO ix_autobid_logs_partitioned_profile_id_created_at")
+    op.execute("ALTER SEQUENCE autobid_logs_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE autobid_logs (
+            id INTEGER NOT NULL DEFAULT nextval('autobid_logs_id_seq') PRIMARY KEY,
+            profile_id VARCHAR NOT NULL REFERENCES profiles(id),
+            job_title VARCHAR NOT NULL,
+            job_link VARCHAR NOT NULL,
+            bid_text TEXT,
+            status VARCHAR,
+            score DOUBLE PRECISION,
+            error_message TEXT,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+    """)
+    op.execute("ALTER SEQUENCE autobid_logs_id_seq OWNED BY autobid_logs.id")
+    op.execute(f"INSERT INTO autobid_logs ({COLUMNS}) SELECT {COLUMNS} FROM autobid_logs_partitioned")
+    op.execute("DROP TABLE autobid_logs_partitioned")  # drops its partitions too
+    op.create_index('ix_autobid_logs_id', 'autobid_logs', ['id'], unique=False)
+    op.create_index(
+        'ix_autobid_logs_profile_id_created_at', 'autobid_logs', ['profile_id', 'created_at', 'id'],
+        unique=False, postgresql_include=['status', 'score'],
+    )
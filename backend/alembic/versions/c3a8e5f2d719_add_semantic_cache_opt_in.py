@@ -0,0 +1,29 @@
+"""add_semantic_cache_opt_in
+
+Revision ID: c3a8e5f2d719
+Revises: b4d7e2f91a56
+Create Date: 2025-06-12 09:21:44.318072
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a8e5f2d719'
+down_revision: Union[str, None] = 'b4d7e2f91a56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'autobid_settings',
+        sa.Column('semantic_cache_enabled', sa.Boolean(), server_default=sa.false(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('autobid_settings', 'semantic_cache_enabled')
@@ -0,0 +1,34 @@
+"""create_seen_jobs_table
+
+Revision ID: d5f1a7c3e820
+Revises: c3a8e5f2d719
+Create Date: 2025-06-13 10:04:12.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5f1a7c3e820'
+down_revision: Union[str, None] = 'c3a8e5f2d719'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'seen_jobs',
+        sa.Column('job_id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('link', sa.String(), nullable=True),
+        sa.Column('profile_id', sa.String(), nullable=True),
+        sa.Column('first_seen_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('job_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('seen_jobs')
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.schemas.auth import RegisterInput, LoginInput
@@ -25,7 +25,7 @@ auth_scheme = HTTPBearer()
 )
 async def register_user(
     data: RegisterInput,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Регистрирует нового пользователя и возвращает схему UserOut.
@@ -39,7 +39,7 @@ async def register_user(
 )
 async def login_user(
     data: LoginInput,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Аутентифицирует пользователя и возвращает токен.
@@ -53,7 +53,7 @@ async def login_user(
 )
 async def verify_email(
     token: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Подтверждает email по токену и возвращает None.
@@ -67,7 +67,7 @@ async def verify_email(
 )
 async def read_current_user(
     payload: dict = Depends(get_current_user_with_role),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Возвращает данные текущего пользователя в схеме UserOut.
@@ -86,4 +86,4 @@ async def logout_user(
     """
     Инвалидация текущего токена, возвращает None.
     """
-    return await logout_user_service(credentials.credentials)
+    return logout_user_service(credentials.credentials)
@@ -1,15 +1,19 @@
 import os
-import asyncio
-import random
+from dataclasses import asdict
+from typing import List, Optional
 
-from playwright.async_api import async_playwright
-from app.services.captcha_service import solve_cloudflare
+from app.services.captcha_service import get_captcha_service
 from app.services.bid_generation_service import generate_bid_text_async
-from app.database import get_db
+from app.database import AsyncSessionLocal
 from app.services.autobid_log_service import log_autobid_attempt
 from app.services.score_helper import calculate_keyword_affinity_score
+from app.services.job_store import claim_unseen
+from app.browser.browser_pool import auth_state_path, browser_pool
+from app.browser.job_cards import CARD_LINK_SELECTOR, extract_job_cards
+from app.browser.pacing import PacingScheduler, Step
+from app.config import settings
 
-USER_DATA_DIR = "user_data"
+BIDS_PER_RUN = 1  # Откликов за один проход профиля; между ними - паузы PacingScheduler
 
 async def fill_rate_increase_fields(page):
     try:
@@ -24,102 +28,138 @@ async def fill_rate_increase_fields(page):
     except:
         pass
 
+def _wait_ms() -> int:
+    return settings.BROWSER_WAIT_TIMEOUT_SECONDS * 1000
+
+
 async def run_browser_bidder_for_profile(profile_id: str):
-    print(f"[▶️ START] Профиль {profile_id}")
-    profile_dir = os.path.join(USER_DATA_DIR, profile_id)
+    """Один профиль целиком (ручной запуск): шаги с паузами между ними."""
+    scheduler = PacingScheduler(concurrency=1)
+    schedule_profile_run(scheduler, profile_id)
+    await scheduler.run_until_idle()
 
-    if not os.path.exists(profile_dir):
-        print(f"[❌] user_data_dir не найден: {profile_dir}")
-        return
 
-    db = next(get_db())
+def schedule_profile_run(scheduler: PacingScheduler, profile_id: str) -> None:
+    scheduler.schedule(profile_id, lambda: _discover_jobs(profile_id))
+
+
+async def _discover_jobs(profile_id: str) -> Optional[Step]:
+    """Шаг 1: лента find-work -> новые вакансии. Возвращает шаг отклика на первую."""
+    print(f"[▶️ START] Профиль {profile_id}")
+    state_path = auth_state_path(profile_id)
 
-    async with async_playwright() as p:
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=profile_dir,
-            headless=False
-        )
+    if not os.path.exists(state_path):
+        print(f"[❌] Сохранённая сессия не найдена: {state_path} (см. app/auth/browser_login.py)")
+        return None
+
+    # Контекст из пула: браузер уже запущен, сессия профиля восстанавливается из storage_state
+    async with AsyncSessionLocal() as db, browser_pool.lease(profile_id) as context:
         page = await context.new_page()
         await page.goto("https://www.upwork.com/")
 
+        # Капча уходит решателю сразу; пока она решается, страница "живёт"
+        captcha = None
         if await page.locator('[data-sitekey]').count() > 0:
             sitekey = await page.get_attribute('[data-sitekey]', 'data-sitekey')
-            token = await solve_cloudflare("https://www.upwork.com/", sitekey)
-            await page.evaluate("""document.querySelector('textarea[name="g-recaptcha-response"]').value = arguments[0];""", token)
-            await page.reload()
-            await asyncio.sleep(5)
+            captcha = get_captcha_service().submit("https://www.upwork.com/", sitekey)
 
         await page.mouse.move(200, 300)
-        await asyncio.sleep(random.uniform(1, 2))
         await page.mouse.wheel(0, 1000)
-        await asyncio.sleep(1)
+
+        if captcha is not None:
+            token = await captcha
+            await page.evaluate(
+                """token => { document.querySelector('textarea[name="g-recaptcha-response"]').value = token; }""",
+                token,
+            )
+            await page.reload()
+            try:
+                await page.wait_for_selector('[data-sitekey]', state="detached", timeout=_wait_ms())
+            except Exception:
+                print("[⚠️] Капча не исчезла после перезагрузки")
 
         await page.goto("https://www.upwork.com/ab/find-work/")
-        job_cards = await page.locator(".job-tile-title a").all()
-        jobs = []
-        for job in job_cards:
-            title = await job.inner_text()
-            href = await job.get_attribute("href")
-            jobs.append({"title": title.strip(), "link": f"https://www.upwork.com{href}"})
+        try:
+            await page.wait_for_selector(CARD_LINK_SELECTOR, timeout=_wait_ms())
+        except Exception:
+            print(f"[⚠️] Карточки вакансий не появились за {settings.BROWSER_WAIT_TIMEOUT_SECONDS} с")
+        # Все карточки одним page.eval (см. app/browser/job_cards.py)
+        cards = [asdict(card) for card in await extract_job_cards(page)]
 
-        for job in jobs[:1]:
-            await page.goto(job["link"])
-            await asyncio.sleep(3)
+        # Уже виденные карточки пропускаем; записываем только те, на которые откликнемся
+        # (остальные новые останутся непросмотренными до следующего прохода)
+        jobs = await claim_unseen(db, cards, limit=BIDS_PER_RUN, profile_id=profile_id)
 
-            try:
-                await page.click("text=Submit a Proposal", timeout=5000)
-                await page.wait_for_load_state("networkidle")
-            except:
-                continue
+        screenshot_path = f"screenshots/{profile_id}_find_work.png"
+        os.makedirs("screenshots", exist_ok=True)
+        await page.screenshot(path=screenshot_path)
 
-            try:
-                desc_el = await page.locator("div[data-test='job-description']").first
-                description = await desc_el.inner_text()
-            except:
-                description = "Описание отсутствует"
+    return _bid_step(profile_id, jobs)
 
-            job_data = {
-                "title": job["title"],
-                "description": description.strip()
-            }
 
-            bid_text = await generate_bid_text_async(job_data, profile_id=profile_id, db=db)
-            await page.fill("textarea[name='coverLetter']", bid_text)
-            await fill_rate_increase_fields(page)
+def _bid_step(profile_id: str, jobs: List[dict]) -> Optional[Step]:
+    if not jobs:
+        return None
 
-            try:
-                await page.click("button:has-text('Submit Proposal')")
-                await asyncio.sleep(2)
-
-                score = calculate_keyword_affinity_score(
-                    db=db,
-                    profile_id=int(profile_id),
-                    job_description=description
-                )
-
-                log_autobid_attempt(
-                    db=db,
-                    profile_id=int(profile_id),
-                    job_title=job["title"],
-                    job_link=job["link"],
-                    bid_text=bid_text,
-                    status="success",
-                    score=score
-                )
-            except Exception as e:
-                log_autobid_attempt(
-                    db=db,
-                    profile_id=int(profile_id),
-                    job_title=job["title"],
-                    job_link=job["link"],
-                    bid_text=bid_text,
-                    status="failed",
-                    error_message=str(e)
-                )
-
-            await asyncio.sleep(3)
+    async def step() -> Optional[Step]:
+        await _bid_on_job(profile_id, jobs[0])
+        return _bid_step(profile_id, jobs[1:])
+    return step
 
-        screenshot_path = f"screenshots/{profile_id}_find_work.png"
-        os.makedirs("screenshots", exist_ok=True)
-        await page.screenshot(path=screenshot_path)
-        await context.close()
+
+async def _bid_on_job(profile_id: str, job: dict) -> None:
+    """Шаг 2..n: отклик на одну вакансию, в своём контексте из пула."""
+    async with AsyncSessionLocal() as db, browser_pool.lease(profile_id) as context:
+        page = await context.new_page()
+        await page.goto(job["link"], wait_until="domcontentloaded")
+
+        try:
+            await page.click("text=Submit a Proposal", timeout=_wait_ms())
+            await page.wait_for_load_state("networkidle", timeout=_wait_ms())
+        except Exception:
+            return
+
+        try:
+            desc_el = page.locator("div[data-test='job-description']").first
+            description = await desc_el.inner_text(timeout=_wait_ms())
+        except Exception:
+            description = "Описание отсутствует"
+
+        job_data = {
+            "title": job["title"],
+            "description": description.strip()
+        }
+
+        bid_text = await generate_bid_text_async(job_data, profile_id=profile_id, db=db)
+        await page.fill("textarea[name='coverLetter']", bid_text)
+        await fill_rate_increase_fields(page)
+
+        try:
+            await page.click("button:has-text('Submit Proposal')")
+            await page.wait_for_load_state("networkidle", timeout=_wait_ms())
+
+            score = await calculate_keyword_affinity_score(
+                db=db,
+                profile_id=profile_id,
+                job_description=description
+            )
+
+            await log_autobid_attempt(
+                db=db,
+                profile_id=profile_id,
+                job_title=job["title"],
+                job_link=job["link"],
+                bid_text=bid_text,
+                status="success",
+                score=score
+            )
+        except Exception as e:
+            await log_autobid_attempt(
+                db=db,
+                profile_id=profile_id,
+                job_title=job["title"],
+                job_link=job["link"],
+                bid_text=bid_text,
+                status="failed",
+                error_message=str(e)
+            )
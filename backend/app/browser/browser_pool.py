@@ -0,0 +1,184 @@
+"""
+One warm Chromium per process, leased out as isolated per-profile contexts.
+
+Launching a browser takes seconds; opening a context in a running one takes
+milliseconds. browser_pool.lease(profile_id) gives a fresh BrowserContext
+restored from the profile's saved session (auth_states/<profile_id>_auth.json,
+written by app/auth/browser_login.py). The refreshed session is saved back
+and the context is closed when the lease ends.
+
+* At most BROWSER_POOL_MAX_CONTEXTS leases are open at once; more wait.
+* Health check on every lease: a disconnected browser is relaunched.
+* Recycling: after BROWSER_RECYCLE_AFTER_PAGES pages the browser is retired.
+  New leases get a new browser and the old one closes once its last lease ends,
+  so long-running workers don't accumulate Chromium's leaked memory.
+* Headless unless BROWSER_HEADLESS is off (useful to watch a run locally).
+* Heavy and third-party resources are blocked in every context while
+  BROWSER_BLOCK_RESOURCES is on (app/browser/resource_blocker.py).
+"""
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from app.browser.resource_blocker import ResourceBlocker, blocking_stats
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_ARGS = ["--no-sandbox", "--disable-blink-features=AutomationControlled"]
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1280, "height": 800},
+    "user_agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
+    ),
+    "extra_http_headers": {"Accept-Language": "en-US,en;q=0.9"},
+}
+
+
+def auth_state_path(profile_id: str) -> str:
+    return os.path.join(settings.BROWSER_AUTH_STATE_DIR, f"{profile_id}_auth.json")
+
+
+class _BrowserSlot:
+    """A launched browser and what has been done with it."""
+
+    def __init__(self, browser: Any, generation: int):
+        self.browser = browser
+        self.generation = generation
+        self.pages = 0
+        self.leases = 0
+        self.retired = False
+
+
+class BrowserPool:
+    def __init__(
+        self,
+        headless: Optional[bool] = None,
+        max_contexts: Optional[int] = None,
+        recycle_after_pages: Optional[int] = None,
+        launcher: Optional[Callable[[], Awaitable[Any]]] = None,
+        resource_blocker: Optional[ResourceBlocker] = None,
+    ):
+        self.headless = settings.BROWSER_HEADLESS if headless is None else headless
+        self.max_contexts = max_contexts or settings.BROWSER_POOL_MAX_CONTEXTS
+        self.recycle_after_pages = recycle_after_pages or settings.BROWSER_RECYCLE_AFTER_PAGES
+        self._launcher = launcher or self._launch_chromium
+        if resource_blocker is None and settings.BROWSER_BLOCK_RESOURCES:
+            resource_blocker = ResourceBlocker()
+        self.resource_blocker = resource_blocker
+        self._playwright = None
+        self._current: Optional[_BrowserSlot] = None
+        self._generations = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def _launch_chromium(self) -> Any:
+        if self._playwright is None:
+            try:
+                from playwright.async_api import async_playwright
+            except ImportError as e:
+                raise RuntimeError("The browser pool requires playwright; install it and run `playwright install chromium`") from e
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=self.headless, args=LAUNCH_ARGS)
+
+    def _primitives(self):
+        # Created on first use so the pool can be built at import time, outside any event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_contexts)
+        return self._lock, self._slots
+
+    def _healthy(self, slot: Optional[_BrowserSlot]) -> bool:
+        return slot is not None and not slot.retired and slot.browser.is_connected()
+
+    async def _browser(self) -> _BrowserSlot:
+        lock, _ = self._primitives()
+        async with lock:
+            slot = self._current
+            if slot is not None and slot.pages >= self.recycle_after_pages:
+                logger.info(f"Recycling browser #{slot.generation} after {slot.pages} pages.")
+                await self._retire(slot)
+            elif slot is not None and not self._healthy(slot):
+                logger.warning(f"Browser #{slot.generation} is disconnected; relaunching.")
+                await self._retire(slot)
+            if not self._healthy(self._current):
+                self._generations += 1
+                self._current = _BrowserSlot(await self._launcher(), self._generations)
+                logger.info(f"Launched browser #{self._generations} (headless={self.headless}).")
+            return self._current
+
+    async def _retire(self, slot: _BrowserSlot) -> None:
+        slot.retired = True
+        if self._current is slot:
+            self._current = None
+        if slot.leases == 0:
+            await self._close_browser(slot)
+
+    async def _close_browser(self, slot: _BrowserSlot) -> None:
+        try:
+            await slot.browser.close()
+        except Exception as e:
+            logger.warning(f"Closing browser #{slot.generation} failed: {e}")
+
+    async def start(self) -> None:
+        """Launches the browser ahead of the first lease."""
+        await self._browser()
+
+    @asynccontextmanager
+    async def lease(self, profile_id: str, save_state: bool = True) -> AsyncIterator[Any]:
+        """
+        A new context for the profile, with its saved session if there is one.
+        Its refreshed session is saved back (save_state) and it is closed on exit.
+        """
+        _, slots = self._primitives()
+        async with slots:
+            slot = await self._browser()
+            slot.leases += 1
+            state_path = auth_state_path(profile_id)
+            has_state = os.path.exists(state_path)
+            try:
+                context = await slot.browser.new_context(
+                    storage_state=state_path if has_state else None, **CONTEXT_OPTIONS
+                )
+                context.on("page", lambda page: self._count_page(slot))
+                try:
+                    if self.resource_blocker is not None:
+                        await self.resource_blocker.attach(context)
+                    yield context
+                    if save_state and has_state:
+                        await context.storage_state(path=state_path)
+                finally:
+                    await context.close()
+            finally:
+                slot.leases -= 1
+                if slot.retired and slot.leases == 0:
+                    await self._close_browser(slot)
+
+    def _count_page(self, slot: _BrowserSlot) -> None:
+        slot.pages += 1
+
+    def status(self) -> Dict[str, Any]:
+        slot = self._current
+        return {
+            "healthy": self._healthy(slot),
+            "generation": slot.generation if slot else None,
+            "pages": slot.pages if slot else 0,
+            "leases": slot.leases if slot else 0,
+            "headless": self.headless,
+            "resources": blocking_stats.snapshot(),
+        }
+
+    async def close(self) -> None:
+        lock, _ = self._primitives()
+        async with lock:
+            if self._current is not None:
+                await self._retire(self._current)
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+browser_pool = BrowserPool()
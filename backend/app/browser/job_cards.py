@@ -0,0 +1,146 @@
+"""
+Job cards of a find-work feed, read in one round trip to the browser.
+
+Reading every field through its own locator costs one IPC call per field per
+card. extract_job_cards() instead runs a single eval_on_selector_all over the
+card links: the script walks up to each link's card and collects every field
+of CARD_SCHEMA in the page, then returns plain records.
+
+The schema is validated on the way back. If the feed has cards but a required
+field matched nothing in any of them, the markup has changed: CardSchemaError
+names the field and the selectors that were tried. Optional fields that go
+missing everywhere are logged once per page.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://www.upwork.com"
+CARD_LINK_SELECTOR = ".job-tile-title a"
+CARD_ROOT_SELECTOR = "article, section, [data-test*='job-tile' i]"
+
+# field -> (selectors tried in order inside the card, attribute or None for text, required)
+CARD_SCHEMA: Dict[str, Dict[str, Any]] = {
+    "budget": {
+        "selectors": ["[data-test='budget']", "[data-test='is-fixed-price']", "[data-test='job-type-label']"],
+        "attribute": None,
+        "required": False,
+    },
+    "posted": {
+        "selectors": ["time[datetime]", "[data-test='job-pubilshed-date']", "[data-test='posted-on']"],
+        "attribute": "datetime",  # falls back to the text ("Posted 5 minutes ago")
+        "required": False,
+    },
+}
+
+_EXTRACT_SCRIPT = """
+(links, [rootSelector, schema]) => links.map(link => {
+  const card = link.closest(rootSelector) || link.parentElement;
+  const record = {title: (link.innerText || '').trim(), href: link.getAttribute('href')};
+  for (const [field, spec] of Object.entries(schema)) {
+    record[field] = null;
+    for (const selector of spec.selectors) {
+      const el = card && card.querySelector(selector);
+      if (!el) continue;
+      const value = (spec.attribute && el.getAttribute(spec.attribute)) || (el.innerText || '').trim();
+      if (value) { record[field] = value; break; }
+    }
+  }
+  return record;
+})
+"""
+
+
+class CardSchemaError(Exception):
+    """The feed's markup no longer matches the card schema."""
+
+
+@dataclass(frozen=True)
+class JobCard:
+    id: str
+    title: str
+    link: str
+    budget: Optional[float] = None  # fixed price, or the top of an hourly range
+    budget_text: Optional[str] = None
+    posted_at: Optional[datetime] = None
+    posted_text: Optional[str] = None
+
+
+_AMOUNT = re.compile(r"\$\s*([\d,]+(?:\.\d+)?)")
+_RELATIVE = re.compile(r"(\d+|an?|one)\s+(second|minute|hour|day|week|month)s?\s+ago", re.IGNORECASE)
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400, "month": 30 * 86400}
+
+
+def parse_budget(text: Optional[str]) -> Optional[float]:
+    amounts = [float(a.replace(",", "")) for a in _AMOUNT.findall(text or "")]
+    return max(amounts) if amounts else None
+
+
+def parse_posted(text: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    """ISO timestamps (time[datetime]) or relative feed text, as naive UTC."""
+    if not text:
+        return None
+    now = now or datetime.utcnow()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        return parsed.replace(tzinfo=None) - (parsed.utcoffset() or timedelta())
+    except ValueError:
+        pass
+    if "yesterday" in text.lower():
+        return now - timedelta(days=1)
+    if "just now" in text.lower():
+        return now
+    match = _RELATIVE.search(text)
+    if not match:
+        return None
+    count = 1 if match.group(1).lower() in ("a", "an", "one") else int(match.group(1))
+    return now - timedelta(seconds=count * _UNIT_SECONDS[match.group(2).lower()])
+
+
+def job_id_from_href(href: str) -> str:
+    return href.strip().split("?")[0].rstrip("/").split("/")[-1]
+
+
+def parse_cards(records: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[JobCard]:
+    """Validates the raw records of one page against the schema and builds the cards."""
+    if not records:
+        return []
+    for field, name in (("href", "link href"), ("title", "title")):
+        if not any(record.get(field) for record in records):
+            raise CardSchemaError(
+                f"{len(records)} cards matched {CARD_LINK_SELECTOR!r} but none had a {name}; the feed markup changed"
+            )
+    for field, spec in CARD_SCHEMA.items():
+        if all(record.get(field) is None for record in records):
+            if spec["required"]:
+                raise CardSchemaError(
+                    f"No card had a {field!r}: none of {spec['selectors']} matched inside {CARD_ROOT_SELECTOR!r}"
+                )
+            logger.warning(f"No job card had a {field!r} ({spec['selectors']}); the feed markup may have changed.")
+
+    cards = []
+    for record in records:
+        href, title = record.get("href"), record.get("title")
+        if not href or not title:
+            logger.warning(f"Skipping a job card without link or title: {record}")
+            continue
+        cards.append(JobCard(
+            id=job_id_from_href(href),
+            title=title,
+            link=href if href.startswith("http") else f"{BASE_URL}{href}",
+            budget=parse_budget(record.get("budget")),
+            budget_text=record.get("budget"),
+            posted_at=parse_posted(record.get("posted"), now),
+            posted_text=record.get("posted"),
+        ))
+    return cards
+
+
+async def extract_job_cards(page: Any) -> List[JobCard]:
+    """Every job card on the page, in one browser round trip."""
+    records = await page.eval_on_selector_all(CARD_LINK_SELECTOR, _EXTRACT_SCRIPT, [CARD_ROOT_SELECTOR, CARD_SCHEMA])
+    return parse_cards(records)
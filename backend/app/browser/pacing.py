@@ -0,0 +1,103 @@
+"""
+Human-like pacing between browser sessions, without holding a browser.
+
+A profile's run is a chain of steps: one async callable per browser session
+(discover jobs, bid on one job, ...). A step leases its own context from the
+pool (app/browser/browser_pool.py) and returns the next step, or None when the
+run is over. The scheduler then waits a random BROWSER_PACING_MIN_SECONDS to
+BROWSER_PACING_MAX_SECONDS before running it. While a profile waits it holds
+no context and no worker, so one host fills those gaps with other profiles'
+steps. ``concurrency`` bounds the steps running at once.
+
+    scheduler = PacingScheduler(concurrency=4)
+    scheduler.schedule(profile_id, first_step)
+    await scheduler.run_until_idle()
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Set
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Step = Callable[[], Awaitable[Optional["Step"]]]
+
+
+@dataclass(order=True)
+class _Due:
+    at: float
+    seq: int
+    profile_id: str = field(compare=False)
+    step: Step = field(compare=False)
+
+
+class PacingScheduler:
+    def __init__(
+        self,
+        concurrency: int = 1,
+        min_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.concurrency = concurrency
+        self.min_delay = settings.BROWSER_PACING_MIN_SECONDS if min_delay is None else min_delay
+        self.max_delay = settings.BROWSER_PACING_MAX_SECONDS if max_delay is None else max_delay
+        self._rng = rng or random.Random()
+        self._heap: List[_Due] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def next_delay(self) -> float:
+        return self._rng.uniform(self.min_delay, self.max_delay)
+
+    def schedule(self, profile_id: str, step: Step, delay: float = 0.0) -> None:
+        at = asyncio.get_running_loop().time() + delay if self._wakeup is not None else delay
+        heapq.heappush(self._heap, _Due(at, next(self._seq), profile_id, step))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    async def _run(self, due: _Due) -> None:
+        try:
+            next_step = await due.step()
+        except Exception as e:
+            logger.error(f"[PACING] Step for profile {due.profile_id} failed; its run ends here: {e}", exc_info=True)
+            return
+        if next_step is not None:
+            delay = self.next_delay()
+            logger.info(f"[PACING] Profile {due.profile_id} resumes in {delay:.0f}s.")
+            self.schedule(due.profile_id, next_step, delay)
+
+    async def run_until_idle(self) -> None:
+        """Runs due steps until no step is running or scheduled."""
+        loop = asyncio.get_running_loop()
+        # Steps scheduled before the loop started carry relative delays
+        self._heap = [_Due(loop.time() + d.at, d.seq, d.profile_id, d.step) for d in self._heap]
+        heapq.heapify(self._heap)
+        self._wakeup = asyncio.Event()
+        running: Set[asyncio.Task] = set()
+        try:
+            while self._heap or running:
+                now = loop.time()
+                while self._heap and self._heap[0].at <= now and len(running) < self.concurrency:
+                    running.add(asyncio.create_task(self._run(heapq.heappop(self._heap))))
+
+                timeout = None
+                if self._heap and len(running) < self.concurrency:
+                    timeout = max(0.0, self._heap[0].at - now)
+                self._wakeup.clear()
+                wakeup = asyncio.create_task(self._wakeup.wait())
+                done, _ = await asyncio.wait(running | {wakeup}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                wakeup.cancel()
+                running -= done
+        finally:
+            for task in running:
+                task.cancel()
+            self._wakeup = None
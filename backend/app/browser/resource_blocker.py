@@ -0,0 +1,122 @@
+"""
+Request interception that keeps heavy and third-party resources out of scraping.
+
+ResourceBlocker.attach(context) routes every request of a browser context
+through one handler. The rules apply in order:
+
+1. documents (page navigations) always load;
+2. a host in ``allowed_domains`` (or a subdomain of one) loads;
+3. a host in ``blocked_domains`` is aborted (analytics, ads, session replay);
+4. a resource type in ``blocked_types`` is aborted (images, fonts, media);
+5. everything else loads.
+
+The pool (app/browser/browser_pool.py) attaches one to every leased context
+when BROWSER_BLOCK_RESOURCES is on. Lists default to the BROWSER_* settings.
+
+Metrics go to the module-level ``blocking_stats``, shared by every context
+in the process: requests seen and blocked (by type), an estimate of the bytes
+saved, and page-load times (main-frame navigation to the load event). Aborted
+requests never report their size, so bytes saved are estimated from typical
+sizes per resource type (TYPICAL_BYTES).
+"""
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TYPICAL_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 80_000,
+}
+OTHER_TYPICAL_BYTES = 10_000
+
+
+def _domain_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in domains)
+
+
+class ResourceStats:
+    def __init__(self):
+        self.requests = 0
+        self.blocked: Counter = Counter()
+        self.bytes_saved = 0
+        self.page_loads = 0
+        self.page_load_seconds = 0.0
+
+    def record_load(self, seconds: float) -> None:
+        self.page_loads += 1
+        self.page_load_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "blocked": sum(self.blocked.values()),
+            "blocked_by_type": dict(self.blocked),
+            "estimated_bytes_saved": self.bytes_saved,
+            "page_loads": self.page_loads,
+            "avg_page_load_seconds": round(self.page_load_seconds / self.page_loads, 3) if self.page_loads else None,
+        }
+
+
+blocking_stats = ResourceStats()
+
+
+class ResourceBlocker:
+    def __init__(
+        self,
+        blocked_types: Optional[Iterable[str]] = None,
+        blocked_domains: Optional[Iterable[str]] = None,
+        allowed_domains: Optional[Iterable[str]] = None,
+        stats: Optional[ResourceStats] = None,
+    ):
+        self.blocked_types = frozenset(settings.BROWSER_BLOCKED_RESOURCE_TYPES if blocked_types is None else blocked_types)
+        self.blocked_domains = tuple(settings.BROWSER_BLOCKED_DOMAINS if blocked_domains is None else blocked_domains)
+        self.allowed_domains = tuple(settings.BROWSER_ALLOWED_DOMAINS if allowed_domains is None else allowed_domains)
+        self.stats = stats or blocking_stats
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type == "document":
+            return False
+        host = (urlsplit(url).hostname or "").lower()
+        if _domain_matches(host, self.allowed_domains):
+            return False
+        if _domain_matches(host, self.blocked_domains):
+            return True
+        return resource_type in self.blocked_types
+
+    async def attach(self, context: Any) -> None:
+        await context.route("**/*", self._handle)
+        context.on("page", self._watch_page)
+
+    async def _handle(self, route: Any) -> None:
+        request = route.request
+        self.stats.requests += 1
+        if self.should_block(request.resource_type, request.url):
+            self.stats.blocked[request.resource_type] += 1
+            self.stats.bytes_saved += TYPICAL_BYTES.get(request.resource_type, OTHER_TYPICAL_BYTES)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def _watch_page(self, page: Any) -> None:
+        started: Dict[str, float] = {}
+
+        def on_request(request: Any) -> None:
+            if request.is_navigation_request() and request.frame == page.main_frame:
+                started["at"] = time.monotonic()
+
+        def on_load(*_: Any) -> None:
+            at = started.pop("at", None)
+            if at is not None:
+                self.stats.record_load(time.monotonic() - at)
+
+        page.on("request", on_request)
+        page.on("load", on_load)
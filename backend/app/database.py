@@ -1,12 +1,117 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.config import settings
 
-# Асинхронный движок
-engine = create_async_engine(
-    settings.DATABASE_URL
-    # echo=True, # Removed echo=True as per example's implication
-)
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Checkout wait times and connection churn of the application pool."""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.connections_created = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def observe_connect(self) -> None:
+        with self._lock:
+            self.connections_created += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = list(self._waits)
+            data = {
+                "checkouts": self.checkouts,
+                "connections_created": self.connections_created,
+                "wait_ms_total": self.wait_seconds_total * 1000.0,
+                "wait_ms_max": self.wait_seconds_max * 1000.0,
+            }
+        if waits:
+            p50, p95, p99 = np.percentile(waits, [50, 95, 99]) * 1000.0
+            data.update(wait_ms_p50=float(p50), wait_ms_p95=float(p95), wait_ms_p99=float(p99))
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_metrics.observe_wait(time.perf_counter() - start)
+
+
+def _engine_options(database_url: str) -> Dict[str, Any]:
+    url = make_url(database_url)
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return options  # in-memory SQLite keeps its single-connection StaticPool
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if url.get_backend_name() == "postgresql" and settings.DB_STATEMENT_TIMEOUT_MS:
+        # Enforced by the server for every statement on every pooled connection
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)},
+        }
+    return options
+
+
+# Асинхронный движок: единственный на процесс, все модули используют его
+engine = create_async_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.observe_connect()
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """Current pool occupancy plus the cumulative checkout metrics."""
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            pool_size=pool.size(),
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+        )
+    status.update(pool_metrics.snapshot())
+    return status
+
 
 # Фабрика сессий
 AsyncSessionLocal = sessionmaker(
@@ -22,3 +127,24 @@ Base = declarative_base()
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+T = TypeVar("T")
+
+
+def run_job_with_session(func: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """
+    Runs ``func(session)`` to completion from a synchronous APScheduler job.
+    Scheduler threads have no event loop, and the shared engine's pooled
+    connections belong to the API's loop, so the job gets a private NullPool
+    engine that is disposed afterwards.
+    """
+    async def _main() -> T:
+        job_engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+        try:
+            async with AsyncSession(job_engine, expire_on_commit=False) as session:
+                return await func(session)
+        finally:
+            await job_engine.dispose()
+
+    return asyncio.run(_main())
@@ -1,4 +1,4 @@
+# Kept for older imports: all models share the declarative Base from app.database.
+from app.database import Base
 
-from sqlalchemy.orm import declarative_base
-
-Base = declarative_base()
\ No newline at end of file
+__all__ = ["Base"]
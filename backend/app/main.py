@@ -6,7 +6,7 @@ from slowapi import Limiter, _rate_limit_exceeded_handler # Add slowapi imports
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from app.database import engine, Base
+from app.database import engine, Base, AsyncSessionLocal
 from app.config import settings # Import settings
 from app.limiter import limiter # Import limiter
 
@@ -18,11 +18,15 @@ from app.routers.user.user_roles_routes           import router as user_roles_ro
 from app.routers.profiles.agency_routes           import router as agency_profiles_router
 from app.routers.bids.bids_routes                 import router as bids_router
 from app.routers.ml.ml_routes                     import router as ml_router
+from app.routers.ml.ml_routes                     import internal_router as ml_internal_router
 from app.routers.templates.shared_templates_routes import router as shared_templates_router
 from app.routers.autobidder.autobidder_routes     import router as autobidder_router
 from app.routers.autobidder.logs                  import router as autobid_logs_router
+from app.routers.autobidder.drafts                import router as autobid_drafts_router
+from app.routers.autobidder.settings              import router as autobid_settings_router
 from app.routers.ai.prompts                       import router as ai_prompts_router
 from app.routers.jobs_routes                      import router as jobs_router # Added jobs_router
+from app.routers.metrics_routes                   import router as metrics_router
 from app.routers import websockets as ws_router # Import WebSocket router
 
 app = FastAPI(debug=settings.APP_DEBUG) # Use settings
@@ -43,18 +47,27 @@ app.add_middleware(
 from app.services.ml_service import load_model_on_startup # Added ML model loading
 
 from app.scheduler.scheduler import start_scheduler, shutdown_scheduler # Added scheduler imports
+from app.redis_cache import redis_cache_client
+from app.tiered_cache import start_invalidation_listener, stop_invalidation_listener
+from app.services.job_store import load_seen_jobs
 
 # Создаём таблицы при старте (асинхронный Engine поддерживает async with)
 @app.on_event("startup")
 async def on_startup():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        await load_seen_jobs(db) # Bloom filter of scraped job ids
     load_model_on_startup() # Load ML model
+    await redis_cache_client.connect()
+    start_invalidation_listener()
     start_scheduler() # Start scheduler
 
 @app.on_event("shutdown")
 async def on_shutdown():
     shutdown_scheduler() # Shutdown scheduler
+    await stop_invalidation_listener()
+    await redis_cache_client.close()
 
 # Подключаем роутеры
 app.include_router(auth_router,             prefix="/auth",            tags=["Auth"])
@@ -64,12 +77,16 @@ app.include_router(profile_settings_router, prefix="/profile-settings", tags=["P
 app.include_router(user_roles_router,       prefix="/roles",           tags=["User Roles"])
 app.include_router(agency_profiles_router,  prefix="/agency-profiles", tags=["Agency Profiles"])
 app.include_router(bids_router,             prefix="/bids",            tags=["Bids"])
-app.include_router(ml_router,               prefix="/ml",              tags=["ML / Recommendations"])
+app.include_router(ml_router,                                          tags=["ML / Recommendations"]) # router already has the /ml prefix
+app.include_router(ml_internal_router) # /ml/internal/reload_model, called by the training runner
 app.include_router(shared_templates_router, prefix="/templates",       tags=["Shared Templates"])
 app.include_router(autobidder_router,       prefix="/autobidder",      tags=["Autobidder"])
 app.include_router(autobid_logs_router,     prefix="/autobidder/logs", tags=["Autobidder Logs"])
+app.include_router(autobid_drafts_router,   prefix="/autobidder",      tags=["Autobidder"])
+app.include_router(autobid_settings_router, prefix="/autobidder",      tags=["Autobidder"])
 app.include_router(ai_prompts_router,       prefix="/ai",              tags=["AI Prompts"])
 app.include_router(jobs_router,             prefix="/jobs",            tags=["Jobs"]) # Added jobs_router
+app.include_router(metrics_router,          prefix="/metrics",         tags=["Metrics"])
 app.include_router(ws_router.router,        prefix="/ws",              tags=["WebSockets"]) # Include WebSocket router
 
 # Лог всех маршрутов
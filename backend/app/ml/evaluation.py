@@ -0,0 +1,116 @@
+"""
+Offline evaluation of a trained success-probability model.
+
+evaluate_model() scores the trainer's holdout once and returns a flat dict that
+maps 1:1 onto the model_metrics table, so /ml/metrics never recomputes anything:
+
+* ranking:      ROC AUC
+* probability:  log loss, Brier score, 10-bin reliability table and ECE
+* decision:     precision/recall at the operating threshold, and precision@k
+                over candidates that clear the threshold (what the autobidder
+                actually bids on with a daily limit of k)
+* serving:      p50/p95/p99 latency of single-row predict_proba, the same call
+                path ml_service uses per request
+"""
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import brier_score_loss, log_loss, roc_auc_score
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CALIBRATION_BINS = 10
+
+
+def calibration_table(y_true: np.ndarray, y_score: np.ndarray, n_bins: int = CALIBRATION_BINS) -> List[Dict[str, Any]]:
+    bins = np.minimum((y_score * n_bins).astype(int), n_bins - 1)
+    table = []
+    for b in range(n_bins):
+        in_bin = bins == b
+        count = int(in_bin.sum())
+        table.append({
+            "lower": b / n_bins,
+            "upper": (b + 1) / n_bins,
+            "count": count,
+            "mean_predicted": float(y_score[in_bin].mean()) if count else None,
+            "fraction_positive": float(y_true[in_bin].mean()) if count else None,
+        })
+    return table
+
+
+def evaluate_predictions(
+    y_true: np.ndarray, y_score: np.ndarray, threshold: float, k: int
+) -> Dict[str, Any]:
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    n = len(y_true)
+    both_classes = 0 < y_true.sum() < n
+
+    selected = y_score >= threshold
+    n_selected = int(selected.sum())
+    true_positives = int((selected & (y_true == 1)).sum())
+
+    # Top-k among candidates that clear the threshold
+    above = np.flatnonzero(selected)
+    top_k = above[np.argsort(-y_score[above], kind="stable")[:k]]
+
+    calibration = calibration_table(y_true, y_score)
+    ece = sum(
+        row["count"] / n * abs(row["mean_predicted"] - row["fraction_positive"])
+        for row in calibration if row["count"]
+    )
+
+    return {
+        "n_eval_rows": n,
+        "positive_rate": float(y_true.mean()) if n else None,
+        "auc": float(roc_auc_score(y_true, y_score)) if both_classes else None,
+        "log_loss": float(log_loss(y_true, y_score, labels=[0, 1])) if n else None,
+        "brier_score": float(brier_score_loss(y_true, y_score)) if n else None,
+        "expected_calibration_error": float(ece),
+        "calibration": calibration,
+        "threshold": float(threshold),
+        "precision_at_threshold": true_positives / n_selected if n_selected else None,
+        "recall_at_threshold": true_positives / int(y_true.sum()) if y_true.sum() else None,
+        "k": int(k),
+        "precision_at_k": float(y_true[top_k].mean()) if len(top_k) else None,
+    }
+
+
+def measure_latency(model: Any, X: np.ndarray, feature_names: List[str], n_samples: int) -> Dict[str, Optional[float]]:
+    """Times single-row predict_proba calls on DataFrames, as served by the API."""
+    if len(X) == 0 or n_samples <= 0:
+        return {"latency_p50_ms": None, "latency_p95_ms": None, "latency_p99_ms": None}
+    rows = np.resize(np.arange(len(X)), n_samples)
+    timings = []
+    for i in rows:
+        frame = pd.DataFrame(np.asarray(X[i:i + 1]), columns=feature_names)
+        start = time.perf_counter()
+        model.predict_proba(frame)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {"latency_p50_ms": float(p50), "latency_p95_ms": float(p95), "latency_p99_ms": float(p99)}
+
+
+def evaluate_model(
+    model: Any,
+    X: np.ndarray,
+    y: np.ndarray,
+    threshold: Optional[float] = None,
+    k: Optional[int] = None,
+) -> Dict[str, Any]:
+    threshold = settings.ML_PROBABILITY_THRESHOLD if threshold is None else threshold
+    k = k or settings.ML_EVAL_PRECISION_AT_K
+    feature_names = list(model.feature_names_in_)
+    y_score = model.predict_proba(pd.DataFrame(np.asarray(X), columns=feature_names))[:, 1]
+    metrics = evaluate_predictions(y, y_score, threshold, k)
+    metrics.update(measure_latency(model, X, feature_names, settings.ML_EVAL_LATENCY_SAMPLES))
+    logger.info(
+        f"Evaluation on {metrics['n_eval_rows']} rows: auc={metrics['auc']}, log_loss={metrics['log_loss']}, "
+        f"precision@{k}={metrics['precision_at_k']}, p95={metrics['latency_p95_ms']}ms"
+    )
+    return metrics
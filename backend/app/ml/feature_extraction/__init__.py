@@ -0,0 +1,91 @@
+"""
+Feature extraction shared by the training-data assembler and the autobidder.
+
+Both sides must produce exactly the same feature names, otherwise the model
+silently imputes zeros at prediction time. The canonical column order lives in
+FEATURE_NAMES; the helpers below return plain dicts keyed without the
+``profile_`` / ``hist_`` / ``bid_temp_`` prefixes, matching the way
+autobidder_service assembles prediction input.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+EMBEDDING_DIM = 1536  # text-embedding-ada-002 / text-embedding-3-small
+
+EXPERIENCE_LEVELS = {
+    "entry": 1,
+    "intermediate": 2,
+    "expert": 3,
+}
+
+PROFILE_FEATURE_KEYS = ["num_skills", "experience_level"]
+
+HISTORICAL_STAT_FIELDS = [
+    "success_rate_7d", "success_rate_30d", "success_rate_90d",
+    "bid_frequency_7d", "bid_frequency_30d", "bid_frequency_90d",
+]
+
+SUBMISSION_TIME_KEYS = ["hour", "day_of_week", "is_weekend"]
+
+BID_SETTINGS_KEYS = ["budget", "duration_weeks", "is_fixed_price"]
+
+
+def generate_profile_features(profile: Any) -> Dict[str, Any]:
+    """Static profile features. Unknown experience levels map to 0."""
+    skills = getattr(profile, "skills", None) or []
+    level = (getattr(profile, "experience_level", None) or "").strip().lower()
+    return {
+        "num_skills": float(len(skills)),
+        "experience_level": float(EXPERIENCE_LEVELS.get(level, 0)),
+    }
+
+
+def featurize_submission_time(dt: Optional[datetime]) -> Dict[str, Any]:
+    if dt is None:
+        return {key: -1.0 for key in SUBMISSION_TIME_KEYS}
+    weekday = dt.weekday()
+    return {
+        "hour": float(dt.hour),
+        "day_of_week": float(weekday),
+        "is_weekend": 1.0 if weekday >= 5 else 0.0,
+    }
+
+
+def featurize_bid_settings(settings_dict: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    settings_dict = settings_dict or {}
+
+    def _as_float(value: Any) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    return {
+        "budget": _as_float(settings_dict.get("budget")),
+        "duration_weeks": _as_float(settings_dict.get("duration_weeks")),
+        "is_fixed_price": 1.0 if settings_dict.get("is_fixed_price") else 0.0,
+    }
+
+
+def feature_names() -> List[str]:
+    """Column order of the model input matrix."""
+    names = [f"job_emb_{i}" for i in range(EMBEDDING_DIM)]
+    names += [f"profile_{key}" for key in PROFILE_FEATURE_KEYS]
+    names += [f"hist_{key}" for key in HISTORICAL_STAT_FIELDS]
+    names += [f"bid_temp_{key}" for key in SUBMISSION_TIME_KEYS]
+    names += [f"bid_temp_{key}" for key in BID_SETTINGS_KEYS]
+    return names
+
+
+FEATURE_NAMES = feature_names()
+
+__all__ = [
+    "EMBEDDING_DIM",
+    "FEATURE_NAMES",
+    "HISTORICAL_STAT_FIELDS",
+    "PROFILE_FEATURE_KEYS",
+    "feature_names",
+    "generate_profile_features",
+    "featurize_submission_time",
+    "featurize_bid_settings",
+]
@@ -0,0 +1,389 @@
+"""
+Trainer for the success-probability model.
+
+Reads the sharded dataset produced by app.ml.training_data through memory maps
+and feeds it to XGBoost batch by batch via a DataIter, so the float matrix is
+never materialised in full. The booster is wrapped in BoosterClassifier, which
+exposes ``feature_names_in_`` / ``predict_proba`` the way ml_service expects.
+
+Two modes are supported by run_training():
+
+* ``full``        - assemble the whole history and train from scratch.
+* ``incremental`` - assemble only bids whose outcome arrived after the last
+  checkpoint's watermark and continue boosting the previous model on them, so
+  a nightly run costs O(new data). Falls back to ``full`` when there is no
+  usable checkpoint, the feature schema or hyper-parameters changed, or too
+  many incremental runs have been stacked since the last full retrain.
+
+The checkpoint metadata lives next to the model as ``<model>.checkpoint.json``.
+This module does the work in-process; the API schedules it through
+app.ml.training_runner, which runs it in a separate, resource-capped process.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import xgboost as xgb
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.ml.evaluation import evaluate_model
+from app.ml.feature_extraction import FEATURE_NAMES
+from app.ml.training_data import (
+    TrainingDataError,
+    assemble_training_dataset,
+    compute_schema_hash,
+    from_epoch_us,
+    iter_shards,
+    load_manifest,
+)
+from app.services.model_metrics_service import ModelMetricsService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_XGB_PARAMS: Dict[str, Any] = {
+    "objective": "binary:logistic",
+    "eval_metric": ["logloss", "auc"],
+    "tree_method": "hist",
+    "max_depth": 6,
+    "eta": 0.1,
+    "subsample": 0.8,
+    "colsample_bytree": 0.5,
+}
+
+CHECKPOINT_SUFFIX = ".checkpoint.json"
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class BoosterClassifier:
+    """Minimal sklearn-style wrapper so ml_service can call predict_proba."""
+
+    def __init__(self, booster: xgb.Booster, feature_names: List[str], version: str):
+        self.booster = booster
+        self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        self.version = version
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        names = list(self.feature_names_in_)
+        if hasattr(X, "columns"):
+            data = X[names].to_numpy(dtype=np.float32)
+        else:
+            data = np.asarray(X, dtype=np.float32)
+        proba = self.booster.predict(xgb.DMatrix(data, feature_names=names))
+        return np.column_stack([1.0 - proba, proba])
+
+
+class _ShardIter(xgb.DataIter):
+    """
+    Hands memory-mapped shards to XGBoost one batch at a time. A batch may carry
+    a row mask; it is applied lazily, so only one shard is copied at a time.
+    """
+
+    def __init__(self, batches: List[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]],
+                 feature_names: List[str], cache_prefix: str):
+        self._batches = batches
+        self._feature_names = feature_names
+        self._pos = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._pos == len(self._batches):
+            return False
+        X, y, mask = self._batches[self._pos]
+        if mask is not None:
+            X, y = X[mask], y[mask]
+        input_data(data=X, label=y, feature_names=self._feature_names)
+        self._pos += 1
+        return True
+
+    def reset(self) -> None:
+        self._pos = 0
+
+
+class _ProgressReporter(xgb.callback.TrainingCallback):
+    """Reports boosting progress every ``every`` rounds (and on the last one)."""
+
+    def __init__(self, progress: ProgressCallback, total: int, every: int = 10):
+        super().__init__()
+        self._progress = progress
+        self._total = total
+        self._every = every
+
+    def after_iteration(self, model, epoch: int, evals_log) -> bool:
+        done = epoch + 1
+        if done % self._every == 0 or done == self._total:
+            latest = {metric: values[-1] for metric, values in evals_log.get("holdout", {}).items()}
+            self._progress({"event": "progress", "stage": "train", "iteration": done,
+                            "total": self._total, "holdout": latest})
+        return False  # never stop early
+
+
+def _split_holdout(dataset_dir: str, manifest: Dict[str, Any], fraction: float):
+    """
+    Holds out the rows whose label arrived last. Returns the training batches,
+    the holdout (X, y) or None, and the label-time cutoff of the training rows;
+    the cutoff becomes the checkpoint watermark, so held-out rows are picked up
+    by the next incremental run instead of being skipped.
+    """
+    shards = list(iter_shards(dataset_dir, manifest))
+    label_times = np.concatenate([t for _, _, t in shards])
+    n_train = int(len(label_times) * (1 - fraction)) if fraction > 0 else len(label_times)
+    if n_train <= 0:
+        n_train = len(label_times)
+    cutoff = int(np.partition(label_times, n_train - 1)[n_train - 1])
+
+    batches: List[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]] = []
+    holdout_X, holdout_y = [], []
+    for X, y, t in shards:
+        mask = np.asarray(t) <= cutoff
+        if mask.all():
+            batches.append((X, y, None))
+            continue
+        if mask.any():
+            batches.append((X, y, mask))
+        holdout_X.append(X[~mask])
+        holdout_y.append(y[~mask])
+
+    holdout = (np.concatenate(holdout_X), np.concatenate(holdout_y)) if holdout_X else None
+    return batches, holdout, cutoff
+
+
+def _build_train_matrix(batches, feature_names: List[str], cache_dir: str):
+    iterator = _ShardIter(batches, feature_names, cache_prefix=os.path.join(cache_dir, "train"))
+    if hasattr(xgb, "ExtMemQuantileDMatrix"):
+        return xgb.ExtMemQuantileDMatrix(iterator)
+    return xgb.DMatrix(iterator)  # external-memory DMatrix on older xgboost
+
+
+def save_model(model: Any, model_path: str) -> None:
+    """Writes next to the target and renames, so readers never see a partial file."""
+    path = Path(model_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def checkpoint_path(model_path: str) -> Path:
+    path = Path(model_path)
+    return path.with_name(path.name + CHECKPOINT_SUFFIX)
+
+
+def load_checkpoint(model_path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    path = checkpoint_path(model_path or settings.MODEL_PATH)
+    if not path.is_file():
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Unreadable training checkpoint {path}: {e}")
+        return None
+
+
+def _write_checkpoint(model_path: str, checkpoint: Dict[str, Any]) -> None:
+    path = checkpoint_path(model_path)
+    tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _params_hash(params: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def train_from_dataset(
+    dataset_dir: Optional[str] = None,
+    model_path: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    num_boost_round: Optional[int] = None,
+    base_model: Optional[BoosterClassifier] = None,
+    n_jobs: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Trains on the dataset at ``dataset_dir`` and saves the model to
+    ``model_path``. With ``base_model`` boosting continues from its trees
+    instead of starting over. Returns a summary with the new model version,
+    holdout scores and the label-time watermark of the rows trained on.
+    """
+    dataset_dir = dataset_dir or settings.TRAINING_DATA_DIR
+    model_path = model_path or settings.MODEL_PATH
+    manifest = load_manifest(dataset_dir)
+    if manifest["n_rows"] == 0:
+        raise TrainingDataError(f"Training dataset at {dataset_dir} is empty")
+
+    feature_names = manifest["feature_names"]
+    if base_model is not None and list(base_model.feature_names_in_) != feature_names:
+        raise TrainingDataError("Base model was trained on a different feature schema")
+    batches, holdout, cutoff = _split_holdout(dataset_dir, manifest, settings.TRAINING_HOLDOUT_FRACTION)
+
+    xgb_params = {**DEFAULT_XGB_PARAMS, **(params or {})}
+    if n_jobs:
+        xgb_params["nthread"] = n_jobs
+    rounds = num_boost_round or settings.TRAINING_NUM_BOOST_ROUND
+    evals_result: Dict[str, Any] = {}
+    callbacks = [_ProgressReporter(progress, rounds)] if progress is not None else None
+
+    cache_dir = tempfile.mkdtemp(prefix="xgb-cache-")
+    dtrain = None
+    try:
+        dtrain = _build_train_matrix(batches, feature_names, cache_dir)
+        evals = []
+        if holdout is not None:
+            evals = [(xgb.DMatrix(holdout[0], label=holdout[1], feature_names=feature_names), "holdout")]
+        booster = xgb.train(
+            xgb_params, dtrain, num_boost_round=rounds,
+            evals=evals, evals_result=evals_result, verbose_eval=False, callbacks=callbacks,
+            xgb_model=base_model.booster if base_model is not None else None,
+        )
+    finally:
+        del dtrain  # release the external-memory pages before removing them
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    version = f"{datetime.utcnow():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+    model = BoosterClassifier(booster, feature_names, version)
+    evaluation = evaluate_model(model, holdout[0], holdout[1]) if holdout is not None else None
+    save_model(model, model_path)
+
+    holdout_scores = {metric: values[-1] for metric, values in evals_result.get("holdout", {}).items()}
+    rows_trained = manifest["n_rows"] - (len(holdout[1]) if holdout is not None else 0)
+    logger.info(
+        f"Trained model {version} on {rows_trained} rows "
+        f"({'continued from ' + base_model.version if base_model is not None else 'from scratch'}); "
+        f"holdout: {holdout_scores}. Saved to {model_path}"
+    )
+    return {
+        "model_version": version,
+        "model_path": str(model_path),
+        "rows": rows_trained,
+        "num_boost_round": booster.num_boosted_rounds(),
+        "holdout": holdout_scores,
+        "evaluation": evaluation,
+        "watermark": from_epoch_us(cutoff).isoformat() if cutoff > 0 else None,
+    }
+
+
+def _run_async(func: Callable[..., Any], **kwargs: Any) -> Any:
+    """Runs an async DB helper to completion from synchronous code."""
+    async def _run():
+        try:
+            return await func(**kwargs)
+        finally:
+            # Pooled connections are bound to this event loop; drop them
+            # before it closes (their worker threads would keep us alive).
+            await engine.dispose()
+    return asyncio.run(_run())
+
+
+def _assemble(**kwargs: Any) -> Dict[str, Any]:
+    return _run_async(assemble_training_dataset, **kwargs)
+
+
+async def _record_metrics(result: Dict[str, Any]) -> None:
+    async with AsyncSessionLocal() as session:
+        await ModelMetricsService(session).record({
+            **(result["evaluation"] or {}),
+            "model_version": result["model_version"],
+            "parent_version": result["parent_version"],
+            "training_mode": result["mode"],
+            "n_train_rows": result["rows"],
+        })
+
+
+def _full_retrain_reason(checkpoint: Optional[Dict[str, Any]], model_path: str, params_hash: str) -> Optional[str]:
+    if checkpoint is None:
+        return "no checkpoint"
+    if not Path(model_path).is_file():
+        return "model file missing"
+    if checkpoint.get("schema_hash") != compute_schema_hash(FEATURE_NAMES):
+        return "feature schema changed"
+    if checkpoint.get("params_hash") != params_hash:
+        return "hyper-parameters changed"
+    if not checkpoint.get("watermark"):
+        return "checkpoint has no watermark"
+    if checkpoint.get("incremental_runs", 0) >= settings.TRAINING_FULL_RETRAIN_EVERY:
+        return f"{checkpoint['incremental_runs']} incremental runs since the last full retrain"
+    return None
+
+
+def run_training(
+    mode: str = "incremental",
+    params: Optional[Dict[str, Any]] = None,
+    n_jobs: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Assembles data and trains in the requested ``mode`` ("incremental" or
+    "full"), then records the checkpoint. Returns the training summary; when
+    there are no new outcomes the previous model is kept and ``mode`` is "noop".
+    ``n_jobs`` only sets XGBoost's thread count and is not part of the params
+    hash, so changing it never forces a full retrain.
+    """
+    if mode not in ("incremental", "full"):
+        raise ValueError(f"Unknown training mode: {mode}")
+    model_path = settings.MODEL_PATH
+    xgb_params = {**DEFAULT_XGB_PARAMS, **(params or {})}
+    params_hash = _params_hash(xgb_params)
+    checkpoint = load_checkpoint(model_path)
+
+    reason = "requested" if mode == "full" else _full_retrain_reason(checkpoint, model_path, params_hash)
+    if reason is None:
+        since = datetime.fromisoformat(checkpoint["watermark"])
+        manifest = _assemble(output_dir=settings.TRAINING_DELTA_DIR, since=since, progress=progress)
+        if manifest["n_rows"] == 0:
+            logger.info(f"No new outcomes since {since.isoformat()}; keeping model {checkpoint['model_version']}.")
+            return {"mode": "noop", "model_version": checkpoint["model_version"], "model_path": str(model_path)}
+        base_model = joblib.load(model_path)
+        result = train_from_dataset(
+            settings.TRAINING_DELTA_DIR, model_path, params=xgb_params,
+            num_boost_round=settings.TRAINING_INCREMENTAL_BOOST_ROUND, base_model=base_model,
+            n_jobs=n_jobs, progress=progress,
+        )
+        result.update(
+            mode="incremental",
+            parent_version=checkpoint["model_version"],
+            incremental_runs=checkpoint.get("incremental_runs", 0) + 1,
+            rows_total=checkpoint.get("rows_total", 0) + result["rows"],
+            watermark=result["watermark"] or checkpoint["watermark"],
+        )
+    else:
+        logger.info(f"Running full retrain: {reason}.")
+        _assemble(output_dir=settings.TRAINING_DATA_DIR, progress=progress)
+        result = train_from_dataset(
+            settings.TRAINING_DATA_DIR, model_path, params=xgb_params, n_jobs=n_jobs, progress=progress,
+        )
+        result.update(mode="full", parent_version=None, incremental_runs=0, rows_total=result["rows"])
+
+    _write_checkpoint(model_path, {
+        "model_version": result["model_version"],
+        "parent_version": result["parent_version"],
+        "mode": result["mode"],
+        "schema_hash": compute_schema_hash(FEATURE_NAMES),
+        "params_hash": params_hash,
+        "watermark": result["watermark"],
+        "rows_total": result["rows_total"],
+        "num_boost_round": result["num_boost_round"],
+        "incremental_runs": result["incremental_runs"],
+        "holdout": result["holdout"],
+        "created_at": datetime.utcnow().isoformat(),
+    })
+    try:
+        _run_async(_record_metrics, result=result)
+    except Exception as e:
+        # The model is already saved and checkpointed; a missing metrics row
+        # must not fail the run.
+        logger.error(f"Failed to record metrics for model {result['model_version']}: {e}", exc_info=True)
+    return result
@@ -0,0 +1,254 @@
+"""
+Columnar training-set assembler for the success-probability model.
+
+Labelled bids are streamed from the database in chunks ordered by
+(submitted_at, id). For every chunk the job embeddings and the outcome labels
+are fetched with a single IN-query each and joined in memory through dicts;
+profile and historical-stats features are small, so they are loaded once up
+front and used as the build side of the join. Each chunk is written as a set
+of ``.npy`` shards (float32 features, int8 labels and int64 label timestamps in
+microseconds, i.e. when the latest outcome for the bid arrived) and a
+``manifest.json`` describes the whole dataset. Readers open the shards with ``mmap_mode="r"``,
+so the trainer never has to hold the full matrix in RAM.
+
+Parquet would work too, but pyarrow is not part of requirements.txt and plain
+``.npy`` files memory-map for free.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.ml.feature_extraction import (
+    EMBEDDING_DIM,
+    FEATURE_NAMES,
+    HISTORICAL_STAT_FIELDS,
+    PROFILE_FEATURE_KEYS,
+    generate_profile_features,
+    featurize_submission_time,
+    featurize_bid_settings,
+)
+from app.models.bid import Bid
+from app.models.bid_outcome import BidOutcome
+from app.models.job import Job
+from app.models.profile import Profile
+from app.models.profile_historical_stats import ProfileHistoricalStats
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 2
+EPOCH = datetime(1970, 1, 1)
+
+_PROFILE_BLOCK = slice(EMBEDDING_DIM, EMBEDDING_DIM + len(PROFILE_FEATURE_KEYS) + len(HISTORICAL_STAT_FIELDS))
+_TEMPORAL_BLOCK = slice(_PROFILE_BLOCK.stop, len(FEATURE_NAMES))
+
+
+class TrainingDataError(Exception):
+    """Raised when a dataset directory is missing or inconsistent."""
+
+
+def to_epoch_us(dt: datetime) -> int:
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def from_epoch_us(value: int) -> datetime:
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+def compute_schema_hash(feature_names: List[str]) -> str:
+    return hashlib.sha256("\n".join(feature_names).encode("utf-8")).hexdigest()
+
+
+async def _load_profile_blocks(session) -> Dict[str, np.ndarray]:
+    """profile_id -> profile_* + hist_* feature block (build side of the join)."""
+    stats_result = await session.execute(select(ProfileHistoricalStats))
+    stats_by_profile = {row.profile_id: row for row in stats_result.scalars()}
+
+    blocks: Dict[str, np.ndarray] = {}
+    profiles_result = await session.execute(select(Profile))
+    for profile in profiles_result.scalars():
+        values = list(generate_profile_features(profile).values())
+        stats = stats_by_profile.get(profile.id)
+        for field in HISTORICAL_STAT_FIELDS:
+            value = getattr(stats, field, None) if stats is not None else None
+            values.append(value if value is not None else 0.0)
+        blocks[profile.id] = np.asarray(values, dtype=np.float32)
+    return blocks
+
+
+def _temporal_block(submitted_at: Optional[datetime], snapshot: Optional[Dict[str, Any]]) -> List[float]:
+    values = list(featurize_submission_time(submitted_at).values())
+    values += list(featurize_bid_settings(snapshot).values())
+    return values
+
+
+async def assemble_training_dataset(
+    output_dir: Optional[str] = None,
+    since: Optional[datetime] = None,
+    chunk_size: Optional[int] = None,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Streams labelled bids into a sharded columnar dataset at ``output_dir``.
+
+    Only bids that have at least one outcome are included; the label is 1 if
+    any outcome was a success. When ``since`` is given, only bids that received
+    an outcome after that timestamp are assembled. The dataset is written to a
+    temporary directory and swapped in when complete, so a concurrent reader
+    never sees a half-written manifest. ``progress`` is called once per shard.
+    """
+    output_path = Path(output_dir or settings.TRAINING_DATA_DIR)
+    chunk_size = chunk_size or settings.TRAINING_CHUNK_SIZE
+    tmp_path = output_path.with_name(f"{output_path.name}.tmp-{os.getpid()}")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    labelled_bids = select(BidOutcome.bid_id)
+    if since is not None:
+        labelled_bids = labelled_bids.where(BidOutcome.outcome_timestamp > since)
+    stmt = (
+        select(Bid.id, Bid.profile_id, Bid.job_id, Bid.submitted_at, Bid.bid_settings_snapshot)
+        .where(Bid.id.in_(labelled_bids))
+        .order_by(Bid.submitted_at, Bid.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    shards: List[Dict[str, Any]] = []
+    n_rows = 0
+    n_positive = 0
+    skipped = 0
+    watermark: Optional[datetime] = None
+
+    async with AsyncSessionLocal() as stream_session, AsyncSessionLocal() as lookup_session:
+        profile_blocks = await _load_profile_blocks(lookup_session)
+        logger.info(f"Training assembler: loaded features for {len(profile_blocks)} profiles.")
+
+        result = await stream_session.stream(stmt)
+        async for partition in result.partitions(chunk_size):
+            bid_ids = [row.id for row in partition]
+            job_ids = {row.job_id for row in partition}
+
+            outcomes = await lookup_session.execute(
+                select(BidOutcome.bid_id, BidOutcome.is_success, BidOutcome.outcome_timestamp)
+                .where(BidOutcome.bid_id.in_(bid_ids))
+            )
+            labels: Dict[str, int] = {}
+            label_times: Dict[str, datetime] = {}
+            for bid_id, is_success, outcome_ts in outcomes:
+                labels[bid_id] = max(labels.get(bid_id, 0), 1 if is_success else 0)
+                if outcome_ts is not None and (bid_id not in label_times or outcome_ts > label_times[bid_id]):
+                    label_times[bid_id] = outcome_ts
+                    if watermark is None or outcome_ts > watermark:
+                        watermark = outcome_ts
+
+            jobs = await lookup_session.execute(
+                select(Job.id, Job.description_embedding).where(Job.id.in_(job_ids))
+            )
+            embeddings = {
+                job_id: emb for job_id, emb in jobs
+                if emb is not None and len(emb) == EMBEDDING_DIM
+            }
+
+            X = np.zeros((len(partition), len(FEATURE_NAMES)), dtype=np.float32)
+            y = np.zeros(len(partition), dtype=np.int8)
+            t = np.zeros(len(partition), dtype=np.int64)
+            row_idx = 0
+            for row in partition:
+                profile_block = profile_blocks.get(row.profile_id)
+                if profile_block is None or row.id not in labels:
+                    skipped += 1
+                    continue
+                embedding = embeddings.get(row.job_id)
+                if embedding is not None:
+                    X[row_idx, :EMBEDDING_DIM] = embedding
+                X[row_idx, _PROFILE_BLOCK] = profile_block
+                X[row_idx, _TEMPORAL_BLOCK] = _temporal_block(row.submitted_at, row.bid_settings_snapshot)
+                y[row_idx] = labels[row.id]
+                if row.id in label_times:
+                    t[row_idx] = to_epoch_us(label_times[row.id])
+                row_idx += 1
+
+            if row_idx == 0:
+                continue
+            shard_no = len(shards)
+            features_file = f"X_{shard_no:05d}.npy"
+            labels_file = f"y_{shard_no:05d}.npy"
+            times_file = f"t_{shard_no:05d}.npy"
+            np.save(tmp_path / features_file, X[:row_idx])
+            np.save(tmp_path / labels_file, y[:row_idx])
+            np.save(tmp_path / times_file, t[:row_idx])
+            shards.append({
+                "features": features_file, "labels": labels_file,
+                "label_times": times_file, "rows": row_idx,
+            })
+            n_rows += row_idx
+            n_positive += int(y[:row_idx].sum())
+            logger.info(f"Training assembler: wrote shard {shard_no} ({row_idx} rows, {n_rows} total).")
+            if progress is not None:
+                progress({"event": "progress", "stage": "assemble", "shards": len(shards), "rows": n_rows})
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "feature_names": FEATURE_NAMES,
+        "schema_hash": compute_schema_hash(FEATURE_NAMES),
+        "dtype": "float32",
+        "n_rows": n_rows,
+        "n_positive": n_positive,
+        "since": since.isoformat() if since else None,
+        "watermark": watermark.isoformat() if watermark else None,
+        "shards": shards,
+    }
+    with open(tmp_path / MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    if output_path.exists():
+        old_path = output_path.with_name(f"{output_path.name}.old-{os.getpid()}")
+        output_path.rename(old_path)
+        tmp_path.rename(output_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        tmp_path.rename(output_path)
+
+    logger.info(
+        f"Training assembler: dataset ready at {output_path} "
+        f"({n_rows} rows, {n_positive} positive, {len(shards)} shards, {skipped} bids skipped)."
+    )
+    return manifest
+
+
+def load_manifest(dataset_dir: str) -> Dict[str, Any]:
+    manifest_path = Path(dataset_dir) / MANIFEST_FILE
+    if not manifest_path.is_file():
+        raise TrainingDataError(f"No training dataset manifest at {manifest_path}")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise TrainingDataError(f"Unsupported manifest version {manifest.get('version')} in {manifest_path}")
+    return manifest
+
+
+def iter_shards(
+    dataset_dir: str, manifest: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Yields (X, y, label_times_us) per shard as read-only memory maps."""
+    manifest = manifest or load_manifest(dataset_dir)
+    base = Path(dataset_dir)
+    for shard in manifest["shards"]:
+        X = np.load(base / shard["features"], mmap_mode="r")
+        y = np.load(base / shard["labels"], mmap_mode="r")
+        t = np.load(base / shard["label_times"], mmap_mode="r")
+        if X.shape != (shard["rows"], len(manifest["feature_names"])) or not (y.shape[0] == t.shape[0] == shard["rows"]):
+            raise TrainingDataError(f"Shard {shard['features']} does not match the manifest")
+        yield X, y, t
@@ -0,0 +1,336 @@
+"""
+Out-of-process training runner.
+
+Training used to be something the API process would do itself, next to
+Uvicorn, competing for CPU and the GIL. run_training_subprocess() instead
+launches ``python -m app.ml.training_runner`` as a child process with a lower
+scheduling priority, optional CPU affinity and rlimits, lets XGBoost use every
+core it is given, and streams the child's JSON progress lines back into
+TRAINING_STATUS. When a new model version has been written it is published to
+the API through the internal reload hook (settings.MODEL_RELOAD_URL). The
+child also re-tunes the per-profile autobid thresholds once training is done
+(app.services.decision_engine).
+
+Every API worker starts the scheduler, so runs are serialised across the
+processes of a host with an flock on TRAINING_LOCK_FILE (training reads and
+writes local files, so one host is the scope that matters), and the status is
+kept in TRAINING_STATUS_FILE where every worker can read it. Only one worker's
+nightly job actually trains; the others find the lock taken and skip.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+try:
+    import fcntl
+except ImportError:  # Windows: runs are only serialised within one process
+    fcntl = None
+
+# This process's view of the runner; get_training_status() also sees other workers' runs.
+TRAINING_STATUS: Dict[str, Any] = {"state": "idle"}
+_run_lock = threading.Lock()
+_lock_handle = None  # open TRAINING_LOCK_FILE while this process holds the flock
+
+
+class TrainingRunError(Exception):
+    """Raised when the training process fails, times out or reports an error."""
+
+
+class TrainingAlreadyRunning(TrainingRunError):
+    pass
+
+
+def _available_cpus() -> List[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def _training_n_jobs() -> int:
+    if settings.TRAINING_N_JOBS:
+        return settings.TRAINING_N_JOBS
+    if settings.TRAINING_CPU_AFFINITY:
+        return len(settings.TRAINING_CPU_AFFINITY)
+    return len(_available_cpus())
+
+
+def _limit_child_resources() -> None:
+    """preexec_fn for the child process (POSIX only)."""
+    import resource
+
+    if settings.TRAINING_NICE:
+        os.nice(settings.TRAINING_NICE)
+    if settings.TRAINING_CPU_AFFINITY and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, settings.TRAINING_CPU_AFFINITY)
+    if settings.TRAINING_MAX_MEMORY_MB:
+        # RLIMIT_DATA rather than RLIMIT_AS: the memory-mapped training shards
+        # are file-backed and must not count against the cap.
+        limit = settings.TRAINING_MAX_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    if settings.TRAINING_MAX_CPU_SECONDS:
+        limit = settings.TRAINING_MAX_CPU_SECONDS
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, limit))
+
+
+def _update_status(**fields: Any) -> None:
+    TRAINING_STATUS.update(fields)
+    path = Path(settings.TRAINING_STATUS_FILE)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(TRAINING_STATUS, default=str))
+        os.replace(tmp_path, path)  # readers never see a half-written file
+    except OSError as e:
+        logger.warning(f"Could not write training status to {path}: {e}")
+
+
+def get_training_status() -> Dict[str, Any]:
+    """The latest run's status as written by whichever worker ran it."""
+    try:
+        status = json.loads(Path(settings.TRAINING_STATUS_FILE).read_text())
+    except (OSError, ValueError):
+        return dict(TRAINING_STATUS)
+    if status.get("state") == "running" and not is_training_running():
+        status["state"] = "interrupted"  # the worker running it died before reporting
+    return status
+
+
+def _try_flock(handle) -> bool:
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _open_lock_file():
+    path = Path(settings.TRAINING_LOCK_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return open(path, "a")
+
+
+def _acquire_run_lock() -> bool:
+    global _lock_handle
+    if not _run_lock.acquire(blocking=False):
+        return False
+    if fcntl is None:
+        return True
+    handle = _open_lock_file()
+    if not _try_flock(handle):
+        handle.close()
+        _run_lock.release()
+        return False
+    _lock_handle = handle
+    return True
+
+
+def _release_run_lock() -> None:
+    global _lock_handle
+    if _lock_handle is not None:
+        fcntl.flock(_lock_handle, fcntl.LOCK_UN)
+        _lock_handle.close()
+        _lock_handle = None
+    _run_lock.release()
+
+
+def publish_model_version(model_version: str) -> bool:
+    """
+    Asks the API to reload the model from disk. Returns True on success. Only
+    the worker that serves MODEL_RELOAD_URL reloads right away; the others pick
+    the new file up themselves (ml_service.ensure_latest_model).
+    """
+    try:
+        response = httpx.post(
+            str(settings.MODEL_RELOAD_URL),
+            json={"model_version": model_version},
+            headers={"X-Reload-Secret": settings.MODEL_RELOAD_SECRET},
+            timeout=30.0,
+        )
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to publish model {model_version} to {settings.MODEL_RELOAD_URL}: {e}")
+        return False
+    logger.info(f"Published model {model_version}: {response.json()}")
+    return True
+
+
+def run_training_subprocess(
+    mode: str = "incremental",
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    publish: bool = True,
+) -> Dict[str, Any]:
+    """
+    Runs training in a child process and blocks until it finishes. Only one run
+    at a time on the host; a second caller, in this process or another, gets
+    TrainingAlreadyRunning. Returns the trainer's summary (see
+    app.ml.trainer.run_training).
+    """
+    if not _acquire_run_lock():
+        raise TrainingAlreadyRunning("A training run is already in progress")
+    try:
+        return _run_child(mode, on_progress, publish)
+    finally:
+        _release_run_lock()
+
+
+def _run_child(mode: str, on_progress, publish: bool) -> Dict[str, Any]:
+    n_jobs = _training_n_jobs()
+    cmd = [sys.executable, "-m", "app.ml.training_runner", "--mode", mode, "--n-jobs", str(n_jobs)]
+    TRAINING_STATUS.clear()
+    _update_status(state="running", mode=mode, n_jobs=n_jobs, started_at=datetime.utcnow().isoformat())
+    logger.info(f"Starting training process: {' '.join(cmd)}")
+
+    proc = subprocess.Popen(
+        cmd,
+        cwd=BACKEND_DIR,
+        stdout=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+        preexec_fn=_limit_child_resources if os.name == "posix" else None,
+    )
+    _update_status(pid=proc.pid)
+    timed_out = threading.Event()
+
+    def _on_timeout():
+        timed_out.set()
+        proc.kill()
+
+    timer = threading.Timer(settings.TRAINING_TIMEOUT_SECONDS, _on_timeout)
+    timer.start()
+
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    try:
+        for line in proc.stdout:
+            line = line.strip()
+            if not line.startswith("{"):
+                if line:
+                    logger.info(f"[training] {line}")
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                logger.info(f"[training] {line}")
+                continue
+            if event.get("event") == "progress":
+                _update_status(**{k: v for k, v in event.items() if k != "event"})
+                if on_progress is not None:
+                    on_progress(event)
+            elif event.get("event") == "done":
+                result = event["result"]
+            elif event.get("event") == "error":
+                error = event.get("error")
+        returncode = proc.wait()
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+
+    if result is None:
+        if timed_out.is_set():
+            error = f"training timed out after {settings.TRAINING_TIMEOUT_SECONDS}s"
+        elif error is None:
+            error = f"training process exited with code {returncode}"
+        _update_status(state="failed", error=error, finished_at=datetime.utcnow().isoformat())
+        logger.error(f"Training run failed: {error}")
+        raise TrainingRunError(error)
+
+    published = False
+    if publish and result.get("mode") != "noop":
+        published = publish_model_version(result["model_version"])
+    _update_status(
+        state="succeeded", finished_at=datetime.utcnow().isoformat(),
+        model_version=result["model_version"], result_mode=result["mode"], published=published,
+    )
+    return result
+
+
+def is_training_running() -> bool:
+    if _run_lock.locked() or fcntl is None:
+        return _run_lock.locked()
+    with _open_lock_file() as handle:
+        if not _try_flock(handle):
+            return True  # held by another worker
+        fcntl.flock(handle, fcntl.LOCK_UN)
+    return False
+
+
+def start_training_in_background(mode: str = "incremental") -> bool:
+    """
+    Starts run_training_job in a daemon thread (the thread only waits on the
+    child process). Returns False if a run is already in progress.
+    """
+    if is_training_running():
+        return False
+    threading.Thread(target=run_training_job, args=(mode,), name="training-runner", daemon=True).start()
+    return True
+
+
+def run_training_job(mode: str = "incremental") -> None:
+    """APScheduler entry point; failures are logged, never raised into the scheduler."""
+    try:
+        run_training_subprocess(mode)
+    except TrainingAlreadyRunning:
+        logger.info(f"Scheduled training ({mode}) skipped: another worker is already training.")
+    except TrainingRunError as e:
+        logger.error(f"Scheduled training ({mode}) did not complete: {e}")
+
+
+def _child_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Training worker (spawned by run_training_subprocess).")
+    parser.add_argument("--mode", choices=["full", "incremental"], default="incremental")
+    parser.add_argument("--n-jobs", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    # stdout carries the JSON event stream; everything else goes to stderr.
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    def emit(event: Dict[str, Any]) -> None:
+        print(json.dumps(event, default=str), flush=True)
+
+    from app.ml.trainer import run_training
+
+    try:
+        result = run_training(args.mode, n_jobs=args.n_jobs, progress=emit)
+    except Exception as e:
+        logger.error(f"Training failed: {e}", exc_info=True)
+        emit({"event": "error", "error": str(e)})
+        return 1
+    try:
+        result["tuned_thresholds"] = asyncio.run(_tune_thresholds())
+    except Exception as e:
+        logger.error(f"Threshold tuning failed: {e}", exc_info=True)
+    emit({"event": "done", "result": result})
+    return 0
+
+
+async def _tune_thresholds() -> Dict[str, float]:
+    """Nightly per-profile threshold tuning, piggybacking on the training process."""
+    from app.database import AsyncSessionLocal, engine
+    from app.services.decision_engine import tune_profile_thresholds
+
+    try:
+        async with AsyncSessionLocal() as session:
+            return await tune_profile_thresholds(session)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(_child_main())
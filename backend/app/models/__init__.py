@@ -12,6 +12,9 @@ from .job import Job
 from .bid_outcome import BidOutcome
 from .profile_historical_stats import ProfileHistoricalStats
 from .orm_prompt import Prompt # Using ORM prompt
+from .model_metrics import ModelMetrics
+from .autobid_log_rollup import AutobidLogDailyRollup, RollupWatermark
+from .seen_job import SeenJob
 
 # Optional: Define __all__ to specify what is exported when `from app.models import *` is used.
 # This also helps linters understand what's intentionally exported.
@@ -27,4 +30,8 @@ __all__ = [
     "BidOutcome",
     "ProfileHistoricalStats",
     "Prompt", # Added Prompt
+    "ModelMetrics",
+    "AutobidLogDailyRollup",
+    "RollupWatermark",
+    "SeenJob",
 ]
@@ -1,5 +1,5 @@
 from sqlalchemy import (Column, Integer, String, Float,
-                        ForeignKey, DateTime, Text)
+                        ForeignKey, DateTime, Text, Index)
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database import Base
@@ -7,6 +7,12 @@ from app.database import Base
 
 class AutobidLog(Base):
     __tablename__ = "autobid_logs"
+    __table_args__ = (
+        # Per-profile pages and stats; on PostgreSQL status/score ride along
+        # in the index so aggregation never touches the heap.
+        Index("ix_autobid_logs_profile_id_created_at", "profile_id", "created_at", "id",
+              postgresql_include=["status", "score"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     profile_id = Column(String, ForeignKey("profiles.id"), nullable=False)
@@ -16,7 +22,7 @@ class AutobidLog(Base):
     status = Column(String, default="pending")  # success / failed / skipped
     score = Column(Float)
     error_message = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     profile = relationship(
         "app.models.profile.Profile",
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class AutobidLogDailyRollup(Base):
+    """
+    Autobid log counts per profile, day, status and score bucket, maintained
+    incrementally from autobid_logs (see app/services/autobid_log_analytics_service.py).
+    """
+    __tablename__ = "autobid_log_daily_rollups"
+
+    profile_id = Column(String, primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    score_bucket = Column(Integer, primary_key=True)  # floor(score / bucket width); -1 = no score
+    count = Column(Integer, nullable=False, default=0)
+
+
+class RollupWatermark(Base):
+    """Highest source row id already folded into a rollup table."""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
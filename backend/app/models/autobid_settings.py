@@ -1,4 +1,6 @@
-from sqlalchemy import String, Boolean, Integer, ForeignKey
+from typing import Optional
+
+from sqlalchemy import String, Boolean, Integer, Float, ForeignKey, false
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
@@ -11,3 +13,7 @@ class AutobidSettings(Base):
     )
     enabled: Mapped[bool] = mapped_column(Boolean, default=False)
     daily_limit: Mapped[int] = mapped_column(Integer, default=5)
+    # Tuned from outcomes by app.services.decision_engine; None = ML_PROBABILITY_THRESHOLD
+    min_success_proba: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Opt-in reuse of similar bid texts (app/services/semantic_bid_cache.py)
+    semantic_cache_enabled: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
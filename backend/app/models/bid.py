@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, ForeignKey, DateTime, JSON, Integer
+from sqlalchemy import Column, String, Float, ForeignKey, DateTime, JSON, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -8,17 +8,24 @@ from .job import Job # Import the Job model
 
 class Bid(Base):
     __tablename__ = "bids"
+    __table_args__ = (
+        # (filter, submitted_at, id) for keyset pagination of /bids
+        Index("ix_bids_submitted_at_id", "submitted_at", "id"),
+        Index("ix_bids_profile_id_submitted_at_id", "profile_id", "submitted_at", "id"),
+        Index("ix_bids_status_submitted_at_id", "status", "submitted_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True)
     profile_id = Column(String, ForeignKey("profiles.id", ondelete="CASCADE"), nullable=False)
     job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"), nullable=False) # Changed to ForeignKey
     amount = Column(Float, nullable=False)
     status = Column(String, default="created", nullable=False)
-    submitted_at = Column(DateTime, default=datetime.utcnow)
+    submitted_at = Column(DateTime, default=datetime.utcnow, nullable=False) # Keyset sort key, see BidRepository.page
     prompt_template_id = Column(Integer, ForeignKey("ai_prompts.id"), nullable=True) # Changed to Integer
     generated_bid_text = Column(String, nullable=True)
     bid_settings_snapshot = Column(JSON, nullable=True)
     external_signals_snapshot = Column(JSON, nullable=True)
+    predicted_success_proba = Column(Float, nullable=True) # Model score at bid time, used to tune thresholds
 
     profile = relationship("Profile", backref="bids")
     job = relationship("Job", backref="bids") # Added relationship to Job
@@ -1,12 +1,50 @@
 import uuid
-from sqlalchemy import Column, String, Text, JSON # Added JSON
+from datetime import datetime
+from sqlalchemy import Column, String, Text, JSON, Float, DateTime, Index, DDL, event # Added JSON
 from sqlalchemy.dialects.postgresql import UUID
 from app.database import Base
 
 class Job(Base):
     __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_created_at_id", "created_at", "id"), # Keyset pagination of /jobs
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String, nullable=True)
     description = Column(Text, nullable=True)
     description_embedding = Column(JSON, nullable=True) # New column
+    budget = Column(Float, nullable=True) # Client budget; used as the job's value when ranking bids
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Full-text search over title + description (see JobRepository.search_clause).
+# Neither index is an ORM column: PostgreSQL gets a generated tsvector column
+# with a GIN index, SQLite (local runs) an FTS5 table kept in sync by triggers.
+# Both are created with the table by create_all and by migration 6e2a9c4d8b17.
+JOBS_SEARCH_VECTOR_SQL = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))"
+)
+POSTGRES_SEARCH_DDL = [
+    f"ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({JOBS_SEARCH_VECTOR_SQL}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+]
+SQLITE_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+    "title, description, content='jobs', content_rowid='rowid')",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_ai AFTER INSERT ON jobs BEGIN "
+    "INSERT INTO jobs_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_ad AFTER DELETE ON jobs BEGIN "
+    "INSERT INTO jobs_fts(jobs_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS jobs_fts_au AFTER UPDATE ON jobs BEGIN "
+    "INSERT INTO jobs_fts(jobs_fts, rowid, title, description) "
+    "VALUES ('delete', old.rowid, old.title, old.description); "
+    "INSERT INTO jobs_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description); END",
+]
+for _statement in POSTGRES_SEARCH_DDL:
+    event.listen(Job.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(Job.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Job.__table__, "before_drop", DDL("DROP TABLE IF EXISTS jobs_fts").execute_if(dialect="sqlite"))
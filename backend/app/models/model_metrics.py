@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from datetime import datetime
+from app.database import Base
+
+
+class ModelMetrics(Base):
+    """Offline evaluation of one trained model version (see app/ml/evaluation.py)."""
+    __tablename__ = "model_metrics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    model_version = Column(String, nullable=False, unique=True, index=True)
+    parent_version = Column(String, nullable=True)
+    training_mode = Column(String, nullable=True)  # full / incremental
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    n_train_rows = Column(Integer, nullable=True)
+    n_eval_rows = Column(Integer, nullable=True)
+    positive_rate = Column(Float, nullable=True)
+
+    auc = Column(Float, nullable=True)
+    log_loss = Column(Float, nullable=True)
+    brier_score = Column(Float, nullable=True)
+    expected_calibration_error = Column(Float, nullable=True)
+    calibration = Column(JSON, nullable=True)  # reliability table, one entry per probability bin
+
+    threshold = Column(Float, nullable=True)
+    precision_at_threshold = Column(Float, nullable=True)
+    recall_at_threshold = Column(Float, nullable=True)
+    k = Column(Integer, nullable=True)
+    precision_at_k = Column(Float, nullable=True)
+
+    latency_p50_ms = Column(Float, nullable=True)
+    latency_p95_ms = Column(Float, nullable=True)
+    latency_p99_ms = Column(Float, nullable=True)
+
+    def __repr__(self):
+        return f"<ModelMetrics(model_version='{self.model_version}', auc={self.auc})>"
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String
+
+from app.database import Base
+
+
+class SeenJob(Base):
+    """
+    A job card the browser scraper has already picked up, keyed by the
+    marketplace's job id (the last segment of the job URL). See
+    app/services/job_store.py.
+    """
+    __tablename__ = "seen_jobs"
+
+    job_id = Column(String, primary_key=True)  # the unique index lookups and upserts go through
+    title = Column(String, nullable=True)
+    link = Column(String, nullable=True)
+    profile_id = Column(String, nullable=True)  # profile whose run saw it first
+    first_seen_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,73 +1,265 @@
-import redis.asyncio as aioredis # Import the asyncio version of the redis library
-from redis.asyncio.connection import ConnectionPool # Correct import for ConnectionPool
-import json
-from typing import Optional, Any
+"""
+Redis cache client.
+
+One connection pool per process, created by connect() on application startup
+and closed by close() on shutdown (app/main.py); get_client() opens it lazily
+for code that runs outside the app. The pool belongs to the event loop that
+created it, so scheduler threads running their own asyncio.run() should not
+share redis_cache_client.
+
+Values are stored in a small binary format (see encode_value): numeric numpy
+arrays as a dtype/shape header plus their raw buffer, everything else as
+orjson. Values written by the old json.dumps client still decode.
+
+get_many() is a single MGET and set_many() a non-transactional pipeline, both
+chunked by REDIS_PIPELINE_CHUNK_SIZE, so caching a few hundred embeddings or
+predictions costs a handful of round trips instead of one per key.
+"""
+import logging
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import orjson
+import redis.asyncio as aioredis
+from redis.asyncio.connection import ConnectionPool
+
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
+# First byte of every stored value. Neither can start a JSON document, so
+# values written before the codec existed are told apart by their first byte.
+_TAG_JSON = b"\x01"
+_TAG_NDARRAY = b"\x02"
+_HEADER_LEN = struct.Struct(">I")
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def encode_value(value: Any) -> bytes:
+    if isinstance(value, np.ndarray) and value.dtype.kind in "biufc":
+        header = orjson.dumps({"dtype": value.dtype.str, "shape": value.shape})
+        return _TAG_NDARRAY + _HEADER_LEN.pack(len(header)) + header + np.ascontiguousarray(value).tobytes()
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    return _TAG_JSON + orjson.dumps(value, option=_ORJSON_OPTIONS)
+
+
+def decode_value(raw: bytes) -> Any:
+    """Inverse of encode_value. Arrays come back read-only (they view the payload)."""
+    tag = raw[:1]
+    if tag == _TAG_NDARRAY:
+        (header_len,) = _HEADER_LEN.unpack_from(raw, 1)
+        start = 1 + _HEADER_LEN.size
+        header = orjson.loads(raw[start:start + header_len])
+        return np.frombuffer(raw, dtype=np.dtype(header["dtype"]), offset=start + header_len).reshape(header["shape"])
+    if tag == _TAG_JSON:
+        return orjson.loads(raw[1:])
+    return orjson.loads(raw)
+
+
+# KEYS: access index (zset), sizes (hash), total bytes (counter)
+# ARGV: key, payload size, now, max bytes
+# Keys that expired through their TTL stay in the index until evicted; they
+# were used least recently, so they are the first to go.
+_BUDGET_SCRIPT = """
+local old = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+local total = redis.call('INCRBY', KEYS[3], tonumber(ARGV[2]) - old)
+local evicted = 0
+while total > tonumber(ARGV[4]) do
+    local oldest = redis.call('ZPOPMIN', KEYS[1])
+    if #oldest == 0 then break end
+    local size = tonumber(redis.call('HGET', KEYS[2], oldest[1]) or '0')
+    redis.call('HDEL', KEYS[2], oldest[1])
+    redis.call('UNLINK', oldest[1])
+    total = redis.call('DECRBY', KEYS[3], size)
+    evicted = evicted + 1
+end
+return evicted
+"""
+
+
+def _budget_keys(prefix: str) -> tuple:
+    # Under the namespace prefix, so clear_cache_by_prefix() resets the budget too
+    return f"{prefix}:__lru:index", f"{prefix}:__lru:sizes", f"{prefix}:__lru:bytes"
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
 class RedisCache:
-    def __init__(self):
-        self.redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
-        if settings.REDIS_PASSWORD:
-            self.redis_url = f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
-        
-        # Create a connection pool. This is more efficient than creating connections on the fly.
-        # Note: aioredis.from_url automatically manages a connection pool.
-        self.pool = ConnectionPool.from_url(self.redis_url, decode_responses=True) # decode_responses for auto-decoding from bytes to str
-
-    async def get_client(self):
-        # Get a client from the pool
-        return aioredis.Redis(connection_pool=self.pool)
+    def __init__(self, redis_url: Optional[str] = None):
+        if redis_url is None:
+            redis_url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+            if settings.REDIS_PASSWORD:
+                redis_url = f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}"
+        self.redis_url = redis_url
+        self._client: Optional[aioredis.Redis] = None
+
+    async def connect(self) -> None:
+        """Creates the connection pool; connections themselves are opened on first use."""
+        if self._client is not None:
+            return
+        pool = ConnectionPool.from_url(
+            self.redis_url,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
+        self._client = aioredis.Redis.from_pool(pool)  # the client owns the pool and closes it
+
+    async def close(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def get_client(self) -> aioredis.Redis:
+        if self._client is None:
+            await self.connect()
+        return self._client
 
     async def get(self, key: str) -> Optional[Any]:
         try:
             client = await self.get_client()
             cached_value = await client.get(key)
-            if cached_value:
-                return json.loads(cached_value) # Assuming JSON serializable data
-            return None
+            return decode_value(cached_value) if cached_value is not None else None
         except Exception as e:
-            print(f"Redis get error: {e}") # Basic logging, consider more robust logging
+            logger.warning(f"Redis get error: {e}")
             return None
 
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Cached values for the keys that are present; misses are simply absent."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        try:
+            client = await self.get_client()
+            for chunk in _chunks(keys, settings.REDIS_PIPELINE_CHUNK_SIZE):
+                for key, raw in zip(chunk, await client.mget(chunk)):
+                    if raw is not None:
+                        found[key] = decode_value(raw)
+        except Exception as e:
+            logger.warning(f"Redis get_many error: {e}")
+        return found
+
     async def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
         try:
             client = await self.get_client()
-            serialized_value = json.dumps(value) # Assuming JSON serializable data
             if ttl_seconds is None:
                 ttl_seconds = settings.REDIS_CACHE_TTL_SECONDS
-            await client.set(key, serialized_value, ex=ttl_seconds)
+            await client.set(key, encode_value(value), ex=ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Redis set error: {e}")
+
+    async def set_many(self, items: Mapping[str, Any], ttl_seconds: Optional[int] = None):
+        """SET ... EX for every item, pipelined (not transactional) in chunks."""
+        if ttl_seconds is None:
+            ttl_seconds = settings.REDIS_CACHE_TTL_SECONDS
+        try:
+            client = await self.get_client()
+            for chunk in _chunks(list(items.items()), settings.REDIS_PIPELINE_CHUNK_SIZE):
+                async with client.pipeline(transaction=False) as pipe:
+                    for key, value in chunk:
+                        pipe.set(key, encode_value(value), ex=ttl_seconds)
+                    await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis set_many error: {e}")
+
+    async def set_within_budget(
+        self, key: str, value: Any, budget_prefix: str, max_bytes: int, ttl_seconds: Optional[int] = None
+    ) -> int:
+        """
+        set() for a namespace with a memory budget: the write is recorded in an
+        access-ordered index under ``<budget_prefix>:__lru:*`` and the least
+        recently used keys of the namespace are evicted until it fits in
+        max_bytes again. Returns the number of evicted keys.
+        """
+        if ttl_seconds is None:
+            ttl_seconds = settings.REDIS_CACHE_TTL_SECONDS
+        payload = encode_value(value)
+        try:
+            client = await self.get_client()
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.set(key, payload, ex=ttl_seconds)
+                pipe.eval(_BUDGET_SCRIPT, 3, *_budget_keys(budget_prefix), key, len(payload), time.time(), max_bytes)
+                _, evicted = await pipe.execute()
+            if evicted:
+                logger.info(f"Evicted {evicted} least recently used keys from '{budget_prefix}'")
+            return evicted
         except Exception as e:
-            print(f"Redis set error: {e}") # Basic logging
+            logger.warning(f"Redis set_within_budget error: {e}")
+            return 0
+
+    async def touch(self, key: str, budget_prefix: str) -> None:
+        """Marks a budgeted key as just used, so it is evicted last."""
+        try:
+            client = await self.get_client()
+            await client.zadd(_budget_keys(budget_prefix)[0], {key: time.time()}, xx=True)
+        except Exception as e:
+            logger.warning(f"Redis touch error: {e}")
+
+    async def claim(self, key: str, owner: str, ttl_seconds: int) -> Optional[str]:
+        """
+        SET NX of a plain string: the owner of ``key`` after the call (``owner``
+        if this call took it), or None if Redis could not be asked.
+        """
+        try:
+            client = await self.get_client()
+            if await client.set(key, owner.encode(), nx=True, ex=ttl_seconds):
+                return owner
+            current = await client.get(key)
+            return current.decode() if current is not None else None
+        except Exception as e:
+            logger.warning(f"Redis claim error: {e}")
+            return None
+
+    async def incr_counters(self, key: str, **increments: int) -> None:
+        try:
+            client = await self.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for field_name, amount in increments.items():
+                    pipe.hincrby(key, field_name, amount)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Redis incr_counters error: {e}")
+
+    async def get_counters(self, key: str) -> Dict[str, int]:
+        try:
+            client = await self.get_client()
+            return {k.decode(): int(v) for k, v in (await client.hgetall(key)).items()}
+        except Exception as e:
+            logger.warning(f"Redis get_counters error: {e}")
+            return {}
 
     async def delete(self, key: str):
         try:
             client = await self.get_client()
             await client.delete(key)
         except Exception as e:
-            print(f"Redis delete error: {e}")
+            logger.warning(f"Redis delete error: {e}")
 
-    async def clear_cache_by_prefix(self, prefix: str):
+    async def clear_cache_by_prefix(self, prefix: str) -> int:
+        """UNLINKs every ``<prefix>:*`` key in chunks while scanning. Returns the number removed."""
+        chunk_size = settings.REDIS_PIPELINE_CHUNK_SIZE
+        removed, batch = 0, []
         try:
             client = await self.get_client()
-            keys = []
-            async for key in client.scan_iter(match=f"{prefix}:*"):
-                keys.append(key)
-            if keys:
-                await client.delete(*keys)
-            print(f"Cleared {len(keys)} keys with prefix '{prefix}'")
+            async for key in client.scan_iter(match=f"{prefix}:*", count=chunk_size):
+                batch.append(key)
+                if len(batch) >= chunk_size:
+                    removed += await client.unlink(*batch)
+                    batch = []
+            if batch:
+                removed += await client.unlink(*batch)
+            logger.info(f"Cleared {removed} keys with prefix '{prefix}'")
         except Exception as e:
-            print(f"Redis clear_cache_by_prefix error: {e}")
+            logger.warning(f"Redis clear_cache_by_prefix error: {e}")
+        return removed
 
-# Global instance of the cache client
-redis_cache_client = RedisCache()
-
-# Optional: function to be called on app startup/shutdown to explicitly manage pool (if needed)
-# async def connect_redis_pool():
-#    # aioredis.from_url manages the pool implicitly, explicit connect/disconnect often not needed for basic use.
-#    # If more control is needed, this is where you'd initialize and close the pool.
-#    pass
 
-# async def close_redis_pool():
-#    if redis_cache_client.pool:
-#        await redis_cache_client.pool.disconnect() # Or appropriate close method for the pool
-#    pass
+# Global instance of the cache client; connected and closed in app/main.py
+redis_cache_client = RedisCache()
@@ -0,0 +1,26 @@
+# Async repositories: one per model, all built on the request's AsyncSession.
+from .base import BaseRepository
+from .user_repository import UserRepository
+from .profile_repository import ProfileRepository
+from .bid_repository import BidRepository
+from .bid_outcome_repository import BidOutcomeRepository
+from .autobid_settings_repository import AutobidSettingsRepository
+from .autobid_log_repository import AutobidLogRepository
+from .ai_prompt_repository import AIPromptRepository
+from .job_repository import JobRepository
+from .profile_historical_stats_repository import ProfileHistoricalStatsRepository
+from .seen_job_repository import SeenJobRepository
+
+__all__ = [
+    "BaseRepository",
+    "UserRepository",
+    "ProfileRepository",
+    "BidRepository",
+    "BidOutcomeRepository",
+    "AutobidSettingsRepository",
+    "AutobidLogRepository",
+    "AIPromptRepository",
+    "JobRepository",
+    "ProfileHistoricalStatsRepository",
+    "SeenJobRepository",
+]
@@ -0,0 +1,11 @@
+from typing import Optional
+
+from app.models.ai_prompt import AIPrompt
+from app.repositories.base import BaseRepository
+
+
+class AIPromptRepository(BaseRepository[AIPrompt]):
+    model = AIPrompt
+
+    async def get_active_for_profile(self, profile_id: str) -> Optional[AIPrompt]:
+        return await self.first(AIPrompt.profile_id == profile_id, AIPrompt.is_active.is_(True))
@@ -0,0 +1,35 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy.future import select
+
+from app.models.autobid_log import AutobidLog
+from app.repositories.base import BaseRepository
+from app.repositories.pagination import after_cursor, split_page
+
+
+class AutobidLogRepository(BaseRepository[AutobidLog]):
+    model = AutobidLog
+
+    async def list_for_profile(self, profile_id: str, status: Optional[str] = None) -> List[AutobidLog]:
+        where = [AutobidLog.profile_id == profile_id]
+        if status is not None:
+            where.append(AutobidLog.status == status)
+        return await self.list(*where, order_by=AutobidLog.created_at.desc())
+
+    async def page(
+        self,
+        profile_id: str,
+        limit: int,
+        after: Optional[Tuple[datetime, int]] = None,
+        status: Optional[str] = None,
+    ) -> Tuple[List[AutobidLog], bool]:
+        """One page of a profile's logs, newest first. Returns (logs, has_more)."""
+        stmt = select(AutobidLog).where(AutobidLog.profile_id == profile_id)
+        if status is not None:
+            stmt = stmt.where(AutobidLog.status == status)
+        if after is not None:
+            stmt = stmt.where(after_cursor(AutobidLog.created_at, AutobidLog.id, *after))
+        stmt = stmt.order_by(AutobidLog.created_at.desc(), AutobidLog.id.desc()).limit(limit + 1)
+        result = await self.db_session.execute(stmt)
+        return split_page(result.scalars().all(), limit)
@@ -0,0 +1,28 @@
+from typing import List, Optional
+
+from app.models.autobid_settings import AutobidSettings
+from app.repositories.base import BaseRepository
+
+
+class AutobidSettingsRepository(BaseRepository[AutobidSettings]):
+    model = AutobidSettings
+
+    async def list_enabled(self) -> List[AutobidSettings]:
+        return await self.list(AutobidSettings.enabled.is_(True))
+
+    async def get_or_create(self, profile_id: str) -> AutobidSettings:
+        """Settings of ``profile_id``, created with the model defaults on first use."""
+        autobid_settings = await self.get(profile_id)
+        if autobid_settings is None:
+            autobid_settings = await self.add(AutobidSettings(profile_id=profile_id))
+        return autobid_settings
+
+    async def upsert(self, profile_id: str, **fields) -> AutobidSettings:
+        autobid_settings: Optional[AutobidSettings] = await self.get(profile_id)
+        if autobid_settings is None:
+            return await self.add(AutobidSettings(profile_id=profile_id, **fields))
+        for key, value in fields.items():
+            setattr(autobid_settings, key, value)
+        await self.db_session.commit()
+        await self.db_session.refresh(autobid_settings)
+        return autobid_settings
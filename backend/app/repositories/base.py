@@ -0,0 +1,46 @@
+from typing import Any, Generic, List, Optional, Type, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.database import Base
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+
+class BaseRepository(Generic[ModelT]):
+    """
+    Async data access for one model. Repositories only build and await queries;
+    HTTP errors and business rules stay in services and routers.
+    """
+    model: Type[ModelT]
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def get(self, obj_id: Any) -> Optional[ModelT]:
+        return await self.db_session.get(self.model, obj_id)
+
+    async def list(self, *where: Any, order_by: Any = None, limit: Optional[int] = None) -> List[ModelT]:
+        stmt = select(self.model).where(*where)
+        if order_by is not None:
+            stmt = stmt.order_by(order_by)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.db_session.execute(stmt)
+        return result.scalars().all()
+
+    async def first(self, *where: Any) -> Optional[ModelT]:
+        result = await self.db_session.execute(select(self.model).where(*where).limit(1))
+        return result.scalars().first()
+
+    async def add(self, obj: ModelT, commit: bool = True) -> ModelT:
+        self.db_session.add(obj)
+        if commit:
+            await self.db_session.commit()
+            await self.db_session.refresh(obj)
+        return obj
+
+    async def delete(self, obj: ModelT) -> None:
+        await self.db_session.delete(obj)
+        await self.db_session.commit()
@@ -0,0 +1,6 @@
+from app.models.bid_outcome import BidOutcome
+from app.repositories.base import BaseRepository
+
+
+class BidOutcomeRepository(BaseRepository[BidOutcome]):
+    model = BidOutcome
@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy.future import select
+
+from app.models.bid import Bid
+from app.models.profile import Profile
+from app.repositories.base import BaseRepository
+from app.repositories.pagination import after_cursor, split_page
+
+
+class BidRepository(BaseRepository[Bid]):
+    model = Bid
+
+    async def list_for_user(self, user_id: int) -> List[Bid]:
+        result = await self.db_session.execute(
+            select(Bid).join(Profile, Bid.profile_id == Profile.id).where(Profile.user_id == user_id)
+        )
+        return result.scalars().all()
+
+    async def job_ids_for_profile(self, profile_id: str) -> List[uuid.UUID]:
+        result = await self.db_session.execute(select(Bid.job_id).where(Bid.profile_id == profile_id))
+        return result.scalars().all()
+
+    async def page(
+        self,
+        limit: int,
+        columns: Sequence[str],
+        after: Optional[Tuple[datetime, str]] = None,
+        user_id: Optional[int] = None,
+        profile_id: Optional[str] = None,
+        status: Optional[str] = None,
+        submitted_from: Optional[datetime] = None,
+        submitted_to: Optional[datetime] = None,
+    ) -> Tuple[List[Any], bool]:
+        """
+        One page of bids, newest first, as rows with only ``columns`` (plus the
+        submitted_at/id sort key). Returns (rows, has_more).
+        """
+        selected = list(dict.fromkeys([*columns, "submitted_at", "id"]))
+        stmt = select(*(getattr(Bid, name) for name in selected))
+        if user_id is not None:
+            stmt = stmt.where(Bid.profile_id.in_(select(Profile.id).where(Profile.user_id == user_id)))
+        if profile_id is not None:
+            stmt = stmt.where(Bid.profile_id == profile_id)
+        if status is not None:
+            stmt = stmt.where(Bid.status == status)
+        if submitted_from is not None:
+            stmt = stmt.where(Bid.submitted_at >= submitted_from)
+        if submitted_to is not None:
+            stmt = stmt.where(Bid.submitted_at < submitted_to)
+        if after is not None:
+            stmt = stmt.where(after_cursor(Bid.submitted_at, Bid.id, *after))
+        stmt = stmt.order_by(Bid.submitted_at.desc(), Bid.id.desc()).limit(limit + 1)
+
+        result = await self.db_session.execute(stmt)
+        return split_page(result.all(), limit)
@@ -0,0 +1,98 @@
+import re
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, or_, text
+from sqlalchemy.future import select
+
+from app.models.job import Job
+from app.repositories.base import BaseRepository
+from app.repositories.pagination import after_cursor, split_page
+
+# Everything a list response carries; description_embedding (1,536 floats) is opt-in
+JOB_LIST_COLUMNS = ("id", "title", "description", "budget", "created_at")
+
+
+class JobRepository(BaseRepository[Job]):
+    model = Job
+
+    async def list_excluding(self, job_ids: Sequence, limit: int) -> List[Job]:
+        where = [Job.id.notin_(job_ids)] if job_ids else []
+        return await self.list(*where, limit=limit)
+
+    async def count(self) -> int:
+        result = await self.db_session.execute(select(func.count()).select_from(Job))
+        return result.scalar_one()
+
+    def search_clause(self, query: str) -> Optional[Any]:
+        """
+        WHERE clause for a full-text search over title and description:
+        the GIN-indexed search_vector on PostgreSQL, the jobs_fts FTS5 table on
+        SQLite, and a plain ILIKE anywhere else.
+        """
+        dialect = self.db_session.get_bind().dialect.name
+        if dialect == "postgresql":
+            return text(
+                "jobs.search_vector @@ websearch_to_tsquery('english', :fts_query)"
+            ).bindparams(fts_query=query)
+        if dialect == "sqlite":
+            # Quote every term so user input can't inject FTS5 syntax; terms are ANDed
+            terms = re.findall(r"\w+", query)
+            if not terms:
+                return None
+            return text(
+                "jobs.rowid IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH :fts_query)"
+            ).bindparams(fts_query=" ".join(f'"{term}"' for term in terms))
+        pattern = f"%{query}%"
+        return or_(Job.title.ilike(pattern), Job.description.ilike(pattern))
+
+    async def page(
+        self,
+        limit: int,
+        columns: Sequence[str] = JOB_LIST_COLUMNS,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+        query: Optional[str] = None,
+    ) -> Tuple[List[Any], bool]:
+        """One page of jobs, newest first, as rows of ``columns``. Returns (rows, has_more)."""
+        selected = list(dict.fromkeys([*columns, "created_at", "id"]))
+        stmt = select(*(getattr(Job, name) for name in selected))
+        if query:
+            clause = self.search_clause(query)
+            if clause is not None:
+                stmt = stmt.where(clause)
+        if after is not None:
+            stmt = stmt.where(after_cursor(Job.created_at, Job.id, *after))
+        stmt = stmt.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1)
+
+        result = await self.db_session.execute(stmt)
+        return split_page(result.all(), limit)
+
+    async def list_by_ids(self, job_ids: Sequence[uuid.UUID], columns: Sequence[str] = JOB_LIST_COLUMNS) -> List[Any]:
+        if not job_ids:
+            return []
+        result = await self.db_session.execute(
+            select(*(getattr(Job, name) for name in columns)).where(Job.id.in_(job_ids))
+        )
+        return result.all()
+
+    async def iter_embeddings(
+        self, exclude_id: uuid.UUID, chunk_size: int, max_rows: int
+    ) -> AsyncIterator[List[Tuple[uuid.UUID, List[float]]]]:
+        """(id, embedding) pairs of the newest ``max_rows`` embedded jobs, in keyset-paged chunks."""
+        after, seen = None, 0
+        while seen < max_rows:
+            stmt = (
+                select(Job.id, Job.created_at, Job.description_embedding)
+                .where(Job.description_embedding.isnot(None), Job.id != exclude_id)
+                .order_by(Job.created_at.desc(), Job.id.desc())
+                .limit(min(chunk_size, max_rows - seen))
+            )
+            if after is not None:
+                stmt = stmt.where(after_cursor(Job.created_at, Job.id, *after))
+            rows = (await self.db_session.execute(stmt)).all()
+            if not rows:
+                return
+            seen += len(rows)
+            after = (rows[-1].created_at, rows[-1].id)
+            yield [(row.id, row.description_embedding) for row in rows]
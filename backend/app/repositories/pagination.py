@@ -0,0 +1,53 @@
+"""
+Keyset (cursor) pagination.
+
+A page is fetched with ``WHERE (sort_col, id) < (last_sort, last_id) ORDER BY
+sort_col DESC, id DESC LIMIT n + 1`` against a composite index on
+``(..., sort_col, id)``, so every page is an index range scan of n + 1 rows no
+matter how deep it is, unlike OFFSET, which reads and discards every row before
+the page. The cursor handed to clients is the last row's (sort value, id),
+base64-encoded.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    raw = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), row_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(f"Malformed cursor: {cursor!r}") from e
+
+
+def after_cursor(sort_col: Any, id_col: Any, sort_value: datetime, row_id: Any):
+    """Rows strictly after (sort_value, row_id) in (sort_col DESC, id_col DESC) order."""
+    # Expanded rather than tuple_() so it works on every backend; both forms
+    # are a single index range on (sort_col, id_col).
+    return or_(sort_col < sort_value, and_(sort_col == sort_value, id_col < row_id))
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], bool]:
+    """Rows are fetched with LIMIT limit + 1; the extra row only says whether there is a next page."""
+    return list(rows[:limit]), len(rows) > limit
+
+
+def next_cursor(rows: Sequence[Any], has_more: bool, sort_attr: str, id_attr: str = "id") -> Optional[str]:
+    if not has_more or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_attr), getattr(last, id_attr))
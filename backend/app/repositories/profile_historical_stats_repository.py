@@ -0,0 +1,6 @@
+from app.models.profile_historical_stats import ProfileHistoricalStats
+from app.repositories.base import BaseRepository
+
+
+class ProfileHistoricalStatsRepository(BaseRepository[ProfileHistoricalStats]):
+    model = ProfileHistoricalStats
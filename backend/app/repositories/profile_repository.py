@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+from app.models.profile import Profile
+from app.repositories.base import BaseRepository
+
+
+class ProfileRepository(BaseRepository[Profile]):
+    model = Profile
+
+    async def list_for_user(self, user_id: int, profile_type: Optional[str] = None) -> List[Profile]:
+        where = [Profile.user_id == user_id]
+        if profile_type is not None:
+            where.append(Profile.profile_type == profile_type)
+        return await self.list(*where)
+
+    async def get_owned(self, profile_id: str, user_id: int) -> Optional[Profile]:
+        return await self.first(Profile.id == profile_id, Profile.user_id == user_id)
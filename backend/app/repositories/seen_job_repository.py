@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence, Set
+
+from sqlalchemy.future import select
+
+from app.models.seen_job import SeenJob
+from app.repositories.base import BaseRepository
+
+
+class SeenJobRepository(BaseRepository[SeenJob]):
+    model = SeenJob
+
+    async def existing_ids(self, job_ids: Sequence[str]) -> Set[str]:
+        if not job_ids:
+            return set()
+        result = await self.db_session.execute(select(SeenJob.job_id).where(SeenJob.job_id.in_(job_ids)))
+        return set(result.scalars().all())
+
+    async def insert_new(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """
+        Inserts the rows whose job_id is not stored yet, in one statement where the
+        dialect has INSERT ... ON CONFLICT DO NOTHING RETURNING. Returns the ids
+        actually inserted; does not commit.
+        """
+        if not rows:
+            return []
+        now = datetime.utcnow()
+        rows = [{"first_seen_at": now, **row} for row in rows]
+        dialect = self.db_session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            if dialect == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert
+            stmt = insert(SeenJob).values(rows).on_conflict_do_nothing(index_elements=["job_id"])
+            result = await self.db_session.execute(stmt.returning(SeenJob.job_id))
+            return list(result.scalars().all())
+
+        existing = await self.existing_ids([row["job_id"] for row in rows])
+        new_rows = [row for row in rows if row["job_id"] not in existing]
+        self.db_session.add_all(SeenJob(**row) for row in new_rows)
+        await self.db_session.flush()
+        return [row["job_id"] for row in new_rows]
+
+    async def iter_ids(self, chunk_size: int) -> AsyncIterator[List[str]]:
+        """Every stored job_id, in keyset-paged chunks."""
+        after = None
+        while True:
+            stmt = select(SeenJob.job_id).order_by(SeenJob.job_id).limit(chunk_size)
+            if after is not None:
+                stmt = stmt.where(SeenJob.job_id > after)
+            ids = (await self.db_session.execute(stmt)).scalars().all()
+            if not ids:
+                return
+            after = ids[-1]
+            yield list(ids)
@@ -0,0 +1,11 @@
+from typing import Optional
+
+from app.models.user import User
+from app.repositories.base import BaseRepository
+
+
+class UserRepository(BaseRepository[User]):
+    model = User
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return await self.first(User.email == email)
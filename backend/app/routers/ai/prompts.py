@@ -1,6 +1,8 @@
 # backend/app/routers/ai/prompts.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request # Add Request
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, Request # Add Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.limiter import limiter # Import the shared limiter instance
 # Используем ваш путь импорта get_db
@@ -24,7 +26,9 @@ from app.schemas.ai_prompt import ( # Import consolidated schemas
     AIPromptPreviewResponse,
 )
 # Импортируем ваш сервис
-from app.services.ai_prompt_service import generate_preview
+from app.services.ai_prompt_service import generate_preview, stream_preview
+from app.services.prompt_cache_service import invalidate_active_prompt
+from app.utils.token_streaming import stream_to_client
 
 router = APIRouter(
     prefix="/prompts",
@@ -54,6 +58,7 @@ async def create_prompt(
     # try-except для IntegrityError УБРАН для диагностики
     await db.commit()
     await db.refresh(prompt)
+    await invalidate_active_prompt(prompt.profile_id)
 
     # Используем model_validate вместо from_orm
     return AIPromptOut.model_validate(prompt) # Use new schema
@@ -106,6 +111,7 @@ async def update_prompt(
             detail=f"Prompt with id '{prompt_id}' not found",
         )
     
+    previous_profile_id = prompt.profile_id
     # Update fields from prompt_update schema
     update_data = prompt_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
@@ -118,6 +124,7 @@ async def update_prompt(
         await db.rollback()
         raise HTTPException(status_code=500,
                             detail=f"Database error during update: {e}")
+    await invalidate_active_prompt(previous_profile_id, prompt.profile_id)
     return AIPromptOut.model_validate(prompt) # Use new schema
 
 
@@ -141,6 +148,7 @@ async def delete_prompt(
         await db.rollback()
         raise HTTPException(status_code=500,
                             detail=f"Database error during deletion: {e}")
+    await invalidate_active_prompt(prompt.profile_id)
     return None
 
 
@@ -178,3 +186,23 @@ async def preview_prompt(
             detail=f"AI service error: {e}"
         )
     return AIPromptPreviewResponse(preview=generated_preview_text) # Use new schema
+
+
+@router.post("/preview/stream")
+@limiter.limit("5/minute")
+async def stream_prompt_preview(
+    request_data: AIPromptPreviewRequest,
+    request: Request, # Renamed for slowapi
+    background_tasks: BackgroundTasks,
+    client_id: Optional[str] = Query(None, description="Relay tokens to /ws/status/{client_id} instead of SSE"),
+    db: AsyncSession = Depends(get_db),
+):
+    """/preview, streamed: SSE events (token/done/error), or the WebSocket of client_id."""
+    stored = await db.get(ORMModelForPrompts, request_data.prompt_id)
+    if not stored:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Prompt template with id '{request_data.prompt_id}' not found",
+        )
+    full_text = f"{stored.prompt_text}\n\n{request_data.description}"
+    return stream_to_client(stream_preview(full_text), background_tasks, client_id)
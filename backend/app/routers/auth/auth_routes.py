@@ -3,7 +3,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession # Added
-from sqlalchemy.orm import Session # Will be removed if not used elsewhere
 
 from app.database import get_db
 from app.schemas.auth import RegisterInput, LoginInput, MessageResponse
@@ -82,4 +81,4 @@ async def logout_user( # Removed db: AsyncSession as it's not used by logout_use
     # The logout_user_service does not require db session based on its current implementation.
     # If it were to interact with the DB (e.g. for token blacklisting with DB),
     # then db: AsyncSession = Depends(get_db) would be needed here.
-    return await logout_user_service(credentials.credentials) # This service is synchronous
+    return logout_user_service(credentials.credentials) # This service is synchronous
@@ -1,12 +1,17 @@
 # backend/app/routers/autobidder/autobidder_routes.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models.ai_prompt import AIPrompt
+from app.repositories import AIPromptRepository
 from app.schemas.ai_prompt import AIPromptPreviewResponse as PreviewResponse
-from app.services.bid_generation_service import generate_bid_text_async
+from app.services import semantic_bid_cache
+from app.services.bid_generation_service import build_bid_prompt, generate_bid_text_async, stream_bid_text
+from app.services.llm_dispatcher import Priority
+from app.utils.token_streaming import stream_to_client
 
 
 router = APIRouter(
@@ -14,31 +19,54 @@ router = APIRouter(
     tags=["Autobidder"],
 )
 
+# Фейковый job description для примера
+PREVIEW_JOB = {
+    "description": (
+        "Ищем UX/UI‑дизайнера для редизайна SaaS‑продукта. "
+        "Требуется опыт с Figma и понимание user flow."
+    )
+}
+
 
 @router.post("/{prompt_id}/preview",
              response_model=PreviewResponse)  # Use the new schema
-def preview_prompt(
+async def preview_prompt(
     prompt_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     # Ищем промт в базе
-    prompt = db.query(AIPrompt).filter(AIPrompt.id == prompt_id).first()
+    prompt = await AIPromptRepository(db).get(prompt_id)
     if not prompt:
         raise HTTPException(status_code=404, detail="Prompt not found")
 
-    # Фейковый job description для примера
-    fake_job = {
-        "description": (
-            "Ищем UX/UI‑дизайнера для редизайна SaaS‑продукта. "
-            "Требуется опыт с Figma и понимание user flow."
-        )
-    }
-
     # Генерация текста через ваш сервис
-    preview_text = generate_bid_text_async(
-        fake_job,
+    preview_text = await generate_bid_text_async(
+        PREVIEW_JOB,
         profile_id=prompt.profile_id,
         db=db,
+        priority=Priority.INTERACTIVE,
     )
 
     return {"preview": preview_text}
+
+
+@router.post("/{prompt_id}/preview/stream")
+async def stream_prompt_preview(
+    prompt_id: int,
+    background_tasks: BackgroundTasks,
+    client_id: Optional[str] = Query(None, description="Relay tokens to /ws/status/{client_id} instead of SSE"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Same preview as above, streamed token by token (SSE, or the WebSocket of client_id)."""
+    prompt = await AIPromptRepository(db).get(prompt_id)
+    if not prompt:
+        raise HTTPException(status_code=404, detail="Prompt not found")
+    # The prompt is built up front: the session is not used once streaming starts
+    user_prompt = await build_bid_prompt(PREVIEW_JOB, profile_id=prompt.profile_id, db=db)
+    return stream_to_client(stream_bid_text(user_prompt), background_tasks, client_id)
+
+
+@router.get("/semantic-cache/stats")
+async def semantic_cache_stats():
+    """Hits, adapted hits, misses and hit rate of the semantic bid-text cache."""
+    return await semantic_bid_cache.get_stats()
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.limiter import limiter
+from app.models.user import User
+from app.repositories import ProfileRepository
+from app.schemas.autobid import BidBatchRequest
+from app.services.auth_service import get_current_db_user
+from app.services.bid_generation_service import generate_bids_batch
+from app.services.llm_dispatcher import Priority
+from app.utils.token_streaming import ndjson_response
+
+router = APIRouter(prefix="/drafts", tags=["Autobidder"])
+
+
+@router.post("/{profile_id}/batch")
+@limiter.limit(settings.BID_BATCH_RATE_LIMIT)  # up to BID_BATCH_MAX_JOBS paid LLM calls per request
+async def draft_bids_batch(
+    profile_id: str,
+    payload: BidBatchRequest,
+    request: Request,  # for slowapi
+    current_user: User = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Drafts bid texts for several jobs at once, for a profile of the current
+    user. The response is NDJSON, one BidBatchItem per line in completion
+    order; a failed job gets an error instead of a bid_text and does not stop
+    the others.
+    """
+    profile = await ProfileRepository(db).get(profile_id)
+    if profile is None or profile.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    jobs = [job.model_dump() for job in payload.jobs]
+    # The context is read here: the session is not used once streaming starts
+    results = await generate_bids_batch(profile_id, jobs, db, priority=Priority.INTERACTIVE)
+    return ndjson_response(results)
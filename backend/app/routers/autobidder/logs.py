@@ -1,18 +1,43 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
 from app.database import get_db
-from app.models.autobid_log import AutobidLog
-from app.schemas.autobid_log import AutobidLogOut
+from app.repositories import AutobidLogRepository
+from app.repositories.pagination import InvalidCursor, decode_cursor, next_cursor
+from app.schemas.autobid_log import AutobidLogPage, AutobidLogStats
+from app.services.autobid_log_analytics_service import get_log_stats
 
 router = APIRouter(prefix="/autobid-logs", tags=["Autobid Logs"])
 
 
-@router.get("/{profile_id}", response_model=list[AutobidLogOut])
-def get_logs_for_profile(profile_id: int, db: Session = Depends(get_db)):
-    logs = (
-        db.query(AutobidLog)
-        .filter(AutobidLog.profile_id == profile_id)
-        .order_by(AutobidLog.created_at.desc())
-        .all()
-    )
-    return logs
+@router.get("/{profile_id}", response_model=AutobidLogPage)
+async def get_logs_for_profile(
+    profile_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(settings.AUTOBID_LOGS_PAGE_DEFAULT_LIMIT, ge=1, le=settings.AUTOBID_LOGS_PAGE_MAX_LIMIT),
+    status: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    after = None
+    if cursor:
+        try:
+            created_at, log_id = decode_cursor(cursor)
+            after = (created_at, int(log_id))
+        except (InvalidCursor, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Malformed cursor: {e}")
+    logs, has_more = await AutobidLogRepository(db).page(profile_id, limit, after=after, status=status)
+    return {"items": logs, "next_cursor": next_cursor(logs, has_more, "created_at")}
+
+
+@router.get("/{profile_id}/stats", response_model=AutobidLogStats)
+async def get_log_stats_for_profile(
+    profile_id: str,
+    date_from: Optional[date] = Query(None, description="First day included"),
+    date_to: Optional[date] = Query(None, description="Last day included"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Counts by status, score histogram and per-day series, aggregated in the database."""
+    return await get_log_stats(db, profile_id, date_from=date_from, date_to=date_to)
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.user import User
+from app.repositories import ProfileRepository
+from app.schemas.autobid import AutobidSettingsOut, AutobidSettingsUpdate
+from app.services.auth_service import get_current_db_user
+from app.services.autobidder_settings_service import get_autobid_settings, upsert_autobid_settings
+
+router = APIRouter(prefix="/settings", tags=["Autobidder"])
+
+
+async def _check_owner(profile_id: str, current_user: User, db: AsyncSession) -> None:
+    profile = await ProfileRepository(db).get(profile_id)
+    if profile is None or profile.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+
+@router.get("/{profile_id}", response_model=AutobidSettingsOut)
+async def read_autobid_settings(
+    profile_id: str,
+    current_user: User = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_db),
+):
+    await _check_owner(profile_id, current_user, db)
+    return await get_autobid_settings(profile_id, db)
+
+
+@router.put("/{profile_id}", response_model=AutobidSettingsOut)
+async def update_autobid_settings(
+    profile_id: str,
+    payload: AutobidSettingsUpdate,
+    current_user: User = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Creates or updates the autobid settings of a profile of the current user.
+    An omitted min_success_proba or semantic_cache_enabled keeps its current
+    value.
+    """
+    await _check_owner(profile_id, current_user, db)
+    return await upsert_autobid_settings(
+        profile_id,
+        payload.enabled,
+        payload.daily_limit,
+        db,
+        min_success_proba=payload.min_success_proba,
+        semantic_cache_enabled=payload.semantic_cache_enabled,
+    )
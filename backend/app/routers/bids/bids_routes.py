@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
 from app.services.bids_service import (
     create_bid_service,
-    get_user_bids_service,
-    get_all_bids_service
+    list_bids_service,
 )
 from app.services.bid_outcome_service import create_bid_outcome_service
-from app.schemas.bid import BidCreate as BidCreateInput, BidResponse, Bid
+from app.services.auth_service import get_current_db_user
+from app.models.user import User
+from app.schemas.bid import BidCreate as BidCreateInput, BidResponse, Bid, BidPage
 from app.schemas.bid_outcome import BidOutcomeCreate, BidOutcome # Added imports
-from typing import List
 from app.auth.jwt import get_current_user_with_role
 from app.database import get_db
 # Potentially HTTPException if we were to handle errors directly here, but service does it.
@@ -19,37 +23,55 @@ router = APIRouter()
 
 @router.post("/", summary="Создать ставку",
              response_model=Bid)  # Use consolidated Bid schema
-def create_bid(
+async def create_bid(
     data: BidCreateInput, # Use BidCreateInput for creation
-    payload: dict = Depends(get_current_user_with_role),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    return create_bid_service(data, payload["user_id"], db)
+    return await create_bid_service(data, current_user, db)
 
 
 @router.get("/",
             summary="Получить все ставки пользователя или все (если superadmin)",
-            response_model=List[Bid]  # Use consolidated Bid schema
+            response_model=BidPage,
+            response_model_exclude_unset=True,  # fields left out by ?fields= are omitted, not null
             )
-def list_bids(
+async def list_bids(
     request: Request,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(settings.BIDS_PAGE_DEFAULT_LIMIT, ge=1, le=settings.BIDS_PAGE_MAX_LIMIT),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,amount"),
+    profile_id: Optional[str] = None,
+    status: Optional[str] = None,
+    submitted_from: Optional[datetime] = Query(None, description="Inclusive lower bound on submitted_at"),
+    submitted_to: Optional[datetime] = Query(None, description="Exclusive upper bound on submitted_at"),
     payload: dict = Depends(get_current_user_with_role),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_db_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    if payload["role"] == "superadmin":
-        return get_all_bids_service(db)
-    return get_user_bids_service(payload["user_id"], db)
+    return await list_bids_service(
+        current_user,
+        db,
+        all_users=payload["role"] == "superadmin",
+        cursor=cursor,
+        limit=limit,
+        fields=fields,
+        profile_id=profile_id,
+        status=status,
+        submitted_from=submitted_from,
+        submitted_to=submitted_to,
+    )
 
 
 @router.post("/{bid_id}/outcomes", response_model=BidOutcome, summary="Create a new outcome for a bid")
-def create_bid_outcome_endpoint(
+async def create_bid_outcome_endpoint(
     bid_id: str,
     outcome_data: BidOutcomeCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> BidOutcome:
     """
     Creates a new outcome for a specific bid.
     """
     # The create_bid_outcome_service will handle bid existence check and raise HTTPException if not found.
-    db_bid_outcome = create_bid_outcome_service(db=db, bid_id=bid_id, outcome_data=outcome_data)
+    db_bid_outcome = await create_bid_outcome_service(db=db, bid_id=bid_id, outcome_data=outcome_data)
     return db_bid_outcome
@@ -0,0 +1,18 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.auth.jwt import require_role
+from app.database import get_pool_status
+
+router = APIRouter()
+
+
+@router.get("/db")
+async def database_pool_metrics(requester: dict = Depends(require_role("superadmin"))) -> Dict[str, Any]:
+    """
+    Connection pool of this worker process: size and occupancy, how many
+    physical connections were opened, and how long checkouts waited.
+    Superadmins only.
+    """
+    return get_pool_status()
@@ -1,4 +1,5 @@
 import os # Added for MODEL_RELOAD_SECRET
+import asyncio
 import logging
 import joblib
 import pandas as pd
@@ -21,19 +22,27 @@ from pydantic import BaseModel
 # Placeholder for model path - should come from config
 # MODEL_PATH_STR = os.getenv("MODEL_PATH", "app/ml_model/artifacts/model.joblib")
 import logging # Moved logging import
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Request, Query, status
 from fastapi.responses import HTMLResponse # Added HTMLResponse
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.ml.training_runner import get_training_status, start_training_in_background
+
 # Import Pydantic Schemas from app.schemas.ml
-from app.schemas.ml import PredictionFeaturesInput, PredictionResponse, MetricsResponse # Added MetricsResponse
+from app.schemas.ml import PredictionFeaturesInput, PredictionResponse, MetricsResponse, MetricsSummary
 # Import the service functions
 from app.services.ml_service import (
     load_model_on_startup, # Can be called from main.py or here on app startup
+    get_loaded_model_version,
     predict_success_proba_service,
     get_model_metrics as get_model_metrics_service, # Renamed to avoid conflict
+    list_model_metrics as list_model_metrics_service,
     get_metrics_plot_html as get_metrics_plot_html_service # Renamed
 )
-from app.auth.jwt import get_current_user # For protected routes
+from app.auth.jwt import get_current_user, require_role # For protected routes
 
 logger = logging.getLogger(__name__)
 # logging.basicConfig should be configured in main.py or a logging config file.
@@ -53,7 +62,7 @@ internal_router = APIRouter(
 )
 
 # Shared secret for sensitive operations like model reloading
-MODEL_RELOAD_SECRET = os.getenv("MODEL_RELOAD_SECRET", "your-super-secret-key-for-model-reload")
+MODEL_RELOAD_SECRET = settings.MODEL_RELOAD_SECRET
 
 
 @router.post("/predict_success_proba", response_model=PredictionResponse) # Changed path to be more generic if needed
@@ -91,34 +100,72 @@ async def reload_model_endpoint(request: Request):
         logger.warning("Forbidden attempt to reload model: Invalid or missing reload secret.")
         raise HTTPException(status_code=403, detail="Forbidden: Invalid or missing reload secret.")
     
+    expected_version = None
     try:
-        # Call the model loading function from the service
-        # This assumes load_model_on_startup in the service updates the global MODEL state there.
-        load_model_on_startup() 
-        logger.info("ML model reload triggered successfully via service.")
-        # Note: To get previous/current status, the service function would need to return it.
-        return {"message": "ML model reload triggered via service."}
+        body = await request.json()
+        expected_version = body.get("model_version") if isinstance(body, dict) else None
+    except ValueError:
+        pass  # No JSON body: plain reload
+
+    try:
+        # Unpickling a model can take a while; keep it off the event loop.
+        # load_model_on_startup swaps the global MODEL in a single assignment.
+        await asyncio.to_thread(load_model_on_startup)
+        loaded_version = get_loaded_model_version()
+        if expected_version and loaded_version != expected_version:
+            logger.warning(f"Reload requested for model {expected_version}, but {loaded_version} is on disk.")
+        logger.info(f"ML model reloaded via service, version {loaded_version}.")
+        return {"message": "ML model reload triggered via service.", "model_version": loaded_version}
     except Exception as e:
         logger.error(f"Error during model reload via service: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to reload model via service: {str(e)}")
 
+@router.post("/training/run", status_code=status.HTTP_202_ACCEPTED)
+async def start_training_endpoint(
+    mode: str = Query("incremental", pattern="^(incremental|full)$"),
+    requester: dict = Depends(require_role("superadmin")),
+):
+    """Starts a training run in a separate process; poll /ml/training/status for progress. Superadmins only."""
+    if not start_training_in_background(mode):
+        raise HTTPException(status_code=409, detail="A training run is already in progress.")
+    logger.info(f"User {requester['sub']} started a {mode} training run.")
+    return {"message": f"{mode} training started."}
+
+@router.get("/training/status")
+async def training_status_endpoint(user_id: str = Depends(get_current_user)):
+    return {**get_training_status(), "loaded_model_version": get_loaded_model_version()}
+
 # Endpoints for metrics and plots, now calling service functions
 @router.get("/metrics", response_model=MetricsResponse)
-def get_metrics_endpoint(user_id: str = Depends(get_current_user)): # Protected
+async def get_metrics_endpoint(
+    model_version: Optional[str] = Query(None, description="Defaults to the loaded model"),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user), # Protected
+):
     logger.info(f"User {user_id} requesting model metrics.")
     try:
-        metrics = get_model_metrics_service()
-        return metrics
+        metrics = await get_model_metrics_service(db, model_version)
     except Exception as e:
         logger.error(f"Error fetching model metrics: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Could not fetch model metrics.")
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="No metrics recorded for this model version.")
+    return metrics
+
+@router.get("/metrics/versions", response_model=List[MetricsSummary])
+async def list_metrics_endpoint(
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+    user_id: str = Depends(get_current_user),
+):
+    """Evaluation summary of the most recent model versions, newest first."""
+    return await list_model_metrics_service(db, limit)
 
 @router.get("/metrics/plot", response_class=HTMLResponse) # HTMLResponse from fastapi.responses
-def get_metrics_plot_endpoint(user_id: str = Depends(get_current_user)): # Protected
-    from fastapi.responses import HTMLResponse # Ensure HTMLResponse is imported
+async def get_metrics_plot_endpoint(db: AsyncSession = Depends(get_db), user_id: str = Depends(get_current_user)): # Protected
     logger.info(f"User {user_id} requesting metrics plot.")
     try:
-        html_content = get_metrics_plot_html_service()
+        html_content = await get_metrics_plot_html_service(db)
         return HTMLResponse(content=html_content)
     except Exception as e:
         logger.error(f"Error generating metrics plot: {e}", exc_info=True)
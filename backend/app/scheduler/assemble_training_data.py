@@ -0,0 +1,19 @@
+import asyncio
+import logging
+
+from app.config import settings
+from app.ml.training_data import assemble_training_dataset
+
+logger = logging.getLogger(__name__)
+
+
+def assemble_training_data():
+    """Entry point for the "assemble" cron: rebuilds the columnar training set."""
+    manifest = asyncio.run(assemble_training_dataset(settings.TRAINING_DATA_DIR))
+    print(f"✅ Датасет собран: {manifest['n_rows']} строк, {len(manifest['shards'])} шардов -> {settings.TRAINING_DATA_DIR}")
+    return manifest
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    assemble_training_data()
@@ -1,5 +1,9 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from autobidder.autobid_logic import run_autobid
+from app.config import settings
+from app.ml.training_runner import run_training_job
+from app.services.autobid_log_analytics_service import refresh_rollups_job
+from app.services.retention_service import retention_job
 import time
 
 scheduler = BackgroundScheduler()
@@ -7,6 +11,23 @@ scheduler = BackgroundScheduler()
 def start_scheduler():
     # Uses the global scheduler instance
     scheduler.add_job(run_autobid, 'interval', minutes=2)
+    # Training itself runs in a separate process; this thread only waits for it.
+    scheduler.add_job(
+        run_training_job, 'cron',
+        hour=settings.TRAIN_CRON_HOUR, minute=settings.TRAIN_CRON_MINUTE,
+        id="nightly_training", max_instances=1, coalesce=True,
+    )
+    if settings.AUTOBID_LOG_ROLLUPS_ENABLED:
+        scheduler.add_job(
+            refresh_rollups_job, 'interval', minutes=settings.AUTOBID_LOG_ROLLUP_INTERVAL_MINUTES,
+            id="autobid_log_rollups", max_instances=1, coalesce=True,
+        )
+    if settings.RETENTION_ENABLED:
+        scheduler.add_job(
+            retention_job, 'cron',
+            hour=settings.RETENTION_CRON_HOUR, minute=settings.RETENTION_CRON_MINUTE,
+            id="nightly_retention", max_instances=1, coalesce=True,
+        )
     scheduler.start()
     print("✅ Автобидер по расписанию запущен.")
 
@@ -1,65 +1,34 @@
-import json
-import os
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.pipeline import make_pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report
-import joblib
-
-PROFILES_FILE = "profiles.json"
-JOBS_FILE = "jobs.json"
-RESPONSES_FILE = "responses_log.json"
-MODEL_FILE = "model.pkl"
-
-# 📥 Загрузка
-def load_json(path):
-    if not os.path.exists(path):
-        return []
-    with open(path) as f:
-        return json.load(f)
-
-profiles = load_json(PROFILES_FILE)
-jobs = load_json(JOBS_FILE)
-responses = load_json(RESPONSES_FILE)
-
-# 🔄 Создание обучающего датасета
-rows = []
-for profile in profiles:
-    for job in jobs:
-        row = {
-            "profile_id": profile["id"],
-            "job_id": job["id"],
-            "text": job["title"] + " " + job["description"],
-            "budget": job.get("budget", 0),
-            "keywords": " ".join(profile.get("filters", {}).get("include_keywords", [])),
-            "label": 1 if any(r["profile_id"] == profile["id"] and r["job_id"] == job["id"] for r in responses) else 0
-        }
-        rows.append(row)
-
-df = pd.DataFrame(rows)
-if df.empty:
-    print("❌ Нет данных для обучения")
-    exit()
-
-# 🧠 Обучение модели
-X = df["keywords"] + " " + df["text"]
-y = df["label"]
-
-pipeline = make_pipeline(
-    CountVectorizer(),
-    RandomForestClassifier(n_estimators=100, random_state=42)
-)
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-pipeline.fit(X_train, y_train)
-
-# 📊 Отчёт
-preds = pipeline.predict(X_test)
-print(classification_report(y_test, preds))
-
-# 💾 Сохраняем модель
-joblib.dump(pipeline, MODEL_FILE)
-print(f"✅ Модель сохранена в {MODEL_FILE}")
+import argparse
+import logging
+
+from app.ml.trainer import run_training
+from app.ml.training_data import TrainingDataError
+
+logger = logging.getLogger(__name__)
+
+
+def train_model(mode: str = "full"):
+    """
+    Trains the success-probability model from the database (see app/ml/trainer.py).
+    "full" rebuilds from the whole history, "incremental" continues the previous
+    model on outcomes that arrived since its checkpoint.
+    """
+    try:
+        result = run_training(mode)
+    except TrainingDataError as e:
+        print(f"❌ Нет данных для обучения: {e}")
+        return None
+
+    if result["mode"] == "noop":
+        print(f"ℹ️ Новых данных нет, модель {result['model_version']} не изменилась")
+    else:
+        print(f"✅ Модель {result['model_version']} ({result['mode']}) сохранена в {result['model_path']} (holdout: {result['holdout']})")
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Train the success-probability model.")
+    parser.add_argument("--mode", choices=["full", "incremental"], default="full")
+    args = parser.parse_args()
+    train_model(args.mode)
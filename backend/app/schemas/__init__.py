@@ -9,16 +9,17 @@ from .ai_prompt import (
 )
 from .auth import RegisterInput, LoginInput, MessageResponse
 from .autobid import AutobidSettingsUpdate, AutobidSettingsOut
-from .autobid_log import AutobidLogOut
-from .bid import BidBase, BidCreate, BidUpdate, Bid, BidResponse
+from .autobid_log import AutobidLogOut, AutobidLogPage, AutobidLogStats
+from .bid import BidBase, BidCreate, BidUpdate, Bid, BidResponse, BidProjection, BidPage
 from .bid_outcome import (
     BidOutcomeBase,
     BidOutcomeCreate,
     BidOutcomeUpdate,
     BidOutcome,
 )
-from .job import JobBase, JobCreate, JobUpdate, Job, JobInDB
+from .job import JobBase, JobCreate, JobUpdate, Job, JobInDB, JobPage, SimilarJob
 from .ml import PredictionFeaturesInput as MLModelFeatures, PredictionResponse as MLModelPrediction
+from .ml import MetricsResponse as MLModelMetrics, MetricsSummary as MLModelMetricsSummary
 from .profile import (
     ProfileBase,
     ProfileCreate,
@@ -57,11 +58,15 @@ __all__ = [
     "AutobidSettingsUpdate",
     "AutobidSettingsOut",
     "AutobidLogOut",
+    "AutobidLogPage",
+    "AutobidLogStats",
     "BidBase",
     "BidCreate",
     "BidUpdate",
     "Bid",
     "BidResponse",
+    "BidProjection",
+    "BidPage",
     "BidOutcomeBase",
     "BidOutcomeCreate",
     "BidOutcomeUpdate",
@@ -71,8 +76,12 @@ __all__ = [
     "JobUpdate",
     "Job",
     "JobInDB",
+    "JobPage",
+    "SimilarJob",
     "MLModelFeatures",
     "MLModelPrediction",
+    "MLModelMetrics",
+    "MLModelMetricsSummary",
     "ProfileBase",
     "ProfileCreate",
     "ProfileUpdate",
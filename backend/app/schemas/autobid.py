@@ -1,15 +1,41 @@
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.config import settings
 
 
 class AutobidSettingsUpdate(BaseModel):
     enabled: bool
     daily_limit: int
+    min_success_proba: Optional[float] = Field(None, ge=0, le=1)
+    semantic_cache_enabled: Optional[bool] = None
 
 
 class AutobidSettingsOut(BaseModel):
     profile_id: str
     enabled: bool
     daily_limit: int
+    min_success_proba: Optional[float] = None
+    semantic_cache_enabled: bool = False
 
     class Config:
         orm_mode = True
+
+
+class BidBatchJob(BaseModel):
+    id: Optional[str] = None  # echoed back as job_id
+    title: Optional[str] = None
+    description: str
+
+
+class BidBatchRequest(BaseModel):
+    jobs: List[BidBatchJob] = Field(..., min_length=1, max_length=settings.BID_BATCH_MAX_JOBS)
+
+
+class BidBatchItem(BaseModel):
+    """One line of the NDJSON response; lines arrive in completion order."""
+    index: int
+    job_id: Optional[str] = None
+    bid_text: Optional[str] = None
+    error: Optional[str] = None
@@ -1,17 +1,43 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date, datetime
+from typing import Dict, List, Optional
 
 
 class AutobidLogOut(BaseModel):
     id: int
-    profile_id: int
+    profile_id: str
     job_title: str
     job_link: str
     bid_text: Optional[str]
     status: str
+    score: Optional[float] = None
     error_message: Optional[str]
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AutobidLogPage(BaseModel):
+    items: List[AutobidLogOut]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to get the next page; null on the last page")
+
+
+class ScoreHistogramBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class DailyLogCount(BaseModel):
+    day: date
+    total: int
+    by_status: Dict[str, int]
+
+
+class AutobidLogStats(BaseModel):
+    profile_id: str
+    total: int
+    by_status: Dict[str, int]
+    score_histogram: List[ScoreHistogramBin] # Only non-empty bins
+    unscored: int # Logs without a score
+    daily: List[DailyLogCount]
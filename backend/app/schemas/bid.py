@@ -17,6 +17,7 @@ class BidBase(BaseModel):
     generated_bid_text: Optional[str] = Field(None, description="AI-generated bid text")
     bid_settings_snapshot: Optional[Dict[str, Any]] = Field(None, description="Snapshot of bid settings at creation")
     external_signals_snapshot: Optional[Dict[str, Any]] = Field(None, description="Snapshot of external signals at creation")
+    predicted_success_proba: Optional[float] = Field(None, ge=0, le=1, description="Model success probability at bid time")
 
 class BidCreate(BidBase):
     pass
@@ -42,3 +43,23 @@ class Bid(BidInDBBase):
 
 class BidResponse(Bid): # Specific response model, can be same as Bid or tailored
     pass
+
+BID_FIELDS = tuple(Bid.model_fields) # Fields a /bids listing can be projected to
+
+class BidProjection(BaseModel):
+    """A bid restricted to the fields requested with ?fields=; unset fields are omitted."""
+    id: Optional[str] = None
+    profile_id: Optional[str] = None
+    job_id: Optional[uuid.UUID] = None
+    amount: Optional[float] = None
+    status: Optional[str] = None
+    submitted_at: Optional[datetime] = None
+    prompt_template_id: Optional[int] = None
+    generated_bid_text: Optional[str] = None
+    bid_settings_snapshot: Optional[Dict[str, Any]] = None
+    external_signals_snapshot: Optional[Dict[str, Any]] = None
+    predicted_success_proba: Optional[float] = None
+
+class BidPage(BaseModel):
+    items: List[BidProjection]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to get the next page; null on the last page")
@@ -1,11 +1,13 @@
 import uuid
-from typing import Optional, Any
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import List, Optional, Any
+from pydantic import BaseModel, ConfigDict, Field
 
 class JobBase(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     description_embedding: Optional[Any] = None # Using Any for JSON type
+    budget: Optional[float] = None
 
 class JobCreate(JobBase):
     title: str # Title is required for creation
@@ -16,6 +18,7 @@ class JobUpdate(JobBase):
 
 class JobInDBBase(JobBase):
     id: uuid.UUID
+    created_at: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True)
 
 class Job(JobInDBBase):
@@ -23,3 +26,15 @@ class Job(JobInDBBase):
 
 class JobInDB(JobInDBBase): # If needed for DB representation
     pass
+
+class JobPage(BaseModel):
+    items: List[Job] # description_embedding only when ?include_embedding=true
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to get the next page; null on the last page")
+
+class SimilarJob(BaseModel):
+    id: uuid.UUID
+    title: Optional[str] = None
+    description: Optional[str] = None
+    budget: Optional[float] = None
+    created_at: Optional[datetime] = None
+    similarity: float = Field(..., description="Cosine similarity of the description embeddings")
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional # Added Dict, Any, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Dict, Any, List, Optional # Added Dict, Any, Optional
 
 
 # Schema for ML model prediction input
@@ -14,27 +15,41 @@ class PredictionResponse(BaseModel):
     model_info: Optional[str] = Field(None, description="Information about the model used for prediction") # Added model_info
 
 
-class MetricsResponse(BaseModel):
-    accuracy: float = Field(..., description="Model accuracy")
-    f1_score: float = Field(  # Using alias in case key has underscore
-        ..., alias="f1_score", description="Model F1 score"
-    )
-    recall: float = Field(..., description="Model recall")
-
-    # If these keys in the dictionary exactly match the field names
-    # (e.g. "f1_score"), then `alias` is not strictly necessary but can be
-    # good for explicitness.
-    # Pydantic V2 uses model_config for from_attributes (ORM mode) but
-    # these are from dicts. No specific config needed if field names
-    # match dict keys.
-    class Config:
-        # For Pydantic V2, if we were converting from an object with
-        # attributes that don't match field names, or need other specific
-        # behaviors:
-        # from_attributes = True # If it were from ORM
-        # populate_by_name = True # To allow using field names even if
-        # aliases are defined for serialization
-        pass  # No special config needed for simple dicts with matching keys
+class CalibrationBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+    mean_predicted: Optional[float] = None
+    fraction_positive: Optional[float] = None
+
+
+class MetricsSummary(BaseModel):
+    """One row of the version comparison table (no calibration detail)."""
+    model_version: str = Field(..., description="Model version recorded by the trainer")
+    parent_version: Optional[str] = Field(None, description="Version this model was incrementally trained from")
+    training_mode: Optional[str] = Field(None, description="full or incremental")
+    created_at: datetime
+    n_eval_rows: Optional[int] = None
+    auc: Optional[float] = Field(None, description="ROC AUC on the holdout")
+    log_loss: Optional[float] = None
+    brier_score: Optional[float] = None
+    expected_calibration_error: Optional[float] = None
+    threshold: Optional[float] = Field(None, description="Operating threshold used for the decision metrics")
+    precision_at_threshold: Optional[float] = None
+    recall_at_threshold: Optional[float] = None
+    k: Optional[int] = None
+    precision_at_k: Optional[float] = Field(None, description="Precision of the top-k candidates above the threshold")
+    latency_p50_ms: Optional[float] = None
+    latency_p95_ms: Optional[float] = None
+    latency_p99_ms: Optional[float] = None
+
+    model_config = ConfigDict(from_attributes=True, protected_namespaces=())
+
+
+class MetricsResponse(MetricsSummary):
+    n_train_rows: Optional[int] = None
+    positive_rate: Optional[float] = None
+    calibration: List[CalibrationBin] = Field(default_factory=list, description="Reliability table")
 
 # For GET /ml/charts/{chart_type}, if it were to return structured data:
 # class ChartResponse(BaseModel):
@@ -1,64 +1,104 @@
-from openai import AsyncOpenAI  # Используем асинхронный клиент
+import hashlib
+from typing import AsyncIterator, Optional
+
 from app.config import settings
 import logging # For logging cache operations
-from app.redis_cache import redis_cache_client # Import Redis cache client
+from app.services.llm_dispatcher import Priority, get_llm_dispatcher
+from app.tiered_cache import tiered_cache
 
 # Remove Old Cache Variables
 # preview_cache = {}
 # MAX_CACHE_SIZE = 100
 logger = logging.getLogger(__name__)
 
-# !!! Важно: Создайте клиент правильно !!!
-# Лучше создать его один раз при старте приложения или через DI FastAPI,
-# а не внутри каждой функции. Убедитесь, что API ключ доступен.
-# Пример (убедитесь, что ключ задан через переменную окружения OPENAI_API_KEY):
-client = AsyncOpenAI(
-    api_key=settings.OPENAI_API_KEY,
-    timeout=settings.OPENAI_TIMEOUT,
+# The OpenAI client lives in app/services/llm_dispatcher.py; every call goes
+# through the dispatcher so previews and autobid share the provider's limits.
+
+
+# Bump whenever PREVIEW_SYSTEM_PROMPT changes, so old previews stop matching.
+PREVIEW_PROMPT_VERSION = 1
+PREVIEW_SYSTEM_PROMPT = (
+    "You are a concise assistant. Generate a brief "
+    "preview or summary of the user's text."
 )
 
 
-async def generate_preview(full_text: str):
-    cache_key = f"preview_cache:{full_text}" # Define cache key with prefix
+def preview_cache_key(full_text: str) -> str:
+    """
+    Fixed-size key for a preview: sha256 of (model, prompt version,
+    whitespace-normalised text). The text itself is never stored in Redis.
+    """
+    normalized = " ".join(full_text.split())
+    material = f"{settings.OPENAI_MODEL}\x00{PREVIEW_PROMPT_VERSION}\x00{normalized}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
 
-    # Check Redis cache first
-    cached_result = await redis_cache_client.get(cache_key)
-    if cached_result is not None:
-        logger.info(f"Redis cache hit for generate_preview: {cache_key}")
-        return cached_result
 
-    logger.info(f"Redis cache miss for generate_preview: {cache_key}. Calling API.")
+def _preview_messages(full_text: str):
+    return [
+        {"role": "system", "content": PREVIEW_SYSTEM_PROMPT},
+        {"role": "user", "content": full_text},
+    ]
+
+
+@tiered_cache(
+    "preview_cache",
+    key=preview_cache_key,
+    l1_max_bytes=settings.PREVIEW_CACHE_L1_MAX_BYTES,
+    l2_max_bytes=settings.PREVIEW_CACHE_REDIS_MAX_BYTES,
+)
+async def _complete_preview(full_text: str) -> Optional[str]:
+    """One OpenAI call; None for an empty answer (not cached), API errors propagate."""
+    logger.info("Preview cache miss, calling API.")
+    chat_completion = await get_llm_dispatcher().complete(
+        Priority.INTERACTIVE,
+        model=settings.OPENAI_MODEL,  # Используем модель из настроек
+        messages=_preview_messages(full_text),
+    )
+    # Получаем результат (проверьте структуру ответа в док-ции V1+)
+    preview_text_obj = chat_completion.choices[0].message.content
+    return preview_text_obj.strip() if preview_text_obj else None
+
+
+async def generate_preview(full_text: str):
+    # L1 (in-process) -> Redis -> OpenAI; concurrent misses for the same text share one call
     try:
-        chat_completion = await client.chat.completions.create(
-            model=settings.OPENAI_MODEL,  # Используем модель из настроек
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a concise assistant. Generate a brief "
-                        "preview or summary of the user's text."
-                    ),
-                },
-                {"role": "user", "content": full_text},
-            ]
-        )
-        # Получаем результат (проверьте структуру ответа в док-ции V1+)
-        preview_text_obj = chat_completion.choices[0].message.content
-        
-        if preview_text_obj:
-            preview_text = preview_text_obj.strip()
-            # Store successful result in Redis
-            await redis_cache_client.set(cache_key, preview_text) 
-            # TTL is handled by redis_cache_client.set using settings.REDIS_CACHE_TTL_SECONDS
-            logger.info(f"Successfully cached new preview in Redis: {cache_key}")
-            return preview_text
-        else:
-            logger.warning("OpenAI returned empty preview text.")
-            return "Could not generate preview."
-            
+        preview_text = await _complete_preview(full_text)
     except Exception as e:
         # Добавьте логирование ошибки
         logger.error(f"Error calling OpenAI API: {e}", exc_info=True)
         # Верните сообщение об ошибке или выбросите исключение,
         # чтобы FastAPI мог вернуть 500 Internal Server Error
         return "Error generating preview due to API issue."
+    if preview_text is None:
+        logger.warning("OpenAI returned empty preview text.")
+        return "Could not generate preview."
+    return preview_text
+
+
+async def stream_preview(full_text: str) -> AsyncIterator[str]:
+    """
+    Yields the preview as it is generated. A cached preview is yielded in one
+    piece; a freshly streamed one is cached once complete, under the same key
+    generate_preview() uses. Errors propagate to the caller.
+    """
+    cache = _complete_preview.cache
+    key = preview_cache_key(full_text)
+    cached = await cache.lookup(key)
+    if cached is not None:
+        yield cached
+        return
+
+    stream = get_llm_dispatcher().stream(
+        Priority.INTERACTIVE,
+        model=settings.OPENAI_MODEL,
+        messages=_preview_messages(full_text),
+    )
+    parts = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            yield delta
+    preview_text = "".join(parts).strip()
+    if preview_text:
+        await cache.store(key, preview_text)
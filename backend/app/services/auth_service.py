@@ -1,8 +1,11 @@
-from fastapi import HTTPException
+from fastapi import Depends, HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.jwt import get_current_user_with_role
+from app.database import get_db
 from app.models.user import User
+from app.repositories import UserRepository
 from app.schemas.auth import RegisterInput, LoginInput
 from app.utils.auth import (
     get_password_hash,
@@ -63,13 +66,21 @@ async def verify_email_service(token: str, db: AsyncSession):
 
 
 async def get_current_user_service(payload: dict, db: AsyncSession):
-    user_result = await db.execute(select(User).where(User.email == payload.get("user_id")))
-    user = user_result.scalars().first()
+    # The JWT carries the email as "sub" (exposed as payload["user_id"]), not the numeric User.id
+    user = await UserRepository(db).get_by_email(payload.get("user_id"))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
+async def get_current_db_user(
+    payload: dict = Depends(get_current_user_with_role),
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """Dependency: the authenticated User row, for routes that key data by User.id."""
+    return await get_current_user_service(payload, db)
+
+
 def logout_user_service(token: str):
     # blacklist = TokenBlacklist(token=token) # F841 Unused local variable
     # Assuming the intention was to add the token to a blacklist.
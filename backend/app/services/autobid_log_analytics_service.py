@@ -0,0 +1,200 @@
+"""
+Server-side analytics over autobid_logs.
+
+get_log_stats() answers a dashboard with one GROUP BY over
+(day, status, score bucket) instead of shipping every raw log row to the
+client. With AUTOBID_LOG_ROLLUPS_ENABLED the days already folded into
+autobid_log_daily_rollups are read from there, and only logs newer than the
+rollup watermark are aggregated from the raw table, so a heavy profile costs a
+few hundred rollup rows plus a short tail. refresh_rollups() advances the
+watermark incrementally and is scheduled every AUTOBID_LOG_ROLLUP_INTERVAL_MINUTES.
+
+Ids become visible out of order: a transaction holding a lower id can commit
+after a higher one. A log at or below the watermark is never rolled up (nor
+read from the tail), so refresh_rollups() only folds logs older than
+AUTOBID_LOG_ROLLUP_LAG_SECONDS and stops below the oldest id newer than that,
+which may still have uncommitted neighbours.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Integer, case, cast, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config import settings
+from app.database import run_job_with_session
+from app.models.autobid_log import AutobidLog
+from app.models.autobid_log_rollup import AutobidLogDailyRollup, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_NAME = "autobid_log_daily"
+NO_SCORE_BUCKET = -1
+
+# (profile_id, day, status, score_bucket) -> count
+GroupKey = Tuple[str, date, str, int]
+
+
+def _as_date(value: Any) -> date:
+    # func.date() gives a date on PostgreSQL and an ISO string on SQLite
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _score_bucket():
+    # Scores are non-negative, so integer truncation is floor()
+    return case(
+        (AutobidLog.score.is_(None), NO_SCORE_BUCKET),
+        else_=cast(AutobidLog.score / settings.AUTOBID_LOG_SCORE_BUCKET_WIDTH, Integer),
+    )
+
+
+async def _aggregate_raw(db: AsyncSession, *where: Any) -> Dict[GroupKey, int]:
+    day, bucket = func.date(AutobidLog.created_at), _score_bucket()
+    result = await db.execute(
+        select(AutobidLog.profile_id, day, AutobidLog.status, bucket, func.count())
+        .where(*where)
+        .group_by(AutobidLog.profile_id, day, AutobidLog.status, bucket)
+    )
+    return {
+        (profile_id, _as_date(row_day), status, int(row_bucket)): count
+        for profile_id, row_day, status, row_bucket, count in result.all()
+    }
+
+
+async def get_watermark(db: AsyncSession) -> int:
+    watermark = await db.get(RollupWatermark, ROLLUP_NAME)
+    return watermark.last_id if watermark else 0
+
+
+def _fold(profile_id: str, groups: Iterable[Tuple[GroupKey, int]]) -> Dict[str, Any]:
+    width = settings.AUTOBID_LOG_SCORE_BUCKET_WIDTH
+    by_status: Dict[str, int] = defaultdict(int)
+    histogram: Dict[int, int] = defaultdict(int)
+    daily: Dict[date, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for (_, day, status, bucket), count in groups:
+        by_status[status] += count
+        histogram[bucket] += count
+        daily[day][status] += count
+    unscored = histogram.pop(NO_SCORE_BUCKET, 0)
+    return {
+        "profile_id": profile_id,
+        "total": sum(by_status.values()),
+        "by_status": dict(by_status),
+        "score_histogram": [
+            {"lower": round(b * width, 10), "upper": round((b + 1) * width, 10), "count": histogram[b]}
+            for b in sorted(histogram)
+        ],
+        "unscored": unscored,
+        "daily": [
+            {"day": day, "total": sum(counts.values()), "by_status": dict(counts)}
+            for day, counts in sorted(daily.items())
+        ],
+    }
+
+
+async def get_log_stats(
+    db: AsyncSession,
+    profile_id: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Dict[str, Any]:
+    """Counts by status, score histogram and per-day series for one profile; dates are inclusive."""
+    raw_where: List[Any] = [AutobidLog.profile_id == profile_id]
+    if date_from is not None:
+        raw_where.append(AutobidLog.created_at >= datetime.combine(date_from, datetime.min.time()))
+    if date_to is not None:
+        raw_where.append(AutobidLog.created_at < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+
+    groups: Dict[GroupKey, int] = defaultdict(int)
+    if settings.AUTOBID_LOG_ROLLUPS_ENABLED:
+        watermark = await get_watermark(db)
+        rollup_where: List[Any] = [AutobidLogDailyRollup.profile_id == profile_id]
+        if date_from is not None:
+            rollup_where.append(AutobidLogDailyRollup.day >= date_from)
+        if date_to is not None:
+            rollup_where.append(AutobidLogDailyRollup.day <= date_to)
+        rolled = await db.execute(select(AutobidLogDailyRollup).where(*rollup_where))
+        for row in rolled.scalars():
+            groups[(row.profile_id, row.day, row.status, row.score_bucket)] += row.count
+        raw_where.append(AutobidLog.id > watermark)
+
+    for key, count in (await _aggregate_raw(db, *raw_where)).items():
+        groups[key] += count
+    return _fold(profile_id, groups.items())
+
+
+def _upsert_rollups(db: AsyncSession, rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT DO UPDATE count = count + excluded.count, or None if unsupported."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    stmt = insert(AutobidLogDailyRollup).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["profile_id", "day", "status", "score_bucket"],
+        set_={"count": AutobidLogDailyRollup.count + stmt.excluded.count},
+    )
+
+
+async def refresh_rollups(db: AsyncSession) -> int:
+    """
+    Folds logs with ids in (watermark, watermark + AUTOBID_LOG_ROLLUP_BATCH],
+    up to the settled ones (see the module docstring), into the daily rollups and advances the watermark in the same
+    transaction. Returns the number of logs rolled up.
+    """
+    watermark = await db.get(RollupWatermark, ROLLUP_NAME)
+    if watermark is None:
+        watermark = RollupWatermark(name=ROLLUP_NAME, last_id=0)
+        db.add(watermark)
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.AUTOBID_LOG_ROLLUP_LAG_SECONDS)
+    settled_id = (await db.execute(
+        select(func.max(AutobidLog.id)).where(AutobidLog.created_at < cutoff)
+    )).scalar() or 0
+    oldest_recent_id = (await db.execute(
+        select(func.min(AutobidLog.id)).where(AutobidLog.id > watermark.last_id, AutobidLog.created_at >= cutoff)
+    )).scalar()
+    upper = min(settled_id, watermark.last_id + settings.AUTOBID_LOG_ROLLUP_BATCH)
+    if oldest_recent_id is not None:
+        upper = min(upper, oldest_recent_id - 1)
+    if upper <= watermark.last_id:
+        return 0
+
+    groups = await _aggregate_raw(db, AutobidLog.id > watermark.last_id, AutobidLog.id <= upper)
+    rows = [
+        {"profile_id": profile_id, "day": day, "status": status, "score_bucket": bucket, "count": count}
+        for (profile_id, day, status, bucket), count in groups.items()
+    ]
+    for start in range(0, len(rows), 500):
+        chunk = rows[start:start + 500]
+        stmt = _upsert_rollups(db, chunk)
+        if stmt is not None:
+            await db.execute(stmt)
+            continue
+        for row in chunk:
+            key = (row["profile_id"], row["day"], row["status"], row["score_bucket"])
+            existing = await db.get(AutobidLogDailyRollup, key)
+            if existing is None:
+                db.add(AutobidLogDailyRollup(**row))
+            else:
+                existing.count += row["count"]
+
+    rolled_up = sum(groups.values())
+    watermark.last_id = upper
+    watermark.updated_at = datetime.utcnow()
+    await db.commit()
+    logger.info(f"Rolled up {rolled_up} autobid logs into {len(rows)} daily groups (watermark {upper})")
+    return rolled_up
+
+
+def refresh_rollups_job() -> None:
+    """APScheduler entry point; failures are logged, never raised into the scheduler."""
+    try:
+        run_job_with_session(refresh_rollups)
+    except Exception as e:
+        logger.error(f"Autobid log rollup refresh failed: {e}", exc_info=True)
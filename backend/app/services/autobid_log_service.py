@@ -1,11 +1,12 @@
 from app.models.autobid_log import AutobidLog
-from sqlalchemy.orm import Session
+from app.repositories import AutobidLogRepository
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 
 
-def log_autobid_attempt(
-    db: Session,
-    profile_id: int,
+async def log_autobid_attempt(
+    db: AsyncSession,
+    profile_id: str,
     job_title: str,
     job_link: str,
     bid_text: str,
@@ -23,7 +24,4 @@ def log_autobid_attempt(
         created_at=datetime.utcnow(),
         score=score  # ← И сохраняем сюда
     )
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-    return log
+    return await AutobidLogRepository(db).add(log)
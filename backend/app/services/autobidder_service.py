@@ -1,23 +1,35 @@
+import asyncio
 import logging
 import httpx
 from datetime import datetime, timedelta # Added timedelta
 from typing import Dict, Any, Optional, List
 import uuid # Added uuid
 
-from sqlalchemy.orm import Session # Will change to AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError # For DB error handling
 from fastapi import HTTPException
 
 # Assuming these are the correct paths in the consolidated structure
-from app.database import SessionLocal # For creating new sessions if needed in standalone scripts/tasks
+from app.database import AsyncSessionLocal # For creating new sessions in standalone scripts/tasks
 from app.models.autobid_settings import AutobidSettings
 from app.models.profile import Profile
 from app.models.job import Job
 from app.models.profile_historical_stats import ProfileHistoricalStats
 from app.models.bid import Bid # For placing mock bids
 from app.models.autobid_log import AutobidLog # For logging attempts
+from app.repositories import (
+    AutobidLogRepository,
+    AutobidSettingsRepository,
+    BidRepository,
+    JobRepository,
+    ProfileHistoricalStatsRepository,
+    ProfileRepository,
+)
 
 from app.schemas.autobid import AutobidSettingsUpdate # For updating settings
+from app.services import semantic_bid_cache
+from app.services.bid_generation_service import generate_bids_batch
+from app.services.decision_engine import SKIP_BELOW_THRESHOLD, SKIP_NO_PREDICTION, select_bids
 # Schemas for ML prediction input/output will be handled by the ML service if called directly
 # from app.schemas.ml import PredictionFeaturesInput, PredictionResponse # Example
 
@@ -51,30 +63,21 @@ if not logger.hasHandlers():
 
 
 # --- AutobidSettings Management (from original autobidder_service.py) ---
-def get_settings_for_profile(profile_id: str, db: Session) -> Optional[AutobidSettings]:
+async def get_settings_for_profile(profile_id: str, db: AsyncSession) -> Optional[AutobidSettings]:
     # This function was part of the original backend/app/services/autobidder_service.py
     # It's kept here as it's directly related to autobidder settings.
-    # Note: The session management (db: Session) should be aligned with async practices if used in async contexts.
-    settings = db.query(AutobidSettings).filter(AutobidSettings.profile_id == profile_id).first()
-    if not settings:
-        logger.info(f"No AutobidSettings found for profile {profile_id}, creating default settings.")
-        settings = AutobidSettings(profile_id=profile_id) # Uses default values from model
-        db.add(settings)
-        try:
-            db.commit()
-            db.refresh(settings)
-            logger.info(f"Default AutobidSettings created for profile {profile_id}.")
-        except SQLAlchemyError as e:
-            db.rollback()
-            logger.error(f"Error creating default AutobidSettings for profile {profile_id}: {e}", exc_info=True)
-            # Don't raise HTTPException from here if this can be called outside HTTP context.
-            # Return None or re-raise a service-specific exception.
-            return None 
-    return settings
+    try:
+        return await AutobidSettingsRepository(db).get_or_create(profile_id) # Uses default values from model
+    except SQLAlchemyError as e:
+        await db.rollback()
+        logger.error(f"Error creating default AutobidSettings for profile {profile_id}: {e}", exc_info=True)
+        # Don't raise HTTPException from here if this can be called outside HTTP context.
+        # Return None or re-raise a service-specific exception.
+        return None
 
-def update_settings_for_profile(profile_id: str, data: AutobidSettingsUpdate, db: Session) -> Optional[AutobidSettings]:
+async def update_settings_for_profile(profile_id: str, data: AutobidSettingsUpdate, db: AsyncSession) -> Optional[AutobidSettings]:
     # Also from original backend/app/services/autobidder_service.py
-    settings = db.query(AutobidSettings).filter(AutobidSettings.profile_id == profile_id).first()
+    settings = await AutobidSettingsRepository(db).get(profile_id)
     if not settings:
         # Consistent with above, avoid HTTPException directly if possible.
         logger.warning(f"AutobidSettings not found for profile {profile_id} during update attempt.")
@@ -85,12 +88,14 @@ def update_settings_for_profile(profile_id: str, data: AutobidSettingsUpdate, db
         setattr(settings, key, value)
     
     try:
-        db.commit()
-        db.refresh(settings)
+        await db.commit()
+        await db.refresh(settings)
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error updating AutobidSettings for profile {profile_id}: {e}", exc_info=True)
         return None
+    if "semantic_cache_enabled" in update_data:
+        await semantic_bid_cache.invalidate_opt_in(profile_id)
     return settings
 
 # --- ML Integration Logic (from app/services/ai_prompt_service.py) ---
@@ -124,7 +129,7 @@ async def _get_ml_prediction(features: Dict[str, Any]) -> Optional[float]:
 def _assemble_features_for_prediction(
     job_to_bid_on: Job, 
     active_profile: Profile, 
-    db_for_historical: Session # Synchronous session for now
+    db_stats: Optional[ProfileHistoricalStats] # Loaded once per run by the caller
 ) -> Dict[str, Any]:
     prediction_input_features: Dict[str, Any] = {}
 
@@ -149,10 +154,6 @@ def _assemble_features_for_prediction(
              prediction_input_features[f'profile_{key}'] = value if value is not None else 0.0
 
     # 3. Historical Features
-    db_stats = db_for_historical.query(ProfileHistoricalStats).filter(
-        ProfileHistoricalStats.profile_id == active_profile.id
-    ).first()
-    
     stats_max_age_days = 1.5 
     default_stat_value = 0.0
     historical_feats_dict: Dict[str, Any] = {
@@ -183,24 +184,16 @@ def _assemble_features_for_prediction(
         for key, value in submission_time_feats.items():
             prediction_input_features[f'bid_temp_{key}'] = value if value is not None else -1 # -1 for time features if None
 
-    # Bid Settings Features (using profile's autobid settings as a proxy or defaults)
+    # Bid Settings Features
     # This part needs careful review based on how bid settings are determined for new auto-bids.
-    # For this example, we'll use defaults if not available on profile's autobid_settings.
-    autobid_settings = get_settings_for_profile(active_profile.id, db_for_historical) # Re-fetch or pass if already available
-    
+    # AutobidSettings has no default budget/duration fields, so defaults are used.
     # Mock snapshot, ideally derived from actual bidding strategy for this profile/job
     mock_bid_settings_snapshot = {
-        "budget": 100.0, # Default placeholder
+        "budget": job_to_bid_on.budget or 100.0, # Placeholder when the job has no budget
         "duration_weeks": 4, # Default placeholder
         "is_fixed_price": False, # Default placeholder
     }
-    # If settings are available, try to use more specific defaults
-    if autobid_settings:
-        # These fields (default_budget etc.) are not on AutobidSettings model currently.
-        # This implies they might come from Profile or a more complex settings object.
-        # For now, we stick to the simple mock_bid_settings_snapshot.
-        pass 
-        
+
     bid_settings_feats = featurize_bid_settings(mock_bid_settings_snapshot)
     if bid_settings_feats:
         for key, value in bid_settings_feats.items():
@@ -213,8 +206,8 @@ def _assemble_features_for_prediction(
             prediction_input_features[key] = 0.0
     return prediction_input_features
 
-def _log_autobid_attempt(
-    db: Session, profile_id: str, job_id: uuid.UUID, job_title: str, 
+async def _log_autobid_attempt(
+    db: AsyncSession, profile_id: str, job_id: uuid.UUID, job_title: str, 
     status: str, success_proba: Optional[float] = None, 
     bid_text: Optional[str] = None, error_message: Optional[str] = None
 ):
@@ -230,117 +223,132 @@ def _log_autobid_attempt(
             error_message=error_message,
             # created_at is default in model
         )
-        db.add(log_entry)
-        db.commit()
+        await AutobidLogRepository(db).add(log_entry, commit=False)
+        await db.commit()
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Error logging autobid attempt for profile {profile_id}, job {job_id}: {e}", exc_info=True)
 
 
 async def run_autobid_for_profile(profile_id: str):
-    db: Optional[Session] = None
+    async with AsyncSessionLocal() as db: # A session of its own for this background run
+        await _run_autobid_for_profile(profile_id, db)
+
+
+async def _run_autobid_for_profile(profile_id: str, db: AsyncSession):
     try:
-        db = SessionLocal() # Create a new synchronous session for this run
-        active_profile = db.query(Profile).filter(Profile.id == profile_id).first()
+        active_profile = await ProfileRepository(db).get(profile_id)
         if not active_profile:
             logger.error(f"Profile {profile_id} not found. Skipping autobid run.")
             return
         
-        autobid_settings = get_settings_for_profile(profile_id, db) # Use the function to get/create settings
+        autobid_settings = await get_settings_for_profile(profile_id, db) # Use the function to get/create settings
         if not autobid_settings or not autobid_settings.enabled:
             logger.info(f"Autobidder is disabled for profile {profile_id}. Skipping.")
             return
 
         logger.info(f"Running autobidder for profile: {active_profile.name} ({profile_id})")
 
-        potential_jobs: List[Job] = _discover_potential_jobs(db, active_profile)
+        potential_jobs: List[Job] = await _discover_potential_jobs(db, active_profile)
         if not potential_jobs:
             logger.info(f"No potential jobs found for profile {profile_id}.")
             return
         
         logger.info(f"Found {len(potential_jobs)} potential jobs for profile {profile_id}.")
 
-        bids_placed_count = 0
         daily_bid_limit = autobid_settings.daily_limit # From AutobidSettings model
-
-        for job_to_bid_on in potential_jobs:
-            if bids_placed_count >= daily_bid_limit:
-                logger.info(f"Daily bid limit ({daily_bid_limit}) reached for profile {profile_id}. Stopping.")
-                _log_autobid_attempt(db, profile_id, job_to_bid_on.id, job_to_bid_on.title, status="stopped_daily_limit")
-                break
-
-            logger.info(f"Processing job: {job_to_bid_on.title} (ID: {job_to_bid_on.id}) for profile {profile_id}")
-
-            prediction_input_features = _assemble_features_for_prediction(job_to_bid_on, active_profile, db)
-            success_proba = await _get_ml_prediction(prediction_input_features)
-
-            decision_status = ""
+        threshold = autobid_settings.min_success_proba
+        if threshold is None:
+            threshold = ML_PROBABILITY_THRESHOLD
+
+        # Score every candidate first so the daily limit goes to the best jobs,
+        # not to whichever were discovered first.
+        db_stats = await ProfileHistoricalStatsRepository(db).get(profile_id)
+        features_batch = [
+            _assemble_features_for_prediction(job, active_profile, db_stats) for job in potential_jobs
+        ]
+        probas = await asyncio.gather(*(_get_ml_prediction(features) for features in features_batch))
+        selected, skipped = select_bids(list(zip(potential_jobs, probas)), daily_bid_limit, threshold)
+
+        # Bid texts for all selected jobs in one batch: the LLM calls run concurrently
+        drafts = await generate_bids_batch(
+            profile_id, [{"id": c["job"].id, "description": c["job"].description} for c in selected], db
+        )
+        bid_texts = {item["index"]: item["bid_text"] async for item in drafts}
+
+        for index, candidate in enumerate(selected):
+            job_to_bid_on, success_proba = candidate["job"], candidate["success_proba"]
+            logger.info(
+                f"ML prediction for job {job_to_bid_on.id}: {success_proba:.4f} (>= threshold {threshold}), "
+                f"expected value {candidate['expected_value']:.2f}. Proceeding with bid."
+            )
+            bid_text = bid_texts.get(index)
+            if bid_text is None:
+                await _log_autobid_attempt(db, profile_id, job_to_bid_on.id, job_to_bid_on.title,
+                                           status="error_bid_generation", success_proba=success_proba,
+                                           error_message="Bid text generation failed.")
+                continue
+            # Mock bid placement
+            # _place_bid(db, active_profile, job_to_bid_on, success_proba, bid_text) # Actual bid placement;
+            # the created Bid should carry predicted_success_proba=success_proba for threshold tuning.
+            logger.info(f"MOCK_BID_PLACED: Job '{job_to_bid_on.title}', Profile '{active_profile.name}', Proba: {success_proba:.4f}")
+            await _log_autobid_attempt(db, profile_id, job_to_bid_on.id, job_to_bid_on.title,
+                                       status="bid_placed_ml_approved", success_proba=success_proba,
+                                       bid_text=bid_text)
+
+        for candidate in skipped:
+            job_to_bid_on, reason = candidate["job"], candidate["reason"]
             error_msg = None
-
-            if success_proba is None:
+            if reason == SKIP_NO_PREDICTION:
                 logger.warning(f"ML prediction failed for job {job_to_bid_on.id}. Skipping bid.")
                 decision_status = "skipped_ml_failure"
                 error_msg = "ML prediction service request failed or returned invalid data."
-            elif success_proba >= ML_PROBABILITY_THRESHOLD:
-                logger.info(f"ML prediction for job {job_to_bid_on.id}: {success_proba:.4f} (>= threshold {ML_PROBABILITY_THRESHOLD}). Proceeding with bid.")
-                # Mock bid placement
-                mock_bid_text = f"This is an auto-generated bid for {job_to_bid_on.title} by profile {active_profile.name}."
-                # _place_bid(db, active_profile, job_to_bid_on, success_proba, mock_bid_text) # Actual bid placement
-                
-                # For now, just log the decision to place bid
-                logger.info(f"MOCK_BID_PLACED: Job '{job_to_bid_on.title}', Profile '{active_profile.name}', Proba: {success_proba:.4f}")
-                bids_placed_count += 1
-                decision_status = "bid_placed_ml_approved"
-            else:
-                logger.info(f"ML prediction for job {job_to_bid_on.id}: {success_proba:.4f} (< threshold {ML_PROBABILITY_THRESHOLD}). Skipping bid.")
+            elif reason == SKIP_BELOW_THRESHOLD:
+                logger.info(f"ML prediction for job {job_to_bid_on.id}: {candidate['success_proba']:.4f} (< threshold {threshold}). Skipping bid.")
                 decision_status = "skipped_ml_rejected"
-            
-            _log_autobid_attempt(db, profile_id, job_to_bid_on.id, job_to_bid_on.title, 
-                                 status=decision_status, success_proba=success_proba, 
-                                 bid_text=mock_bid_text if "bid_placed" in decision_status else None, 
-                                 error_message=error_msg)
+            else:
+                decision_status = "stopped_daily_limit"
+            await _log_autobid_attempt(db, profile_id, job_to_bid_on.id, job_to_bid_on.title,
+                                       status=decision_status, success_proba=candidate["success_proba"],
+                                       error_message=error_msg)
 
+        bids_placed_count = sum(1 for text in bid_texts.values() if text is not None)
         logger.info(f"Autobidder run completed for profile {profile_id}. Bids placed: {bids_placed_count}")
 
     except Exception as e:
         logger.error(f"Unexpected error in run_autobid_for_profile for profile {profile_id}: {e}", exc_info=True)
-        if db: # Log error to autobid_log if possible, even if general error
-            _log_autobid_attempt(db, profile_id, uuid.uuid4(), "Unknown Job - Run Error", # job_id is fake here
-                                 status="error_autobid_run", error_message=str(e))
-    finally:
-        if db:
-            db.close()
+        # Log error to autobid_log if possible, even if general error
+        await db.rollback()
+        await _log_autobid_attempt(db, profile_id, uuid.uuid4(), "Unknown Job - Run Error", # job_id is fake here
+                                   status="error_autobid_run", error_message=str(e))
 
 # --- Mock/Placeholder Functions (to be replaced by actual implementation) ---
-def _discover_potential_jobs(db: Session, profile: Profile) -> List[Job]:
+async def _discover_potential_jobs(db: AsyncSession, profile: Profile) -> List[Job]:
     logger.warning("Using MOCKED job discovery. Replace with actual implementation.")
     try:
-        # Fetch up to 5 jobs not yet bid on by this profile.
+        # Fetch up to AUTOBID_CANDIDATE_POOL jobs not yet bid on by this profile.
         # This is a placeholder. Real logic would involve keyword matching, filtering, etc.
         
         # Get IDs of jobs already bid on by this profile
-        bid_on_job_ids = [bid.job_id for bid in db.query(Bid.job_id).filter(Bid.profile_id == profile.id).all()]
-        
-        jobs_query = db.query(Job)
-        if bid_on_job_ids:
-            jobs_query = jobs_query.filter(Job.id.notin_(bid_on_job_ids))
-        
-        jobs = jobs_query.limit(5).all()
+        bid_on_job_ids = await BidRepository(db).job_ids_for_profile(profile.id)
+
+        job_repository = JobRepository(db)
+        jobs = await job_repository.list_excluding(bid_on_job_ids, limit=settings.AUTOBID_CANDIDATE_POOL) # scored as one batch, see select_bids
 
-        if not jobs and db.query(Job).count() == 0:
+        if not jobs and await job_repository.count() == 0:
             logger.info("No jobs in DB, creating dummy jobs for autobidder testing.")
             # Use more specific UUIDs for dummy jobs if needed for consistency in tests
             dummy_job1_id = uuid.UUID("00000000-0000-0000-0000-000000000001")
             dummy_job2_id = uuid.UUID("00000000-0000-0000-0000-000000000002")
             
             # Check if dummy jobs exist before adding
-            if not db.get(Job, dummy_job1_id):
+            if not await job_repository.get(dummy_job1_id):
                  db.add(Job(id=dummy_job1_id, title="Test Job 1 from Autobidder", description="Python FastAPI developer needed for a short project.", description_embedding=[0.1]*1536))
-            if not db.get(Job, dummy_job2_id):
+            if not await job_repository.get(dummy_job2_id):
                  db.add(Job(id=dummy_job2_id, title="Test Job 2 from Autobidder", description="React frontend expert for web app.", description_embedding=[0.2]*1536))
-            db.commit() # Commit dummy jobs
+            await db.commit() # Commit dummy jobs
             # Re-query after adding
-            jobs = db.query(Job).filter(Job.id.notin_(bid_on_job_ids)).limit(5).all()
+            jobs = await job_repository.list_excluding(bid_on_job_ids, limit=settings.AUTOBID_CANDIDATE_POOL)
             
         return jobs
     except SQLAlchemyError as e:
@@ -353,7 +361,4 @@ def _discover_potential_jobs(db: Session, profile: Profile) -> List[Job]:
 # This service is intended to be run as a background task (e.g., by a scheduler).
 # If it needs to be exposed via an API endpoint (e.g., to trigger a run manually),
 # that would be handled in a router, which would then call `run_autobid_for_profile`.
-# The use of SessionLocal() here is for when this service is run independently.
-# If called from an API route with a FastAPI Depends(get_db) session, that session should be passed down.
-# For now, it's self-contained for background task execution.
-# Consider refactoring to use AsyncSession if performance becomes an issue and underlying I/O can be async.
+# run_autobid_for_profile opens its own AsyncSession from AsyncSessionLocal.
@@ -1,118 +1,142 @@
 # app/services/bid_generation_service.py
 
-import logging  # asyncio removed
-from sqlalchemy.orm import Session
-# Импортируем AsyncOpenAI и OpenAIError
-from openai import AsyncOpenAI, OpenAIError
-from app.models.ai_prompt import AIPrompt
-from app.services.score_helper import calculate_keyword_affinity_score
+import asyncio
+import logging
+from typing import AsyncIterator, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from openai import OpenAIError
 from app.config import settings
+from app.services.keyword_profile_service import get_top_keywords_for_profile
+from app.services.llm_dispatcher import Priority, get_llm_dispatcher
+from app.services.prompt_cache_service import CompiledPrompt, get_active_prompt
+from app.services import semantic_bid_cache
+from app.services.score_helper import calculate_keyword_affinity_score, keyword_affinity_score
 
 # --- Клиент OpenAI ---
-# Лучше инициализировать клиент один раз.
-# В реальном приложении его можно передавать через зависимости FastAPI.
-# Для простоты примера - создаем его здесь.
-# Убедитесь, что ваш API-ключ OpenAI доступен (например, через переменную
-# окружения OPENAI_API_KEY)
-try:
-    if settings.OPENAI_API_KEY:
-        client = AsyncOpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            timeout=settings.OPENAI_TIMEOUT,
-        )
-        openai_available = True
-    else:
-        logging.error("OpenAI API key not configured in settings. AI generation will be disabled.")
-        client = None
-        openai_available = False
-except Exception as e:
-    logging.error(
-        f"Failed to initialize OpenAI client even with API key: {e}. "
-        "AI generation will be disabled."
-    )
-    client = None
-    openai_available = False
+# Клиент и лимиты провайдера - в app/services/llm_dispatcher.py; все запросы
+# идут через диспетчер (приоритет: интерактивные превью выше автобида).
 # --------------------
 
 
-async def generate_bid_text_async(
+BID_MODEL = "gpt-4"  # Или другая модель, например gpt-3.5-turbo
+BID_SYSTEM_PROMPT = (
+    "You are a helpful assistant writing job proposals "
+    "for a freelancer."
+)
+NO_PROMPT_TEXT = "Здравствуйте! Заинтересован в вашем проекте."
+FALLBACK_TEXT = "Здравствуйте! Готов обсудить ваш проект."
+
+
+def _bid_request(user_prompt: str, **extra) -> dict:
+    return dict(
+        model=BID_MODEL,
+        messages=[
+            {"role": "system", "content": BID_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=0.7,
+        max_tokens=350,  # Немного увеличил лимит
+        **extra,
+    )
+
+
+async def build_bid_prompt(
         job: dict,
         profile_id: str,
-        db: Session) -> str:
+        db: AsyncSession) -> Optional[str]:
     """
-    Асинхронно генерирует текст отклика на вакансию с использованием AI.
+    Собирает пользовательский промпт для профиля; None, если у профиля нет
+    активного промпта.
     """
-    logging.info(f"Generating bid text for profile_id: {profile_id}")
-
-    # --- 1. Получение активного промпта для профиля ---
-    # ПРИМЕЧАНИЕ: Этот DB-запрос все еще синхронный. Если он станет узким местом,
-    # его нужно будет сделать асинхронным (с AsyncSession) или вынести в
-    # asyncio.to_thread.
+    # --- 1. Активный промпт профиля (кэш, см. prompt_cache_service) ---
     try:
-        prompt_obj: AIPrompt | None = (
-            db.query(AIPrompt)
-            .filter(AIPrompt.profile_id == profile_id, AIPrompt.is_active)
-            .first()
-        )
+        prompt = await get_active_prompt(db, profile_id)
     except Exception as e:
         logging.error(
             f"Database error fetching prompt for profile {profile_id}: {e}",
             exc_info=True
         )
-        prompt_obj = None
+        prompt = None
 
-    if not prompt_obj:
+    if prompt is None:
         logging.warning(
             f"No active prompt found for profile {profile_id}. "
             "Returning default text."
         )
-        return "Здравствуйте! Заинтересован в вашем проекте."
+        return None
 
-    # --- 2. Подготовка промпта для AI ---
+    # --- 2. Расчёт keyword-модификатора ---
     job_description = job.get("description", "")
-    user_prompt = prompt_obj.prompt_text.replace(
-        "{job_description}", job_description.strip()
-    )
-
-    # --- 3. Расчёт keyword-модификатора ---
-    # ПРИМЕЧАНИЕ: Эта функция тоже синхронная. При необходимости - в
-    # asyncio.to_thread.
     try:
-        modifier = calculate_keyword_affinity_score(
+        modifier = await calculate_keyword_affinity_score(
             db, profile_id, job_description
         )
-        # Добавляем для информации AI
-        user_prompt += f"\n\n[AI note: affinity score +{modifier}]"
     except Exception as e:
         logging.error(
             f"Error calculating keyword affinity for profile {profile_id}: {e}",
             exc_info=True
         )
-        # Продолжаем без модификатора
+        modifier = None  # Продолжаем без модификатора
+    return _render_bid_prompt(prompt, job_description, modifier)
+
+
+def _render_bid_prompt(
+        prompt: CompiledPrompt,
+        job_description: str,
+        modifier: Optional[float]) -> str:
+    # Шаблон скомпилирован заранее (prompt_cache_service)
+    user_prompt = prompt.render(job_description.strip())
+    if modifier is not None:
+        # Добавляем для информации AI
+        user_prompt += f"\n\n[AI note: affinity score +{modifier}]"
+    return user_prompt
+
+
+async def _complete_bid(
+        user_prompt: str,
+        lookup: Optional[semantic_bid_cache.SemanticLookup],
+        priority: Priority) -> str:
+    """
+    Один запрос к LLM (или ответ из семантического кэша, если профиль его
+    включил). Ошибки не перехватываются.
+    """
+    if lookup is not None:
+        cached_text = await lookup.find(priority)
+        if cached_text is not None:
+            logging.info(f"Bid text for profile {lookup.profile_id} served from the semantic cache.")
+            return cached_text
+
+    response = await get_llm_dispatcher().complete(priority, **_bid_request(user_prompt))
+    generated_text = response.choices[0].message.content.strip()
+    if lookup is not None:
+        await lookup.remember(generated_text)
+    return generated_text
+
+
+async def generate_bid_text_async(
+        job: dict,
+        profile_id: str,
+        db: AsyncSession,
+        priority: Priority = Priority.BACKGROUND) -> str:
+    """
+    Асинхронно генерирует текст отклика на вакансию с использованием AI.
+    """
+    logging.info(f"Generating bid text for profile_id: {profile_id}")
+    user_prompt = await build_bid_prompt(job, profile_id, db)
+    if user_prompt is None:
+        return NO_PROMPT_TEXT
 
     # --- 4. Генерация через OpenAI (асинхронно) ---
-    if not openai_available or client is None:
+    dispatcher = get_llm_dispatcher()
+    if not dispatcher.is_available():
         logging.warning("OpenAI client not available. Returning default text.")
-        return "Здравствуйте! Готов обсудить ваш проект."
+        return FALLBACK_TEXT
 
     try:
+        # Семантический кэш (если профиль его включил): похожая вакансия -> готовый текст
+        lookup = await semantic_bid_cache.lookup_for(db, profile_id, job.get("description", ""))
         logging.debug(f"Sending prompt to OpenAI for profile {profile_id}...")
-        response = await client.chat.completions.create(
-            model="gpt-4",  # Или другая модель, например gpt-3.5-turbo
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant writing job proposals "
-                        "for a freelancer."
-                    ),
-                },
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.7,
-            max_tokens=350  # Немного увеличил лимит
-        )
-        generated_text = response.choices[0].message.content.strip()
+        generated_text = await _complete_bid(user_prompt, lookup, priority)
         logging.info(
             f"Successfully generated bid text for profile {profile_id}."
         )
@@ -131,6 +155,112 @@ async def generate_bid_text_async(
             f"Unexpected error during generation for profile {profile_id}: {e}",
             exc_info=True
         )
-        return "Здравствуйте! Готов обсудить ваш проект."
+        return FALLBACK_TEXT
+
+
+async def generate_bids_batch(
+        profile_id: str,
+        jobs: List[dict],
+        db: AsyncSession,
+        priority: Priority = Priority.BACKGROUND) -> AsyncIterator[dict]:
+    """
+    Генерирует отклики профиля сразу на несколько вакансий.
+
+    Контекст (активный промпт, ключевые слова, настройка семантического кэша)
+    читается из БД один раз, здесь же; возвращаемый итератор сессию уже не
+    использует, поэтому его можно отдавать в StreamingResponse. Запросы к LLM
+    идут параллельно, не больше BID_BATCH_CONCURRENCY одновременно, а
+    результаты отдаются по мере готовности (не в порядке ``jobs``):
+    {"index", "job_id", "bid_text", "error"}. Ошибка одной вакансии не
+    прерывает пакет: у неё bid_text None и текст ошибки в error.
+    """
+    logging.info(f"Generating {len(jobs)} bid texts for profile_id: {profile_id}")
+    try:
+        prompt = await get_active_prompt(db, profile_id)
+    except Exception as e:
+        logging.error(f"Database error fetching prompt for profile {profile_id}: {e}", exc_info=True)
+        prompt = None
+    if prompt is None:
+        return _constant_results(jobs, NO_PROMPT_TEXT)
+    if not get_llm_dispatcher().is_available():
+        logging.warning("OpenAI client not available. Returning default text.")
+        return _constant_results(jobs, FALLBACK_TEXT)
+
+    try:
+        top_keywords = await get_top_keywords_for_profile(db, profile_id)
+    except Exception as e:
+        logging.error(f"Error fetching keywords for profile {profile_id}: {e}", exc_info=True)
+        top_keywords = None  # Продолжаем без модификатора
+    try:
+        semantic_tenant = await semantic_bid_cache.tenant_for(db, profile_id)
+    except Exception as e:
+        logging.error(f"Error reading semantic cache opt-in for profile {profile_id}: {e}", exc_info=True)
+        semantic_tenant = None
+    return _draft_all(profile_id, jobs, prompt, top_keywords, semantic_tenant, priority)
+
+
+def _batch_result(jobs: List[dict], index: int, bid_text: Optional[str], error: Optional[str] = None) -> dict:
+    return {"index": index, "job_id": jobs[index].get("id"), "bid_text": bid_text, "error": error}
+
+
+async def _constant_results(jobs: List[dict], text: str) -> AsyncIterator[dict]:
+    for index in range(len(jobs)):
+        yield _batch_result(jobs, index, text)
+
+
+async def _draft_all(
+        profile_id: str,
+        jobs: List[dict],
+        prompt: CompiledPrompt,
+        top_keywords: Optional[List[str]],
+        semantic_tenant: Optional[str],
+        priority: Priority) -> AsyncIterator[dict]:
+    semaphore = asyncio.Semaphore(settings.BID_BATCH_CONCURRENCY)
+
+    async def draft(index: int) -> dict:
+        job_description = jobs[index].get("description") or ""
+        async with semaphore:
+            try:
+                modifier = None if top_keywords is None else keyword_affinity_score(top_keywords, job_description)
+                lookup = (semantic_bid_cache.SemanticLookup(profile_id, semantic_tenant, prompt.digest, job_description)
+                          if semantic_tenant is not None else None)
+                user_prompt = _render_bid_prompt(prompt, job_description, modifier)
+                return _batch_result(jobs, index, await _complete_bid(user_prompt, lookup, priority))
+            except Exception as e:
+                logging.error(f"Batch generation failed for job #{index} of profile {profile_id}: {e}", exc_info=True)
+                return _batch_result(jobs, index, None, str(e) or type(e).__name__)
+
+    tasks = [asyncio.create_task(draft(index)) for index in range(len(jobs))]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Клиент ушёл или вызывающий прекратил чтение: незавершённые запросы не нужны
+        for task in tasks:
+            task.cancel()
+
+
+async def stream_bid_text(
+        user_prompt: Optional[str],
+        priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[str]:
+    """
+    Потоковая генерация: отдаёт фрагменты текста по мере ответа модели.
+    user_prompt - результат build_bid_prompt (БД нужна только до начала
+    потока). Ошибки OpenAI пробрасываются вызывающему.
+    """
+    if user_prompt is None:
+        yield NO_PROMPT_TEXT
+        return
+    dispatcher = get_llm_dispatcher()
+    if not dispatcher.is_available():
+        logging.warning("OpenAI client not available. Returning default text.")
+        yield FALLBACK_TEXT
+        return
+
+    stream = dispatcher.stream(priority, **_bid_request(user_prompt))
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
 
 # --- Тут могут быть другие функции сервиса ---
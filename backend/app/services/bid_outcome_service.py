@@ -1,16 +1,16 @@
-from sqlalchemy.orm import Session # Changed to Session for now, will update to AsyncSession later
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
-from app.models.bid import Bid
 from app.models.bid_outcome import BidOutcome
+from app.repositories import BidOutcomeRepository, BidRepository
 from app.schemas.bid_outcome import BidOutcomeCreate
 
-def create_bid_outcome_service(db: Session, bid_id: str, outcome_data: BidOutcomeCreate) -> BidOutcome:
+async def create_bid_outcome_service(db: AsyncSession, bid_id: str, outcome_data: BidOutcomeCreate) -> BidOutcome:
     """
     Creates a new bid outcome for a given bid.
     """
     # Verify Bid Existence
-    db_bid = db.query(Bid).filter(Bid.id == bid_id).first()
+    db_bid = await BidRepository(db).get(bid_id)
     if not db_bid:
         raise HTTPException(status_code=404, detail="Bid not found")
 
@@ -18,43 +18,9 @@ def create_bid_outcome_service(db: Session, bid_id: str, outcome_data: BidOutcom
     # BidOutcome.id is generated by default in the model
     db_outcome = BidOutcome(
         bid_id=bid_id, # or db_bid.id
-        outcome_timestamp=outcome_data.outcome_timestamp if outcome_data.outcome_timestamp else None, # Handle optional timestamp
         is_success=outcome_data.is_success,
         details=outcome_data.details
     )
-
-    # Database operations
-    db.add(db_outcome)
-    db.commit()
-    db.refresh(db_outcome)
-
-    return db_outcome
-
-# Placeholder for async version and service class structure
-# class BidOutcomeService:
-#     def __init__(self, db_session: AsyncSession):
-#         self.db_session = db_session
-
-#     async def create_bid_outcome(self, bid_id: str, outcome_data: BidOutcomeCreate) -> BidOutcome:
-#         # Similar logic as above, but async
-#         # ...
-#         pass
-
-from app.database import get_db # Assuming get_db provides AsyncSession
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import AsyncSession # Ensure AsyncSession is imported
-
-# class BidOutcomeService: # If using a class-based service
-#     def __init__(self, db_session: AsyncSession):
-#         self.db_session = db_session
-#     # ... methods ...
-
-# For now, the service is a function, so no class-based provider.
-# If it were a class, it would be:
-# async def get_bid_outcome_service(db: AsyncSession = Depends(get_db)) -> BidOutcomeService:
-#     return BidOutcomeService(db)
-
-# Since create_bid_outcome_service is a standalone function, it doesn't need a "service getter".
-# It's used directly where needed, with `db: Session = Depends(get_db)` passed to it from the router.
-# If we refactor it into a class `BidOutcomeService`, then the above provider would be relevant.
-# For now, no changes needed here for a provider.
+    if outcome_data.outcome_timestamp: # Otherwise the model default (now) applies
+        db_outcome.outcome_timestamp = outcome_data.outcome_timestamp
+    return await BidOutcomeRepository(db).add(db_outcome)
@@ -1,26 +1,23 @@
 from uuid import uuid4
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from datetime import datetime
+from typing import Any, Dict, Optional
 import json # Added import
-import asyncio # Added import
 from app.websocket_manager import manager # Added import
 
 from app.models.bid import Bid
-from app.models.profile import Profile
+from app.models.user import User
+from app.repositories import BidRepository, ProfileRepository
+from app.repositories.pagination import InvalidCursor, decode_cursor, next_cursor
 # Removed BidOutcome import as it's now in bid_outcome_service
-from app.schemas.bid import BidCreate as BidCreateInput
+from app.schemas.bid import BID_FIELDS, BidCreate as BidCreateInput
 # Removed BidOutcomeCreate import
 
-# Ensure Job model is imported if used for job_id validation, though not directly used in this snippet
-# from app.models.job import Job 
 
-
-def create_bid_service(data: BidCreateInput, user_id: str, db: Session):
+async def create_bid_service(data: BidCreateInput, user: User, db: AsyncSession):
     # Проверка профиля
-    profile = db.query(Profile).filter(
-        Profile.id == data.profile_id,
-        Profile.user_id == user_id).first() # Corrected field to user_id
+    profile = await ProfileRepository(db).get_owned(data.profile_id, user.id)
     if not profile:
         raise HTTPException(
             status_code=403,
@@ -37,11 +34,10 @@ def create_bid_service(data: BidCreateInput, user_id: str, db: Session):
         prompt_template_id=data.prompt_template_id,
         generated_bid_text=data.generated_bid_text,
         bid_settings_snapshot=data.bid_settings_snapshot,
-        # external_signals_snapshot is not in BidCreateInput, handle if needed
+        external_signals_snapshot=data.external_signals_snapshot,
+        predicted_success_proba=data.predicted_success_proba,
     )
-    db.add(new_bid)
-    db.commit()
-    db.refresh(new_bid)
+    new_bid = await BidRepository(db).add(new_bid)
 
     # WebSocket broadcast logic
     message_data = {
@@ -53,16 +49,48 @@ def create_bid_service(data: BidCreateInput, user_id: str, db: Session):
         "amount": new_bid.amount,
         "submitted_at": new_bid.submitted_at.isoformat()
     }
-    # profile.owner_id is essentially user_id here, which is the client_id for WebSocket
-    asyncio.create_task(manager.broadcast_to_client(json.dumps(message_data), user_id))
-    
-    return new_bid
+    # WebSocket clients subscribe with the account email (the JWT subject)
+    await manager.broadcast_to_client(json.dumps(message_data), user.email)
 
+    return new_bid
 
-def get_user_bids_service(user_id: str, db: Session):
-    return db.query(Bid).join(Profile).filter(
-        Profile.user_id == user_id).all() # Corrected field to user_id
 
+async def list_bids_service(
+    user: User,
+    db: AsyncSession,
+    all_users: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+    fields: Optional[str] = None,
+    profile_id: Optional[str] = None,
+    status: Optional[str] = None,
+    submitted_from: Optional[datetime] = None,
+    submitted_to: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    One keyset page of bids, newest first. Only superadmins see other users'
+    bids (all_users=True). ``fields`` is a comma-separated projection.
+    """
+    columns = [name.strip() for name in fields.split(",") if name.strip()] if fields else list(BID_FIELDS)
+    unknown = [name for name in columns if name not in BID_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-def get_all_bids_service(db: Session):
-    return db.query(Bid).all()
+    rows, has_more = await BidRepository(db).page(
+        limit,
+        columns,
+        after=after,
+        user_id=None if all_users else user.id,
+        profile_id=profile_id,
+        status=status,
+        submitted_from=submitted_from,
+        submitted_to=submitted_to,
+    )
+    return {
+        "items": [{name: row._mapping[name] for name in columns} for row in rows],
+        "next_cursor": next_cursor(rows, has_more, "submitted_at"),
+    }
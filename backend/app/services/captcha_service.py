@@ -1,48 +1,353 @@
 # app/services/captcha_service.py
-import httpx
-import os # Keep os if needed for other parts, otherwise remove
+"""
+Captcha solving without blocking the browser flow.
+
+get_captcha_service().submit(url, sitekey) sends the task to a solver right
+away and returns an asyncio.Future for the token. The caller keeps working
+(moving the mouse, reading the page, other profiles' steps) and awaits the
+future only when the token is needed. solve() is submit() + await.
+
+* One polling loop per service checks every pending task, with one shared
+  HTTP client. Each round's result requests run concurrently.
+* Adaptive intervals: a task's first poll comes at about 80% of the provider's
+  recent solve time (exponential average, CAPTCHA_EXPECTED_SOLVE_SECONDS
+  before anything is known). After that it polls every
+  CAPTCHA_MIN_POLL_SECONDS, backing off to CAPTCHA_MAX_POLL_SECONDS.
+* Failover: providers are tried in order: CAPTCHA_PROVIDER, then
+  CAPTCHA_FALLBACK_PROVIDERS. A provider that fails to create a task, reports
+  an error or runs past CAPTCHA_TIMEOUT_SECONDS hands the task to the next
+  one, and is skipped for CAPTCHA_PROVIDER_COOLDOWN_SECONDS.
+* Token cache: prefetch(url, sitekey) solves ahead of time. Its token, and any
+  token whose caller has gone away, is kept per site key for
+  CAPTCHA_TOKEN_TTL_SECONDS. The next submit() for that site key takes it
+  instead of paying for a new solve. Tokens are single-use, so each one is
+  handed out once.
+
+CAPTCHA_PROVIDER="mock" uses MockCaptchaProvider: local, no key, solves after
+a configurable delay. It is meant for tests and dry runs.
+"""
 import asyncio
-from app.config import settings # Import settings
+import logging
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+HCAPTCHA_TASK_TYPE = "HCaptchaTaskProxyless"
+PROVIDER_ENDPOINTS = {
+    "capmonster": ("CAPMONSTER_CREATE_TASK_URL", "CAPMONSTER_GET_TASK_URL"),
+    "2captcha": ("TWOCAPTCHA_CREATE_TASK_URL", "TWOCAPTCHA_GET_TASK_URL"),
+}
+
+
+class CaptchaError(RuntimeError):
+    """A solver could not create or solve a task."""
+
+
+# --- Providers ---
+
+class CreateTaskProvider:
+    """
+    The createTask / getTaskResult JSON API spoken by CapMonster, 2Captcha (v2)
+    and Anti-Captcha.
+    """
+
+    def __init__(self, name: str, api_key: str, create_url: str, result_url: str):
+        self.name = name
+        self.api_key = api_key
+        self.create_url = create_url
+        self.result_url = result_url
+
+    async def create_task(self, client: httpx.AsyncClient, url: str, sitekey: str) -> Any:
+        task = {"type": HCAPTCHA_TASK_TYPE, "websiteURL": url, "websiteKey": sitekey}
+        resp = await client.post(self.create_url, json={"clientKey": self.api_key, "task": task})
+        data = resp.json()
+        if data.get("errorId") or not data.get("taskId"):
+            raise CaptchaError(f"❌ Не удалось создать задачу ({self.name}): {resp.text}")
+        return data["taskId"]
+
+    async def _result(self, client: httpx.AsyncClient, task_id: Any) -> Any:
+        try:
+            resp = await client.post(self.result_url, json={"clientKey": self.api_key, "taskId": task_id})
+            data = resp.json()
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Polling {self.name} task {task_id} failed, will retry: {e}")
+            return None
+        if data.get("errorId"):
+            return CaptchaError(f"{self.name} task {task_id}: {data.get('errorCode')} {data.get('errorDescription')}")
+        if data.get("status") != "ready":
+            return None
+        solution = data.get("solution") or {}
+        return solution.get("gRecaptchaResponse") or solution.get("token") or CaptchaError(
+            f"{self.name} task {task_id} is ready without a token: {data}"
+        )
+
+    async def get_results(self, client: httpx.AsyncClient, task_ids: List[Any]) -> Dict[Any, Any]:
+        """task_id -> token, None (not ready yet) or a CaptchaError."""
+        results = await asyncio.gather(*(self._result(client, task_id) for task_id in task_ids))
+        return dict(zip(task_ids, results))
+
+
+class MockCaptchaProvider:
+    """Solves every task locally after ``solve_seconds``; site keys in ``fail_sitekeys`` fail."""
+
+    def __init__(self, name: str = "mock", solve_seconds: float = 0.0, fail_sitekeys: Tuple[str, ...] = ()):
+        self.name = name
+        self.solve_seconds = solve_seconds
+        self.fail_sitekeys = set(fail_sitekeys)
+        self.created: List[Tuple[str, str]] = []
+        self.polls = 0
+        self._tasks: Dict[int, Tuple[float, str]] = {}
+
+    async def create_task(self, client: Any, url: str, sitekey: str) -> int:
+        self.created.append((url, sitekey))
+        task_id = len(self.created)
+        self._tasks[task_id] = (time.monotonic() + self.solve_seconds, sitekey)
+        return task_id
+
+    async def get_results(self, client: Any, task_ids: List[int]) -> Dict[int, Any]:
+        self.polls += 1
+        now, results = time.monotonic(), {}
+        for task_id in task_ids:
+            ready_at, sitekey = self._tasks[task_id]
+            if sitekey in self.fail_sitekeys:
+                results[task_id] = CaptchaError(f"{self.name}: ERROR_CAPTCHA_UNSOLVABLE")
+            else:
+                results[task_id] = f"{self.name}-token-{task_id}" if now >= ready_at else None
+        return results
+
+
+def build_provider(name: str):
+    if name == "mock":
+        return MockCaptchaProvider()
+    if name not in PROVIDER_ENDPOINTS:
+        raise ValueError(f"Unknown captcha provider {name!r}; expected one of {sorted(PROVIDER_ENDPOINTS)} or 'mock'")
+    api_key = settings.CAPTCHA_API_KEYS.get(name) or settings.CAPTCHA_API_KEY
+    if not api_key:
+        raise ValueError(f"❌ CAPTCHA_API_KEY не установлен в .env или настройках (провайдер {name})")
+    create_setting, result_setting = PROVIDER_ENDPOINTS[name]
+    return CreateTaskProvider(name, api_key, str(getattr(settings, create_setting)), str(getattr(settings, result_setting)))
+
+
+# --- Service ---
 
-# CAPTCHA_API_KEY = os.getenv("CAPTCHA_API_KEY") # Replaced by settings
-# CAPTCHA_PROVIDER = os.getenv( # Replaced by settings
-#     "CAPTCHA_PROVIDER",
-#     "2captcha")
+@dataclass(eq=False)
+class _Task:
+    url: str
+    sitekey: str
+    future: Optional[asyncio.Future]  # None for prefetches: the token goes to the cache
+    tried: Set[str] = field(default_factory=set)
+    provider: Any = None
+    task_id: Any = None
+    created_at: float = 0.0
+    deadline: float = 0.0
+    next_poll: float = 0.0
+    interval: float = 0.0
 
-if not settings.CAPTCHA_API_KEY:
-    raise ValueError("❌ CAPTCHA_API_KEY не установлен в .env или настройках")
+
+class CaptchaService:
+    def __init__(self, providers: Optional[List[Any]] = None):
+        if providers is None:
+            names = [settings.CAPTCHA_PROVIDER, *settings.CAPTCHA_FALLBACK_PROVIDERS]
+            providers = [build_provider(name) for name in dict.fromkeys(names)]
+        self.providers = providers
+        self._client: Optional[httpx.AsyncClient] = None
+        self._pending: List[_Task] = []
+        self._poller: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._cooldown_until: Dict[str, float] = {}
+        self._solve_seconds: Dict[str, float] = {}
+        self._cache: Dict[str, List[Tuple[float, str]]] = {}
+        self._background: Set[asyncio.Task] = set()
+        self.stats: Dict[str, Dict[str, int]] = {p.name: {"solved": 0, "failed": 0} for p in providers}
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.CAPTCHA_HTTP_TIMEOUT_SECONDS)
+        return self._client
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    # Token cache
+
+    def _take_cached(self, sitekey: str) -> Optional[str]:
+        now = time.monotonic()
+        tokens = [(expires, token) for expires, token in self._cache.get(sitekey, []) if expires > now]
+        token = tokens.pop(0)[1] if tokens else None
+        self._cache[sitekey] = tokens
+        return token
+
+    def _store_cached(self, sitekey: str, token: str) -> None:
+        self._cache.setdefault(sitekey, []).append((time.monotonic() + settings.CAPTCHA_TOKEN_TTL_SECONDS, token))
+
+    # Public API
+
+    def submit(self, url: str, sitekey: str) -> asyncio.Future:
+        """Starts solving now; the returned future resolves to the token."""
+        future = asyncio.get_running_loop().create_future()
+        token = self._take_cached(sitekey)
+        if token is not None:
+            future.set_result(token)
+        else:
+            self._spawn(self._create(_Task(url, sitekey, future)))
+        return future
+
+    async def solve(self, url: str, sitekey: str) -> str:
+        return await self.submit(url, sitekey)
+
+    def prefetch(self, url: str, sitekey: str) -> None:
+        """Solves ahead of time; the token waits in the cache for the next submit()."""
+        self._spawn(self._create(_Task(url, sitekey, None)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "cached_tokens": sum(len(tokens) for tokens in self._cache.values()),
+            "providers": {
+                p.name: {**self.stats[p.name], "avg_solve_seconds": self._solve_seconds.get(p.name)}
+                for p in self.providers
+            },
+        }
+
+    async def close(self) -> None:
+        if self._poller is not None:
+            self._poller.cancel()
+        for task in list(self._background):
+            task.cancel()
+        for task in self._pending:
+            if task.future is not None and not task.future.done():
+                task.future.set_exception(CaptchaError("Captcha service closed"))
+        self._pending = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # Internals
+
+    def _candidates(self, task: _Task) -> List[Any]:
+        untried = [p for p in self.providers if p.name not in task.tried]
+        now = time.monotonic()
+        ready = [p for p in untried if self._cooldown_until.get(p.name, 0.0) <= now]
+        return ready or untried  # all cooling down: try them anyway rather than fail
+
+    def _fail_provider(self, provider: Any, error: Exception) -> None:
+        self.stats[provider.name]["failed"] += 1
+        self._cooldown_until[provider.name] = time.monotonic() + settings.CAPTCHA_PROVIDER_COOLDOWN_SECONDS
+        logger.warning(f"Captcha provider {provider.name} failed: {error}")
+
+    async def _create(self, task: _Task) -> None:
+        while True:
+            candidates = self._candidates(task)
+            if not candidates:
+                self._finish(task, error=CaptchaError(f"❌ Ни один провайдер не решил капчу ({task.sitekey})"))
+                return
+            provider = candidates[0]
+            task.tried.add(provider.name)
+            try:
+                task.task_id = await provider.create_task(self._http(), task.url, task.sitekey)
+            except Exception as e:
+                self._fail_provider(provider, e)
+                continue
+            break
+
+        now = time.monotonic()
+        expected = self._solve_seconds.get(provider.name, settings.CAPTCHA_EXPECTED_SOLVE_SECONDS)
+        task.provider, task.created_at = provider, now
+        task.deadline = now + settings.CAPTCHA_TIMEOUT_SECONDS
+        task.next_poll = now + max(settings.CAPTCHA_MIN_POLL_SECONDS, 0.8 * expected)
+        task.interval = settings.CAPTCHA_MIN_POLL_SECONDS
+        self._pending.append(task)
+        self._wakeup.set()
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+
+    def _finish(self, task: _Task, token: Optional[str] = None, error: Optional[Exception] = None) -> None:
+        if task.future is not None and not task.future.done():
+            if error is not None:
+                task.future.set_exception(error)
+            else:
+                task.future.set_result(token)
+        elif token is not None:
+            self._store_cached(task.sitekey, token)  # prefetched, or nobody is waiting any more
+
+    def _on_result(self, task: _Task, result: Any, now: float) -> bool:
+        """Applies one poll result; True if the task is no longer pending here."""
+        provider = task.provider
+        if isinstance(result, str):
+            elapsed = now - task.created_at
+            previous = self._solve_seconds.get(provider.name, elapsed)
+            self._solve_seconds[provider.name] = 0.7 * previous + 0.3 * elapsed
+            self.stats[provider.name]["solved"] += 1
+            self._finish(task, token=result)
+            return True
+        if isinstance(result, Exception) or now >= task.deadline:
+            error = result if isinstance(result, Exception) else TimeoutError(
+                f"{provider.name} task {task.task_id} not solved in {settings.CAPTCHA_TIMEOUT_SECONDS}s"
+            )
+            self._fail_provider(provider, error)
+            self._spawn(self._create(task))  # failover to the next provider
+            return True
+        task.interval = min(settings.CAPTCHA_MAX_POLL_SECONDS, task.interval * 1.5)
+        task.next_poll = now + task.interval
+        return False
+
+    async def _poll_loop(self) -> None:
+        while self._pending:
+            now = time.monotonic()
+            due: Dict[Any, List[_Task]] = {}
+            for task in self._pending:
+                if task.next_poll <= now:
+                    due.setdefault(task.provider, []).append(task)
+
+            if due:
+                providers = list(due)
+                responses = await asyncio.gather(
+                    *(p.get_results(self._http(), [t.task_id for t in due[p]]) for p in providers),
+                    return_exceptions=True,
+                )
+                now = time.monotonic()
+                finished = set()
+                for provider, response in zip(providers, responses):
+                    if isinstance(response, Exception):
+                        logger.warning(f"Polling {provider.name} failed, will retry: {response}")
+                        response = {}
+                    for task in due[provider]:
+                        if self._on_result(task, response.get(task.task_id), now):
+                            finished.add(task)
+                self._pending = [task for task in self._pending if task not in finished]
+
+            if not self._pending:
+                break
+            wait = max(0.0, min(task.next_poll for task in self._pending) - time.monotonic())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+
+_services: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CaptchaService]" = weakref.WeakKeyDictionary()
+
+
+def get_captcha_service() -> CaptchaService:
+    loop = asyncio.get_running_loop()
+    if loop not in _services:
+        _services[loop] = CaptchaService()
+    return _services[loop]
 
 
 async def solve_cloudflare(url: str, sitekey: str) -> str:
     """
-    Отправляет задачу в 2Captcha или CapMonster и возвращает решение
+    Решает капчу через сервис (провайдеры с failover) и возвращает токен
     (g-recaptcha-response)
     """
-    task_data = {
-        "clientKey": settings.CAPTCHA_API_KEY, # Use settings
-        "task": {
-            "type": "HCaptchaTaskProxyless",
-            "websiteURL": url,
-            "websiteKey": sitekey
-        }
-    }
-
-    async with httpx.AsyncClient() as client:
-        # 1. Отправляем задачу
-        create_task_url = str(settings.CAPMONSTER_CREATE_TASK_URL) # Use settings
-        resp = await client.post(create_task_url, json=task_data)
-        task_id = resp.json().get("taskId")
-        if not task_id:
-            raise RuntimeError(f"❌ Не удалось создать задачу: {resp.text}")
-
-        # 2. Ждём решения
-        get_result_url = str(settings.CAPMONSTER_GET_TASK_URL) # Use settings
-        payload = {"clientKey": settings.CAPTCHA_API_KEY, "taskId": task_id} # Use settings
-        for _ in range(30):
-            await asyncio.sleep(5)
-            result = await client.post(get_result_url, json=payload)
-            status = result.json()
-            if status["status"] == "ready":
-                return status["solution"]["gRecaptchaResponse"]
-
-    raise TimeoutError("❌ Решение капчи не получено за отведённое время.")
+    return await get_captcha_service().solve(url, sitekey)
@@ -0,0 +1,143 @@
+"""
+Bid selection for the autobidder.
+
+The autobidder used to walk jobs in discovery order and bid on everything above
+ML_PROBABILITY_THRESHOLD until daily_limit ran out, so whatever was discovered
+first used up the day's bids. select_bids() instead takes the whole scored batch
+and keeps the top ``daily_limit`` jobs by expected value (success probability ×
+job value) among those that clear the profile's threshold.
+
+Thresholds are tuned per profile by tune_profile_thresholds(): over recent bids
+that carry the score they were placed with, it picks the cut-off that maximises
+the realised gain sum(won - AUTOBID_BID_COST_RATIO) and stores it on
+AutobidSettings.min_success_proba.
+"""
+import heapq
+import logging
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config import settings
+from app.models.autobid_settings import AutobidSettings
+from app.models.bid import Bid
+from app.models.bid_outcome import BidOutcome
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# Reasons attached to candidates that were not selected
+SKIP_NO_PREDICTION = "no_prediction"
+SKIP_BELOW_THRESHOLD = "below_threshold"
+SKIP_DAILY_LIMIT = "daily_limit"
+
+
+def _default_job_value(jobs: Sequence[Job]) -> float:
+    """Median known budget of the batch, so jobs without one are neither favoured nor buried."""
+    budgets = [job.budget for job in jobs if job.budget]
+    return float(np.median(budgets)) if budgets else 1.0
+
+
+def select_bids(
+    scored: Sequence[Tuple[Job, Optional[float]]], daily_limit: int, threshold: float
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Splits ``(job, success_proba)`` pairs into the jobs to bid on, best first,
+    and the skipped ones, each tagged with a ``reason``. Candidates are dicts
+    with ``job``, ``success_proba``, ``value`` and ``expected_value``.
+    """
+    default_value = _default_job_value([job for job, _ in scored])
+    eligible, skipped = [], []
+    for job, proba in scored:
+        value = job.budget if job.budget else default_value
+        candidate = {
+            "job": job,
+            "success_proba": proba,
+            "value": value,
+            "expected_value": proba * value if proba is not None else None,
+        }
+        if proba is None:
+            skipped.append({**candidate, "reason": SKIP_NO_PREDICTION})
+        elif proba < threshold:
+            skipped.append({**candidate, "reason": SKIP_BELOW_THRESHOLD})
+        else:
+            eligible.append(candidate)
+
+    selected = heapq.nlargest(max(daily_limit, 0), eligible, key=itemgetter("expected_value"))
+    chosen = {id(candidate) for candidate in selected}
+    skipped.extend({**c, "reason": SKIP_DAILY_LIMIT} for c in eligible if id(c) not in chosen)
+    return selected, skipped
+
+
+def optimal_threshold(
+    probas: Sequence[float],
+    outcomes: Sequence[bool],
+    cost_ratio: Optional[float] = None,
+    bounds: Optional[Sequence[float]] = None,
+) -> float:
+    """
+    Threshold maximising sum(outcome - cost_ratio) over the bids scored at or
+    above it. When no cut-off pays for itself the upper bound is returned.
+    """
+    cost_ratio = settings.AUTOBID_BID_COST_RATIO if cost_ratio is None else cost_ratio
+    low, high = bounds or settings.AUTOBID_THRESHOLD_BOUNDS
+    p = np.asarray(probas, dtype=np.float64)
+    y = np.asarray(outcomes, dtype=np.float64)
+    if len(p) == 0:
+        return float(high)
+
+    order = np.argsort(-p, kind="stable")
+    p, y = p[order], y[order]
+    gain = np.cumsum(y - cost_ratio)
+    # A threshold can only cut between distinct scores
+    cuts = np.flatnonzero(np.r_[p[1:] != p[:-1], True])
+    best = cuts[np.argmax(gain[cuts])]
+    if gain[best] <= 0:
+        return float(high)
+    return float(np.clip(p[best], low, high))
+
+
+async def tune_profile_thresholds(db: AsyncSession, now: Optional[datetime] = None) -> Dict[str, float]:
+    """
+    Recomputes min_success_proba for every profile with enough scored, resolved
+    bids in the last AUTOBID_THRESHOLD_WINDOW_DAYS. Profiles below
+    AUTOBID_THRESHOLD_MIN_SAMPLES keep their current value. Returns the new
+    thresholds by profile id.
+    """
+    since = (now or datetime.utcnow()) - timedelta(days=settings.AUTOBID_THRESHOLD_WINDOW_DAYS)
+    # One row per bid: a bid with several outcomes succeeded if any of them did
+    outcomes = (
+        select(BidOutcome.bid_id, func.max(cast(BidOutcome.is_success, Integer)).label("is_success"))
+        .group_by(BidOutcome.bid_id)
+        .subquery()
+    )
+    result = await db.execute(
+        select(Bid.profile_id, Bid.predicted_success_proba, outcomes.c.is_success)
+        .join(outcomes, outcomes.c.bid_id == Bid.id)
+        .where(Bid.predicted_success_proba.isnot(None), Bid.submitted_at >= since)
+        .order_by(Bid.profile_id)
+    )
+
+    thresholds: Dict[str, float] = {}
+    for profile_id, rows in groupby(result.all(), key=itemgetter(0)):
+        rows = list(rows)
+        if len(rows) < settings.AUTOBID_THRESHOLD_MIN_SAMPLES:
+            continue
+        thresholds[profile_id] = optimal_threshold([r[1] for r in rows], [r[2] for r in rows])
+
+    if not thresholds:
+        return thresholds
+    settings_rows = await db.execute(
+        select(AutobidSettings).where(AutobidSettings.profile_id.in_(list(thresholds)))
+    )
+    for autobid_settings in settings_rows.scalars():
+        autobid_settings.min_success_proba = thresholds[autobid_settings.profile_id]
+    await db.commit()
+    logger.info(f"Tuned autobid thresholds for {len(thresholds)} profiles: {thresholds}")
+    return thresholds
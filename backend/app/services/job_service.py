@@ -1,16 +1,22 @@
 import uuid
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException, status
 
+from app.config import settings
 from app.models.job import Job
+from app.repositories import JobRepository
+from app.repositories.job_repository import JOB_LIST_COLUMNS
+from app.repositories.pagination import InvalidCursor, decode_cursor, next_cursor
 from app.schemas.job import JobCreate, JobUpdate
 
 class JobService:
     def __init__(self, db_session: AsyncSession):
         self.db_session = db_session
+        self.repository = JobRepository(db_session)
 
     async def create_job(self, job_in: JobCreate) -> Job:
         # Here you would typically handle any specific business logic
@@ -27,11 +33,71 @@ class JobService:
         )
         return result.scalars().first()
 
-    async def get_jobs(self, skip: int = 0, limit: int = 100) -> List[Job]:
-        result = await self.db_session.execute(
-            select(Job).offset(skip).limit(limit)
-        )
-        return result.scalars().all()
+    async def get_jobs_page(
+        self,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        query: Optional[str] = None,
+        include_embedding: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        One keyset page of jobs, newest first, optionally restricted to a
+        full-text search ``query``. Embeddings are left out unless asked for.
+        """
+        after = None
+        if cursor:
+            try:
+                created_at, job_id = decode_cursor(cursor)
+                after = (created_at, uuid.UUID(job_id))
+            except (InvalidCursor, ValueError) as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Malformed cursor: {e}")
+
+        columns = [*JOB_LIST_COLUMNS, "description_embedding"] if include_embedding else list(JOB_LIST_COLUMNS)
+        rows, has_more = await self.repository.page(limit, columns, after=after, query=query)
+        return {
+            "items": [{name: row._mapping[name] for name in columns} for row in rows],
+            "next_cursor": next_cursor(rows, has_more, "created_at"),
+        }
+
+    async def get_similar_jobs(self, job_id: uuid.UUID, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """
+        Jobs whose description embedding is closest (cosine) to ``job_id``'s,
+        among the newest JOBS_SIMILAR_CANDIDATES. Returns None if the job does
+        not exist and [] if it has no embedding.
+        """
+        job = await self.get_job(job_id)
+        if job is None:
+            return None
+        if not job.description_embedding:
+            return []
+        target = np.asarray(job.description_embedding, dtype=np.float32)
+        target /= np.linalg.norm(target) or 1.0
+
+        best_ids: List[uuid.UUID] = []
+        best_scores = np.empty(0, dtype=np.float32)
+        async for chunk in self.repository.iter_embeddings(
+            job_id, settings.JOBS_SIMILAR_CHUNK_SIZE, settings.JOBS_SIMILAR_CANDIDATES
+        ):
+            chunk = [(cid, emb) for cid, emb in chunk if emb and len(emb) == len(target)]
+            if not chunk:
+                continue
+            matrix = np.asarray([emb for _, emb in chunk], dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1)
+            scores = matrix @ target / np.where(norms == 0, 1.0, norms)
+            # Keep a running top-`limit` so memory stays at one chunk
+            best_ids = best_ids + [cid for cid, _ in chunk]
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_ids) > limit:
+                keep = np.argpartition(-best_scores, limit)[:limit]
+                best_ids = [best_ids[i] for i in keep]
+                best_scores = best_scores[keep]
+
+        order = np.argsort(-best_scores, kind="stable")
+        rows = {row.id: row for row in await self.repository.list_by_ids(best_ids)}
+        return [
+            {**rows[best_ids[i]]._mapping, "similarity": float(best_scores[i])}
+            for i in order if best_ids[i] in rows
+        ]
 
     async def update_job(self, job_id: uuid.UUID, job_in: JobUpdate) -> Optional[Job]:
         job = await self.get_job(job_id)
@@ -1,110 +1,101 @@
-# app/browser/browser_bidder.py
-import os
+"""
+Which job cards the browser scraper has already picked up.
+
+The seen_jobs table (unique on job_id) is the source of truth. In front of it
+sits an in-process Bloom filter of every stored id, built on first use (and at
+API startup): ids the filter has never seen are new without asking the
+database, so only "maybe seen" ids are checked, with one query per page.
+
+    jobs = await claim_unseen(db, cards, limit=BIDS_PER_RUN, profile_id=profile_id)
+
+A job is recorded when it is claimed for a bid, not when its card is scraped:
+claim_unseen() records at most ``limit`` unseen cards, so new jobs beyond the
+limit stay unseen and are claimed by a later run.
+
+record_jobs() inserts with ON CONFLICT DO NOTHING and returns the ids it
+actually inserted. Another process may have recorded a job since this
+process's filter was built, so callers act on record_jobs()'s result, not on
+filter_unseen()'s.
+"""
 import asyncio
-import random
-from playwright.async_api import async_playwright
-from app.services.captcha_service import solve_cloudflare
-from app.services.job_store import is_job_seen, save_job
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
 
-USER_DATA_DIR = "user_data"
+from app.config import settings
+from app.repositories import SeenJobRepository
+from app.utils.bloom_filter import BloomFilter
 
+logger = logging.getLogger(__name__)
 
-async def run_browser_bidder_for_profile(profile_id: str):
-    print(f"[▶️ START] Профиль {profile_id}")
-    profile_dir = os.path.join(USER_DATA_DIR, profile_id)
+_bloom: Optional[BloomFilter] = None
+_load_lock = asyncio.Lock()
 
-    if not os.path.exists(profile_dir):
-        print(f"[❌] user_data_dir не найден: {profile_dir}")
-        return
 
-    async with async_playwright() as p:
-        context = await p.chromium.launch_persistent_context(
-            user_data_dir=profile_dir,
-            headless=False
+async def load_seen_jobs(db: AsyncSession) -> BloomFilter:
+    """(Re)builds the filter from the table."""
+    global _bloom
+    bloom = BloomFilter(settings.JOB_SEEN_BLOOM_CAPACITY, settings.JOB_SEEN_BLOOM_ERROR_RATE)
+    async for ids in SeenJobRepository(db).iter_ids(settings.JOB_SEEN_LOAD_CHUNK_SIZE):
+        bloom.update(ids)
+    if bloom.count > settings.JOB_SEEN_BLOOM_CAPACITY:
+        logger.warning(
+            f"{bloom.count} seen jobs exceed JOB_SEEN_BLOOM_CAPACITY={settings.JOB_SEEN_BLOOM_CAPACITY}; "
+            "more lookups will reach the database."
         )
-        page = await context.new_page()
-        await page.goto("https://www.upwork.com/")
-
-        # 👁 Проверка на капчу от Cloudflare
-        if await page.locator('[data-sitekey]').count() > 0:
-            print("[⚠️] Обнаружена капча, пытаемся решить...")
-            sitekey = await page.get_attribute('[data-sitekey]', 'data-sitekey')
-            token = await solve_cloudflare("https://www.upwork.com/", sitekey)
-
-            await page.evaluate(
-                "document.querySelector('textarea[name=\"g-recaptcha-response\"]')"
-                ".value = arguments[0];",
-                token
-            )
-
-            print("[✅] Токен вставлен. Обновляем страницу...")
-            await page.reload()
-            await asyncio.sleep(5)
-
-        # 🔁 Имитируем действия пользователя
-        await page.mouse.move(200, 300)
-        await asyncio.sleep(1)
-        await page.mouse.wheel(0, 1000)
-        await asyncio.sleep(1)
-        await page.keyboard.press("Tab")
-        await page.keyboard.type("python")
-        await asyncio.sleep(1)
-
-        # ⏳ Ждём случайное время перед откликом (1–10 минут)
-        delay = random.randint(60, 600)
-        print(f"[⏱️] Ждём {delay} секунд перед откликом...")
-        await asyncio.sleep(delay)
-
-        # Переход на страницу проектов
-        await page.goto("https://www.upwork.com/ab/find-work/")
-        title = await page.title()
-        url = page.url
-        print(f"[✅ OK] Текущая страница: {title}")
-        print(f"[INFO] URL: {url}")
-
-        try:
-            await page.wait_for_selector("a[data-cy='user-settings-menu']", timeout=5000)
-            print(f"[✅] Успешно вошли в аккаунт: элемент профиля найден")
-        except BaseException:
-            print(f"[⚠️] Возможно, не авторизованы — элемент профиля не найден")
-
-        # 📥 Сбор джобов
-        job_cards = await page.locator(".job-tile-title a").all()
-        jobs = []
-        for job in job_cards:
-            title = await job.inner_text()
-            href = await job.get_attribute("href")
-            job_id = href.strip().split("/")[-1]
-            # последний фрагмент URL
-
-            if is_job_seen(job_id):
-                print(f"[⏭️] Уже видели: {job_id} — пропускаем")
-                continue
-
-            full_link = f"https://www.upwork.com{href}"
-            jobs.append(
-                {"id": job_id, "title": title.strip(), "link": full_link})
-            save_job(job_id, title.strip(), full_link, profile_id)
-
-        print(f"[📋] Найдено новых заданий: {len(jobs)}")
-
-        for job in jobs:
-            print(f"[➡️] Открываем: {job['title']}\n   {job['link']}")
-            try:
-                await page.goto(job['link'])
-                await asyncio.sleep(2)
-                await page.wait_for_selector("text='Submit a proposal'", timeout=5000)
-                await page.click("text='Submit a proposal'")
-                await asyncio.sleep(3)
-                print(f"[✅] Открыта форма подачи заявки")
-                screenshot_path = (
-                    f"screenshots/{profile_id}_{job['id']}_proposal.png"
-                )
-                os.makedirs("screenshots", exist_ok=True)
-                await page.screenshot(path=screenshot_path)
-                print(f"[📷] Скриншот формы: {screenshot_path}")
-            except Exception as e:
-                print(f"[⚠️] Ошибка при открытии {job['link']}: {e}")
-
-        await asyncio.sleep(3)
-        await context.close()
+    _bloom = bloom
+    logger.info(f"Job-seen filter loaded with {bloom.count} ids.")
+    return bloom
+
+
+async def _get_bloom(db: AsyncSession) -> BloomFilter:
+    if _bloom is None:
+        async with _load_lock:
+            if _bloom is None:
+                await load_seen_jobs(db)
+    return _bloom
+
+
+async def filter_unseen(db: AsyncSession, job_ids: Sequence[str]) -> List[str]:
+    """The ids (in input order, deduplicated) not recorded yet. At most one query."""
+    job_ids = list(dict.fromkeys(job_ids))
+    bloom = await _get_bloom(db)
+    maybe_seen = [job_id for job_id in job_ids if job_id in bloom]
+    seen = await SeenJobRepository(db).existing_ids(maybe_seen)
+    return [job_id for job_id in job_ids if job_id not in seen]
+
+
+async def record_jobs(db: AsyncSession, jobs: Sequence[Dict[str, Any]], profile_id: Optional[str] = None) -> List[str]:
+    """
+    Bulk upsert of job cards ({"id", "title", "link"}) in one statement;
+    commits. Returns the ids that were not recorded before.
+    """
+    rows = {
+        job["id"]: {"job_id": job["id"], "title": job.get("title"), "link": job.get("link"), "profile_id": profile_id}
+        for job in jobs
+    }
+    if not rows:
+        return []
+    inserted = await SeenJobRepository(db).insert_new(list(rows.values()))
+    await db.commit()
+    (await _get_bloom(db)).update(rows)  # ids already stored elsewhere belong in the filter too
+    return inserted
+
+
+async def claim_unseen(
+    db: AsyncSession, cards: Sequence[Dict[str, Any]], limit: int, profile_id: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Records and returns up to ``limit`` cards (in page order) that no one
+    recorded before. Cards lost to another process are replaced by the next
+    unseen ones on the page.
+    """
+    unseen = set(await filter_unseen(db, [card["id"] for card in cards]))
+    candidates = [card for card in cards if card["id"] in unseen]
+    claimed: List[Dict[str, Any]] = []
+    while candidates and len(claimed) < limit:
+        batch, candidates = candidates[:limit - len(claimed)], candidates[limit - len(claimed):]
+        inserted = set(await record_jobs(db, batch, profile_id))
+        claimed.extend(card for card in batch if card["id"] in inserted)
+    return claimed
@@ -1,7 +1,9 @@
 import re
 from collections import Counter
-from sqlalchemy.orm import Session
-from app.models.autobid_log import AutobidLog
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.repositories import AutobidLogRepository
+from app.tiered_cache import tiered_cache
 
 # базовые стоп-слова — можно расширить
 STOPWORDS = set(["the",
@@ -26,17 +28,24 @@ def tokenize(text: str) -> list[str]:
     return [t for t in tokens if t not in STOPWORDS and len(t) > 2]
 
 
-def get_top_keywords_for_profile(
-        db: Session,
+# Кэшируется на PROFILE_KEYWORDS_CACHE_TTL_SECONDS: новые успешные логи
+# учитываются с этой задержкой, зато на каждый отклик нет чтения всех логов.
+@tiered_cache(
+    "profile_keywords",
+    key=lambda db, profile_id, limit=10: f"{profile_id}:{limit}",
+    l1_ttl_seconds=settings.PROFILE_KEYWORDS_CACHE_TTL_SECONDS,
+    l2_ttl_seconds=settings.PROFILE_KEYWORDS_CACHE_TTL_SECONDS,
+)
+async def get_top_keywords_for_profile(
+        db: AsyncSession,
         profile_id: str,
         limit: int = 10) -> list[str]:
-    logs = db.query(AutobidLog).filter_by(
-        profile_id=profile_id, status="success").all()
+    logs = await AutobidLogRepository(db).list_for_profile(profile_id, status="success")
 
     all_words = []
     for log in logs:
         all_words += tokenize(log.job_title)
-        all_words += tokenize(log.bid_text)
+        all_words += tokenize(log.bid_text or "")
 
     counter = Counter(all_words)
     return [word for word, _ in counter.most_common(limit)]
@@ -0,0 +1,364 @@
+"""
+Central scheduler for chat-completion requests.
+
+Every LLM call in the backend (previews, bid texts) goes through
+get_llm_dispatcher().complete()/stream() instead of calling the OpenAI client
+directly, so the process as a whole stays inside the provider's limits:
+
+* Per-model token buckets for requests/minute and tokens/minute
+  (LLM_RATE_LIMITS, else LLM_DEFAULT_RPM/TPM). A request reserves its
+  estimated tokens (prompt chars / 4 + max_tokens) and the estimate is
+  corrected from the reported usage afterwards.
+* Admission in priority order: Priority.INTERACTIVE (previews a user is
+  waiting for) is served before Priority.BACKGROUND (autobid), FIFO within a
+  priority.
+* Adaptive concurrency (AIMD): the in-flight limit (at most
+  LLM_MAX_CONCURRENCY) grows by about one per ``limit`` successful requests
+  and halves on every 429, and a 429's
+  Retry-After pauses all admissions. Throttled requests are retried up to
+  LLM_MAX_RETRIES times at their original priority.
+* Token and cost accounting per model (usage_snapshot()).
+
+LLM_PROVIDER="fake" swaps OpenAI for FakeLLMProvider, a local provider with a
+configurable latency and requests/minute limit, for tests and load checks.
+
+Queues and locks belong to an event loop, so there is one dispatcher per loop,
+and the limits apply per loop: each dispatcher gets the full
+LLM_MAX_CONCURRENCY and RPM/TPM buckets. Every API worker, and every scheduler
+thread that runs LLM calls in its own asyncio.run(), is a separate loop, so
+the account-wide limits must be divided among them when setting LLM_*:
+LLM_DEFAULT_RPM = provider RPM / (workers + such threads), and so on. The AIMD
+limit still backs off on the 429s that an over-committed split would cause.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import weakref
+from dataclasses import asdict, dataclass, field
+from enum import IntEnum
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    timeout=settings.OPENAI_TIMEOUT,
+    max_retries=0,  # the dispatcher retries 429s itself, after backing off
+) if settings.OPENAI_API_KEY else None
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 10
+
+
+# --- Providers ---
+
+class OpenAIProvider:
+    def is_available(self) -> bool:
+        return client is not None
+
+    async def create(self, **request: Any) -> Any:
+        if client is None:
+            raise RuntimeError("OPENAI_API_KEY is not configured")
+        return await client.chat.completions.create(**request)
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class FakeLLMProvider:
+    """
+    Answers with a canned reply after ``latency`` seconds, split into words
+    when streaming, and raises a 429 (FakeRateLimitError) above ``rpm``
+    requests per sliding minute, like the real API would.
+    """
+
+    def __init__(self, reply: str = "This is a generated reply.", latency: float = 0.0, rpm: Optional[int] = None):
+        self.reply = reply
+        self.latency = latency
+        self.rpm = rpm
+        self.calls: List[Dict[str, Any]] = []
+        self._recent: List[float] = []
+
+    def is_available(self) -> bool:
+        return True
+
+    async def create(self, **request: Any) -> Any:
+        now = time.monotonic()
+        self._recent = [t for t in self._recent if t > now - 60.0]
+        if self.rpm is not None and len(self._recent) >= self.rpm:
+            raise FakeRateLimitError(retry_after=self._recent[0] + 60.0 - now)
+        self._recent.append(now)
+        self.calls.append(request)
+        await asyncio.sleep(self.latency)
+
+        prompt_tokens = _estimate_prompt_tokens(request.get("messages", []))
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=len(self.reply) // 4 + 1)
+        if request.get("stream"):
+            return self._stream()
+        message = SimpleNamespace(content=self.reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    async def _stream(self) -> AsyncIterator[Any]:
+        words = self.reply.split(" ")
+        for i, word in enumerate(words):
+            delta = SimpleNamespace(content=word if i == len(words) - 1 else word + " ")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], usage=None)
+
+
+def build_provider():
+    if settings.LLM_PROVIDER == "fake":
+        return FakeLLMProvider()
+    return OpenAIProvider()
+
+
+# --- Limits ---
+
+class TokenBucket:
+    """Refills ``rate_per_minute`` units per minute up to one minute's worth."""
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Returns (delta < 0) or charges extra (delta > 0) units once the real cost is known."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class AdaptiveLimit:
+    """In-flight limit with additive increase and multiplicative decrease."""
+
+    def __init__(self, maximum: int, minimum: int = 1):
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.in_flight = 0
+
+    def has_room(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def on_success(self) -> None:
+        self.limit = min(self.maximum, self.limit + 1.0 / max(self.limit, 1.0))
+
+    def on_throttle(self) -> None:
+        self.limit = max(self.minimum, self.limit / 2)
+
+
+@dataclass
+class ModelUsage:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    throttled: int = 0
+    cost_usd: float = 0.0
+
+
+def _estimate_prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(len(str(m.get("content", ""))) for m in messages) // 4 + 1
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        response = getattr(error, "response", None)
+        header = response.headers.get("retry-after") if response is not None else None
+        try:
+            retry_after = float(header) if header is not None else None
+        except ValueError:
+            retry_after = None
+    return retry_after
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429
+
+
+@dataclass(order=True)
+class _Ticket:
+    priority: int
+    seq: int
+    model: str = field(compare=False)
+    cost: int = field(compare=False)
+    granted: asyncio.Future = field(compare=False)
+
+
+# --- Dispatcher ---
+
+class LLMDispatcher:
+    def __init__(self, provider=None, max_concurrency: Optional[int] = None):
+        self.provider = provider or build_provider()
+        self.concurrency = AdaptiveLimit(max_concurrency or settings.LLM_MAX_CONCURRENCY, settings.LLM_MIN_CONCURRENCY)
+        self.usage: Dict[str, ModelUsage] = {}
+        self._buckets: Dict[str, Tuple[TokenBucket, TokenBucket]] = {}
+        self._waiting: List[_Ticket] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def is_available(self) -> bool:
+        return self.provider.is_available()
+
+    def _limits_for(self, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        if model not in self._buckets:
+            rpm, tpm = settings.LLM_RATE_LIMITS.get(model, (settings.LLM_DEFAULT_RPM, settings.LLM_DEFAULT_TPM))
+            self._buckets[model] = (TokenBucket(rpm), TokenBucket(tpm))
+        return self._buckets[model]
+
+    def _usage_for(self, model: str) -> ModelUsage:
+        return self.usage.setdefault(model, ModelUsage())
+
+    # Admission: callers queue a ticket; _grant() hands out slots in priority order
+    # whenever capacity frees up (a release, or a timer for bucket refills/pauses).
+
+    async def _admit(self, priority: Priority, model: str, cost: int) -> None:
+        ticket = _Ticket(int(priority), next(self._seq), model, cost, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiting, ticket)
+        self._grant()
+        try:
+            await ticket.granted
+        except asyncio.CancelledError:
+            if ticket.granted.done() and not ticket.granted.cancelled():
+                self._release()  # granted just as the caller gave up
+            raise
+
+    def _grant(self) -> None:
+        while self._waiting:
+            head = self._waiting[0]
+            if head.granted.done():  # caller cancelled while queued
+                heapq.heappop(self._waiting)
+                continue
+            if not self.concurrency.has_room():
+                return  # _release() calls us again
+            requests, tokens = self._limits_for(head.model)
+            delay = max(self._paused_until - time.monotonic(), requests.wait_time(1), tokens.wait_time(head.cost))
+            if delay > 0:
+                self._schedule_wakeup(delay)
+                return
+            heapq.heappop(self._waiting)
+            requests.take(1)
+            tokens.take(head.cost)
+            self.concurrency.in_flight += 1
+            head.granted.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._grant)
+
+    def _release(self) -> None:
+        self.concurrency.in_flight -= 1
+        self._grant()
+
+    def _on_throttle(self, model: str, error: Exception) -> None:
+        self.concurrency.on_throttle()
+        self._usage_for(model).throttled += 1
+        pause = _retry_after(error) or settings.LLM_THROTTLE_BACKOFF_SECONDS
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.warning(f"LLM rate limited on {model}; concurrency now {int(self.concurrency.limit)}, pausing {pause:.1f}s")
+
+    def _account(self, model: str, reserved: int, prompt_tokens: int, completion_tokens: int) -> None:
+        usage = self._usage_for(model)
+        usage.requests += 1
+        usage.prompt_tokens += prompt_tokens
+        usage.completion_tokens += completion_tokens
+        prompt_price, completion_price = settings.LLM_PRICES_PER_1K_TOKENS.get(model, (0.0, 0.0))
+        usage.cost_usd += (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1000
+        self._limits_for(model)[1].adjust(prompt_tokens + completion_tokens - reserved)
+
+    async def _start(self, priority: Priority, request: Dict[str, Any]) -> Tuple[Any, int]:
+        """Admits and sends the request, retrying 429s. The caller owns the slot afterwards."""
+        model = request["model"]
+        estimated_prompt = _estimate_prompt_tokens(request.get("messages", []))
+        cost = estimated_prompt + (request.get("max_tokens") or settings.LLM_DEFAULT_COMPLETION_TOKENS)
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            await self._admit(priority, model, cost)
+            try:
+                return await self.provider.create(**request), cost
+            except Exception as e:
+                throttled = is_rate_limited(e)
+                if throttled:
+                    self._on_throttle(model, e)  # pause first: _release() admits the next request
+                self._release()
+                if not throttled or attempt == settings.LLM_MAX_RETRIES:
+                    raise
+
+    async def complete(self, priority: Priority = Priority.INTERACTIVE, **request: Any) -> Any:
+        """chat.completions.create(**request), scheduled. Raises whatever the provider raises."""
+        response, cost = await self._start(priority, request)
+        try:
+            usage = getattr(response, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+            if not isinstance(prompt_tokens, int) or not isinstance(completion_tokens, int):
+                # No usage reported: charge the estimate
+                prompt_tokens = _estimate_prompt_tokens(request.get("messages", []))
+                completion_tokens = cost - prompt_tokens
+            self._account(request["model"], cost, prompt_tokens, completion_tokens)
+            self.concurrency.on_success()
+        finally:
+            self._release()
+        return response
+
+    async def stream(self, priority: Priority = Priority.INTERACTIVE, **request: Any) -> AsyncIterator[Any]:
+        """Streaming create(); the slot is held until the stream is exhausted or closed."""
+        request["stream"] = True
+        stream, cost = await self._start(priority, request)
+        completion_chars = 0
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    completion_chars += len(chunk.choices[0].delta.content)
+                yield chunk
+            self.concurrency.on_success()
+        finally:
+            self._account(request["model"], cost, _estimate_prompt_tokens(request.get("messages", [])), completion_chars // 4)
+            self._release()
+
+    def usage_snapshot(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+            "queued": sum(not t.granted.done() for t in self._waiting),
+            "models": {model: asdict(usage) for model, usage in self.usage.items()},
+        }
+
+
+_dispatchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LLMDispatcher]" = weakref.WeakKeyDictionary()
+
+
+def get_llm_dispatcher() -> LLMDispatcher:
+    loop = asyncio.get_running_loop()
+    if loop not in _dispatchers:
+        _dispatchers[loop] = LLMDispatcher()
+    return _dispatchers[loop]
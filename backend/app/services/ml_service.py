@@ -1,23 +1,30 @@
+import asyncio
 import logging
+import time
 import joblib
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import uuid
 import hashlib
+import html
 import json
 
 from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Schemas are now imported from app.schemas.ml, but since this is a service,
 # it will take Pydantic models (schemas) as input and return them, or ORM models.
-from app.schemas.ml import PredictionFeaturesInput, PredictionResponse
+from app.schemas.ml import PredictionFeaturesInput, PredictionResponse, MetricsResponse, MetricsSummary
+from app.services.model_metrics_service import ModelMetricsService
 from app.config import settings
 
 # Global model variable and path (these should ideally be managed by a class or app state)
 MODEL_PATH_STR = settings.MODEL_PATH # Ensure this path is correct relative to project root
 MODEL: Optional[Any] = None
 MODEL_PATH = Path(MODEL_PATH_STR)
+_loaded_mtime: Optional[int] = None  # mtime of the file MODEL came from
+_next_reload_check_at = 0.0
 
 logger = logging.getLogger(__name__)
 # BasicConfig should be called once, preferably in main.py or a config module.
@@ -28,7 +35,9 @@ def load_model_on_startup():
     Loads the serialized ML model from disk into the global MODEL variable.
     This function is intended to be called during FastAPI application startup.
     """
-    global MODEL
+    global MODEL, _loaded_mtime
+    # Taken before the load: a file replaced mid-load is picked up by the next check
+    _loaded_mtime = _model_file_mtime()
     if MODEL_PATH.exists() and MODEL_PATH.is_file():
         try:
             MODEL = joblib.load(MODEL_PATH)
@@ -40,6 +49,33 @@ def load_model_on_startup():
         logger.warning(f"Model file not found at {MODEL_PATH}. Prediction endpoint will be inactive.")
         MODEL = None
 
+def _model_file_mtime() -> Optional[int]:
+    try:
+        return MODEL_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
+async def ensure_latest_model() -> None:
+    """
+    Reloads the model if MODEL_PATH was replaced since this worker loaded it.
+    The training runner calls MODEL_RELOAD_URL, which reaches only one worker;
+    every other worker notices the new file here, at most
+    MODEL_RELOAD_CHECK_SECONDS later.
+    """
+    global _next_reload_check_at
+    now = time.monotonic()
+    if now < _next_reload_check_at:
+        return
+    _next_reload_check_at = now + settings.MODEL_RELOAD_CHECK_SECONDS
+    if _model_file_mtime() == _loaded_mtime:
+        return
+    logger.info(f"Model file {MODEL_PATH} changed on disk, reloading.")
+    await asyncio.to_thread(load_model_on_startup)
+
+def get_loaded_model_version() -> Optional[str]:
+    """Version recorded by app.ml.trainer, or None for models without one."""
+    return getattr(MODEL, "version", None)
+
 async def predict_success_proba_service(input_data: PredictionFeaturesInput) -> PredictionResponse:
     """
     Predicts the success probability for a bid based on input features.
@@ -48,6 +84,7 @@ async def predict_success_proba_service(input_data: PredictionFeaturesInput) ->
     global MODEL # Access the globally loaded model
     request_id = str(uuid.uuid4()) # For logging/tracing
     logger.info(f"Request ID: {request_id} - Received prediction request in service.")
+    await ensure_latest_model()
 
     if MODEL is None:
         logger.error(f"Request ID: {request_id} - Prediction attempt while model is not loaded.")
@@ -102,7 +139,7 @@ async def predict_success_proba_service(input_data: PredictionFeaturesInput) ->
         
         return PredictionResponse(
             success_probability=success_proba,
-            model_info=f"Using model: {MODEL_PATH.name}" # Or more detailed model versioning
+            model_info=f"Using model: {MODEL_PATH.name} (version {get_loaded_model_version() or 'unknown'})"
         )
 
     except Exception as e:
@@ -110,18 +147,69 @@ async def predict_success_proba_service(input_data: PredictionFeaturesInput) ->
         # Re-raise as HTTPException or a custom service exception
         raise HTTPException(status_code=500, detail=f"Prediction error in service: {str(e)}")
 
-# Placeholder functions from the original ml_service.py, adapt as needed
-def get_model_metrics(): # This would likely load metrics from a file or a monitoring system
-    logger.info("Fetching model metrics (placeholder).")
-    return {
-        "accuracy": 0.92, # Example value
-        "f1_score": 0.89,  # Example value
-        "recall": 0.91    # Example value
-    }
-
-def get_metrics_plot_html(): # This could generate an HTML plot or return a pre-generated one
-    logger.info("Generating metrics plot HTML (placeholder).")
-    return "<html><body><h1>Metrics Plot</h1><p>График пока не готов 😄 (Service version)</p></body></html>"
+# Evaluation results are written once per model version by the trainer
+# (app/ml/evaluation.py) and never change, so they are cached per version.
+_METRICS_CACHE: Dict[str, MetricsResponse] = {}
+
+async def get_model_metrics(db: AsyncSession, model_version: Optional[str] = None) -> Optional[MetricsResponse]:
+    """
+    Metrics of ``model_version``, defaulting to the loaded model (or the newest
+    recorded version when the loaded model carries no version).
+    """
+    if model_version is None:
+        await ensure_latest_model()
+    version = model_version or get_loaded_model_version()
+    if version in _METRICS_CACHE:
+        return _METRICS_CACHE[version]
+    service = ModelMetricsService(db)
+    row = await service.get_by_version(version) if version else await service.get_latest()
+    if row is None:
+        return None
+    metrics = MetricsResponse.model_validate(row)
+    _METRICS_CACHE[metrics.model_version] = metrics
+    return metrics
+
+async def list_model_metrics(db: AsyncSession, limit: int = 20) -> List[MetricsSummary]:
+    rows = await ModelMetricsService(db).list_versions(limit)
+    return [MetricsSummary.model_validate(row) for row in rows]
+
+def _fmt(value: Optional[float], digits: int = 3) -> str:
+    return "—" if value is None else f"{value:.{digits}f}"
+
+async def get_metrics_plot_html(db: AsyncSession) -> str:
+    """Version comparison table plus the reliability diagram of the current model."""
+    current = await get_model_metrics(db)
+    versions = await list_model_metrics(db)
+    if current is None and not versions:
+        return "<html><body><h1>Metrics</h1><p>Метрик пока нет: модель ещё не обучалась.</p></body></html>"
+
+    rows = "".join(
+        f"<tr><td>{html.escape(m.model_version)}</td><td>{html.escape(m.training_mode or '')}</td>"
+        f"<td>{m.n_eval_rows or 0}</td><td>{_fmt(m.auc)}</td><td>{_fmt(m.log_loss)}</td>"
+        f"<td>{_fmt(m.brier_score)}</td><td>{_fmt(m.expected_calibration_error)}</td>"
+        f"<td>{_fmt(m.precision_at_k)}</td><td>{_fmt(m.latency_p95_ms, 2)}</td></tr>"
+        for m in versions
+    )
+    bars = ""
+    if current is not None:
+        for b in current.calibration:
+            predicted = (b.mean_predicted or 0) * 100
+            observed = (b.fraction_positive or 0) * 100
+            bars += (
+                f"<tr><td>{b.lower:.1f}–{b.upper:.1f}</td><td>{b.count}</td>"
+                f"<td><div style='background:#9bb;width:{predicted:.0f}px'>&nbsp;</div>"
+                f"<div style='background:#369;width:{observed:.0f}px'>&nbsp;</div></td></tr>"
+            )
+    title = html.escape(current.model_version) if current is not None else "—"
+    return (
+        "<html><body><h1>Model metrics</h1>"
+        "<table border='1'><tr><th>Version</th><th>Mode</th><th>Eval rows</th><th>AUC</th><th>Log loss</th>"
+        "<th>Brier</th><th>ECE</th><th>Precision@k</th><th>p95 ms</th></tr>"
+        f"{rows}</table>"
+        f"<h2>Calibration ({title})</h2>"
+        "<table><tr><th>Bin</th><th>Count</th><th>Predicted / observed</th></tr>"
+        f"{bars}</table></body></html>"
+    )
 
 # The reload_model logic is more of an operational endpoint, typically called by an admin or a scheduler.
 # It might stay in the router (ml_routes.py internal_router) or be part_of a dedicated AdminService.
@@ -0,0 +1,51 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.model_metrics import ModelMetrics
+
+
+class ModelMetricsService:
+    """Stores and reads per-version evaluation results written by the trainer."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def record(self, metrics: Dict[str, Any]) -> ModelMetrics:
+        """Inserts the metrics for ``metrics["model_version"]``, replacing an existing row."""
+        row = await self.get_by_version(metrics["model_version"])
+        if row is None:
+            row = ModelMetrics(model_version=metrics["model_version"])
+            self.db_session.add(row)
+        for key, value in metrics.items():
+            if hasattr(ModelMetrics, key):
+                setattr(row, key, value)
+        await self.db_session.commit()
+        await self.db_session.refresh(row)
+        return row
+
+    async def get_by_version(self, model_version: str) -> Optional[ModelMetrics]:
+        result = await self.db_session.execute(
+            select(ModelMetrics).filter(ModelMetrics.model_version == model_version)
+        )
+        return result.scalars().first()
+
+    async def get_latest(self) -> Optional[ModelMetrics]:
+        result = await self.db_session.execute(
+            select(ModelMetrics).order_by(ModelMetrics.created_at.desc(), ModelMetrics.id.desc()).limit(1)
+        )
+        return result.scalars().first()
+
+    async def list_versions(self, limit: int = 20) -> List[ModelMetrics]:
+        result = await self.db_session.execute(
+            select(ModelMetrics).order_by(ModelMetrics.created_at.desc(), ModelMetrics.id.desc()).limit(limit)
+        )
+        return result.scalars().all()
+
+# Dependency provider for ModelMetricsService
+from app.database import get_db
+from fastapi import Depends
+
+async def get_model_metrics_service(db: AsyncSession = Depends(get_db)) -> ModelMetricsService:
+    return ModelMetricsService(db)
@@ -1,14 +1,15 @@
 from uuid import uuid4
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.profile import Profile
+from app.repositories import ProfileRepository
 from app.schemas.profile import ProfileCreate
 
 
-def create_profile_service(
+async def create_profile_service(
     data: ProfileCreate,
-    user_id: str,
-    db: Session,
+    user_id: int,
+    db: AsyncSession,
 ) -> Profile:
     """
     Создаёт новую запись Profile в БД.
@@ -22,7 +23,4 @@ def create_profile_service(
         skills=data.skills, # Added skills
         experience_level=data.experience_level # Added experience_level
     )
-    db.add(new_profile)
-    db.commit()
-    db.refresh(new_profile)
-    return new_profile
+    return await ProfileRepository(db).add(new_profile)
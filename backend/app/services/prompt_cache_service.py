@@ -0,0 +1,69 @@
+"""
+Per-profile prompt context for bid generation, cached.
+
+get_active_prompt() answers "which prompt does this profile bid with" from
+the tiered cache (app/tiered_cache.py): in steady state, with no database
+query. The /ai/prompts create/update/delete routes call
+invalidate_active_prompt(), which also clears the entry in every other worker.
+Profiles without an active prompt are cached too (as a prompt with id None).
+
+Templates are compiled once per distinct text: the text is split around
+``{job_description}`` so rendering is a single join instead of a scan of the
+template per bid. Other braces in a template are left as they are.
+"""
+import hashlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.repositories import AIPromptRepository
+from app.tiered_cache import tiered_cache
+
+PLACEHOLDER = "{job_description}"
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    id: int
+    parts: Tuple[str, ...]
+
+    def render(self, job_description: str) -> str:
+        return job_description.join(self.parts)
+
+    @property
+    def digest(self) -> str:
+        """Identifies the template text (not the prompt row): equal templates share a digest."""
+        return hashlib.sha256(PLACEHOLDER.join(self.parts).encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=1024)
+def compile_template(prompt_text: str) -> Tuple[str, ...]:
+    return tuple(prompt_text.split(PLACEHOLDER))
+
+
+@tiered_cache(
+    "active_prompt",
+    key=lambda db, profile_id: profile_id,
+    l1_ttl_seconds=settings.ACTIVE_PROMPT_CACHE_TTL_SECONDS,
+    l2_ttl_seconds=settings.ACTIVE_PROMPT_CACHE_TTL_SECONDS,
+)
+async def _load_active_prompt(db: AsyncSession, profile_id: str) -> dict:
+    prompt = await AIPromptRepository(db).get_active_for_profile(profile_id)
+    if prompt is None:
+        return {"id": None}
+    return {"id": prompt.id, "prompt_text": prompt.prompt_text}
+
+
+async def get_active_prompt(db: AsyncSession, profile_id: str) -> Optional[CompiledPrompt]:
+    cached = await _load_active_prompt(db, profile_id)
+    if cached["id"] is None:
+        return None
+    return CompiledPrompt(cached["id"], compile_template(cached["prompt_text"]))
+
+
+async def invalidate_active_prompt(*profile_ids: str) -> None:
+    for profile_id in set(profile_ids):
+        await _load_active_prompt.cache.invalidate(profile_id)
@@ -0,0 +1,212 @@
+"""
+Retention for append-heavy history tables.
+
+Every table in POLICIES keeps ``hot_days`` of rows in the live table; older
+rows are written to compressed columnar files under RETENTION_ARCHIVE_DIR
+(``<table>/<YYYY-MM>/...``, see app/utils/columnar_archive.py) and then removed:
+
+* PostgreSQL, partitioned tables (autobid_logs, migration b4d7e2f91a56):
+  upcoming monthly partitions are created ahead of time, and every partition
+  that lies entirely before the cutoff is exported, DETACHed and DROPped. No
+  row-by-row DELETE, no table bloat, and recent-log queries only touch the
+  partitions of the hot window.
+* Everything else (SQLite, bids): rows older than the cutoff are archived and
+  deleted in RETENTION_BATCH_SIZE transactions, children first.
+
+Files are written before the rows are deleted, so an interrupted run only
+rewrites the same file on the next run. Autobid logs are folded into the
+daily rollups first, so /stats keeps counting archived days.
+"""
+import json
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config import settings
+from app.database import Base, run_job_with_session
+from app import models  # noqa: F401  (registers every table on Base.metadata)
+from app.services.autobid_log_analytics_service import refresh_rollups
+from app.utils.columnar_archive import month_key, write_archive
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    table: str
+    time_column: str
+    hot_days_setting: str  # settings attribute; None there disables the policy
+    children: Tuple[Tuple[str, str], ...] = ()  # (table, foreign key column) archived with each parent row
+
+
+POLICIES = (
+    RetentionPolicy("autobid_logs", "created_at", "RETENTION_AUTOBID_LOGS_HOT_DAYS"),
+    RetentionPolicy("bids", "submitted_at", "RETENTION_BIDS_HOT_DAYS", children=(("bid_outcomes", "bid_id"),)),
+)
+
+
+def _first_of_month(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _file_stem(table: str, month: str, first_id: Any) -> str:
+    return f"{table}-{month}-{re.sub(r'[^A-Za-z0-9_-]', '_', str(first_id))}"
+
+
+def _archive_rows(rows: List[Dict[str, Any]], table: str, month: str, first_id: Any) -> Path:
+    path = Path(settings.RETENTION_ARCHIVE_DIR) / table / month / _file_stem(table, month, first_id)
+    return write_archive(rows, path, settings.RETENTION_ARCHIVE_FORMAT)
+
+
+# --- PostgreSQL monthly partitions ---
+
+async def is_partitioned(db: AsyncSession, table: str) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    result = await db.execute(
+        text("SELECT 1 FROM pg_class WHERE relname = :table AND relkind = 'p'"), {"table": table}
+    )
+    return result.scalar() is not None
+
+
+async def monthly_partitions(db: AsyncSession, table: str) -> List[Tuple[str, date]]:
+    """(partition name, first day of its month) for every ``<table>_pYYYYMM`` partition."""
+    result = await db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :table"
+    ), {"table": table})
+    partitions = []
+    for (name,) in result.all():
+        match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})(\d{{2}})", name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+async def ensure_monthly_partitions(db: AsyncSession, table: str, now: datetime) -> List[str]:
+    """Creates this month's and the next RETENTION_PARTITION_MONTHS_AHEAD partitions if missing."""
+    existing = {month for _, month in await monthly_partitions(db, table)}
+    month, created = _first_of_month(now.date()), []
+    for _ in range(settings.RETENTION_PARTITION_MONTHS_AHEAD + 1):
+        if month not in existing:
+            name = f"{table}_p{month:%Y%m}"
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            ))
+            created.append(name)
+        month = _next_month(month)
+    await db.commit()
+    return created
+
+
+async def _drop_cold_partitions(db: AsyncSession, policy: RetentionPolicy, cutoff: datetime) -> Tuple[int, List[Path]]:
+    archived, files = 0, []
+    for name, month in await monthly_partitions(db, policy.table):
+        if datetime.combine(_next_month(month), datetime.min.time()) > cutoff:
+            continue
+        result = await db.stream(text(f"SELECT * FROM {name} ORDER BY {policy.time_column}, id"))
+        async for batch in result.mappings().partitions(settings.RETENTION_BATCH_SIZE):
+            rows = [dict(row) for row in batch]
+            files.append(_archive_rows(rows, policy.table, f"{month:%Y-%m}", rows[0]["id"]))
+            archived += len(rows)
+        await db.execute(text(f"ALTER TABLE {policy.table} DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
+        logger.info(f"Archived and dropped partition {name}")
+    return archived, files
+
+
+# --- Batch archive-and-delete ---
+
+async def _archive_in_batches(db: AsyncSession, policy: RetentionPolicy, cutoff: datetime) -> Tuple[int, List[Path]]:
+    table = Base.metadata.tables[policy.table]
+    time_column = table.c[policy.time_column]
+    pk = list(table.primary_key.columns)[0]
+    archived, files = 0, []
+    while True:
+        result = await db.execute(
+            select(table).where(time_column < cutoff).order_by(time_column, pk).limit(settings.RETENTION_BATCH_SIZE)
+        )
+        rows = [dict(row) for row in result.mappings().all()]
+        if not rows:
+            break
+        ids = [row[pk.name] for row in rows]
+        month_of = {row[pk.name]: month_key(row[policy.time_column]) for row in rows}
+
+        for month, month_rows in groupby(rows, key=lambda row: month_of[row[pk.name]]):
+            month_rows = list(month_rows)
+            files.append(_archive_rows(month_rows, policy.table, month, month_rows[0][pk.name]))
+        for child_name, fk in policy.children:
+            child = Base.metadata.tables[child_name]
+            child_rows = [dict(row) for row in (await db.execute(
+                select(child).where(child.c[fk].in_(ids)).order_by(child.c[fk])
+            )).mappings().all()]
+            child_rows.sort(key=lambda row: month_of[row[fk]])
+            for month, month_rows in groupby(child_rows, key=lambda row: month_of[row[fk]]):
+                month_rows = list(month_rows)
+                files.append(_archive_rows(month_rows, child_name, month, month_rows[0][fk]))
+            await db.execute(child.delete().where(child.c[fk].in_(ids)))
+
+        await db.execute(table.delete().where(pk.in_(ids)))
+        await db.commit()
+        archived += len(rows)
+    return archived, files
+
+
+async def apply_retention(db: AsyncSession, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Runs every enabled policy. Returns a per-table report."""
+    now = now or datetime.utcnow()
+    report: Dict[str, Any] = {}
+    for policy in POLICIES:
+        hot_days = getattr(settings, policy.hot_days_setting)
+        if hot_days is None:
+            continue
+        cutoff = now - timedelta(days=hot_days)
+
+        if policy.table == "autobid_logs" and settings.AUTOBID_LOG_ROLLUPS_ENABLED:
+            while await refresh_rollups(db):
+                pass
+
+        entry: Dict[str, Any] = {"cutoff": cutoff.isoformat(), "archived_rows": 0, "files": []}
+        if await is_partitioned(db, policy.table):
+            entry["created_partitions"] = await ensure_monthly_partitions(db, policy.table, now)
+            archived, files = await _drop_cold_partitions(db, policy, cutoff)
+            entry["archived_rows"] += archived
+            entry["files"] += files
+        # Whatever is older than the cutoff but not in a droppable partition
+        archived, files = await _archive_in_batches(db, policy, cutoff)
+        entry["archived_rows"] += archived
+        entry["files"] = [str(path) for path in entry["files"] + files]
+        report[policy.table] = entry
+        logger.info(f"Retention {policy.table}: archived {entry['archived_rows']} rows older than {cutoff}")
+    return report
+
+
+def retention_job() -> Dict[str, Any]:
+    """APScheduler entry point; failures are logged, never raised into the scheduler."""
+    try:
+        return run_job_with_session(apply_retention)
+    except Exception as e:
+        logger.error(f"Retention run failed: {e}", exc_info=True)
+        return {"error": str(e)}
+
+
+if __name__ == "__main__":
+    # Manual run: python -m app.services.retention_service
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(retention_job(), indent=2, default=str))
@@ -1,15 +1,23 @@
 from app.services.keyword_profile_service import (tokenize,
                                                   get_top_keywords_for_profile)
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
-def calculate_keyword_affinity_score(
-    db: Session,
+async def calculate_keyword_affinity_score(
+    db: AsyncSession,
     profile_id: str,
     job_description: str,
     max_bonus: float = 2.0
 ) -> float:
-    top_keywords = get_top_keywords_for_profile(db, profile_id)
+    top_keywords = await get_top_keywords_for_profile(db, profile_id)
+    return keyword_affinity_score(top_keywords, job_description, max_bonus)
+
+
+def keyword_affinity_score(
+    top_keywords: list[str],
+    job_description: str,
+    max_bonus: float = 2.0
+) -> float:
     job_words = set(tokenize(job_description))
 
     if not top_keywords:
@@ -0,0 +1,190 @@
+"""
+Semantic cache for generated bid texts.
+
+Profiles that opt in (AutobidSettings.semantic_cache_enabled) reuse bid texts
+written for similar jobs instead of paying a full generation:
+
+* Jobs are embedded locally: signed feature hashing of the description's
+  tokens into SEMANTIC_CACHE_EMBEDDING_DIM dimensions, L2-normalised. No API
+  call, and the same text always gets the same vector in every worker.
+* The embedding's sign pattern against SEMANTIC_CACHE_LSH_BITS fixed random
+  hyperplanes is its bucket. Texts are stored in Redis per (tenant, template
+  digest, bucket), the SEMANTIC_CACHE_BUCKET_SIZE most recent ones. The tenant
+  is the user owning the profile (Profile.user_id; for agency profiles, the
+  agency's account), so only that user's profiles with identical templates
+  share entries: one customer's proposals never reach another.
+* A lookup takes the most similar entry of the bucket at or above
+  SEMANTIC_CACHE_SIMILARITY_THRESHOLD (cosine). An entry written by the same
+  profile is reused as is. An entry from another profile is rephrased by the
+  cheap SEMANTIC_CACHE_ADAPT_MODEL.
+
+Uniqueness: every text sent through the cache is claimed for its profile
+(SET NX on its sha256). An adapted text whose claim fails, or any lookup while
+Redis is unreachable, counts as a miss, so two profiles never get the same
+text from here.
+
+Hits, adapted hits and misses are counted in Redis (get_stats()).
+"""
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.redis_cache import redis_cache_client
+from app.repositories import AutobidSettingsRepository, ProfileRepository
+from app.services.keyword_profile_service import tokenize
+from app.services.llm_dispatcher import Priority, get_llm_dispatcher
+from app.services.prompt_cache_service import get_active_prompt
+from app.tiered_cache import tiered_cache
+
+logger = logging.getLogger(__name__)
+
+STATS_KEY = "semantic_bid:stats"
+ADAPT_SYSTEM_PROMPT = "You rewrite freelance job proposals."
+ADAPT_INSTRUCTION = (
+    "Rephrase the following proposal in your own words. Keep its content, "
+    "tone, language and length; do not add new claims.\n\n"
+)
+
+
+def embed_text(text: str) -> np.ndarray:
+    dim = settings.SEMANTIC_CACHE_EMBEDDING_DIM
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in tokenize(text):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        vector[value % dim] += 1.0 if (value >> 63) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+@lru_cache(maxsize=4)
+def _hyperplanes(dim: int, bits: int) -> np.ndarray:
+    # Fixed seed: every worker must derive the same buckets
+    return np.random.default_rng(20250612).standard_normal((bits, dim)).astype(np.float32)
+
+
+def bucket_of(vector: np.ndarray) -> str:
+    signs = (_hyperplanes(vector.shape[0], settings.SEMANTIC_CACHE_LSH_BITS) @ vector) >= 0
+    return format(int("".join("1" if s else "0" for s in signs), 2), "x")
+
+
+def _entries_key(tenant_id: str, template_digest: str, bucket: str) -> str:
+    return f"semantic_bid:{tenant_id}:{template_digest}:{bucket}"
+
+
+def _claim_key(text: str) -> str:
+    return f"semantic_bid:claim:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+@tiered_cache("semantic_cache_tenant", key=lambda db, profile_id: profile_id)
+async def _load_opt_in(db: AsyncSession, profile_id: str) -> dict:
+    autobid_settings = await AutobidSettingsRepository(db).get(profile_id)
+    if not (autobid_settings and autobid_settings.semantic_cache_enabled):
+        return {"tenant_id": None}
+    profile = await ProfileRepository(db).get(profile_id)
+    return {"tenant_id": str(profile.user_id) if profile and profile.user_id is not None else None}
+
+
+async def tenant_for(db: AsyncSession, profile_id: str) -> Optional[str]:
+    """The tenant whose entries the profile shares, or None if it has not opted in."""
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    return (await _load_opt_in(db, profile_id))["tenant_id"]
+
+
+async def invalidate_opt_in(profile_id: str) -> None:
+    await _load_opt_in.cache.invalidate(profile_id)
+
+
+class SemanticLookup:
+    """One job for one profile: where its texts live in the cache, and what is there."""
+
+    def __init__(self, profile_id: str, tenant_id: str, template_digest: str, job_description: str):
+        self.profile_id = profile_id
+        self.embedding = embed_text(job_description)
+        self.key = _entries_key(tenant_id, template_digest, bucket_of(self.embedding))
+
+    async def find(self, priority: Priority) -> Optional[str]:
+        entries: List[Dict[str, Any]] = await redis_cache_client.get(self.key) or []
+        scored = sorted(
+            ((float(np.dot(self.embedding, np.asarray(e["embedding"], dtype=np.float32))), e) for e in entries),
+            key=lambda pair: pair[0],
+            reverse=True,
+        )
+        candidates = [e for score, e in scored if score >= settings.SEMANTIC_CACHE_SIMILARITY_THRESHOLD]
+
+        own = next((e for e in candidates if e["profile_id"] == self.profile_id), None)
+        if own is not None:
+            await redis_cache_client.incr_counters(STATS_KEY, hits=1)
+            return own["text"]
+        if candidates and settings.SEMANTIC_CACHE_ADAPT_MODEL:
+            adapted = await _adapt(candidates[0]["text"], priority)
+            if adapted and await self._claim(adapted):
+                await self._store(adapted)
+                await redis_cache_client.incr_counters(STATS_KEY, adapted_hits=1)
+                return adapted
+        await redis_cache_client.incr_counters(STATS_KEY, misses=1)
+        return None
+
+    async def remember(self, text: str) -> None:
+        """Records a freshly generated text for this profile (if nobody else owns it)."""
+        if await self._claim(text):
+            await self._store(text)
+
+    async def _claim(self, text: str) -> bool:
+        owner = await redis_cache_client.claim(_claim_key(text), self.profile_id, settings.SEMANTIC_CACHE_CLAIM_TTL_SECONDS)
+        return owner == self.profile_id
+
+    async def _store(self, text: str) -> None:
+        entries = await redis_cache_client.get(self.key) or []
+        entries.append({"profile_id": self.profile_id, "text": text, "embedding": self.embedding})
+        await redis_cache_client.set(
+            self.key, entries[-settings.SEMANTIC_CACHE_BUCKET_SIZE:], settings.SEMANTIC_CACHE_TTL_SECONDS
+        )
+
+
+async def _adapt(text: str, priority: Priority) -> Optional[str]:
+    try:
+        response = await get_llm_dispatcher().complete(
+            priority,
+            model=settings.SEMANTIC_CACHE_ADAPT_MODEL,
+            messages=[
+                {"role": "system", "content": ADAPT_SYSTEM_PROMPT},
+                {"role": "user", "content": ADAPT_INSTRUCTION + text},
+            ],
+            temperature=0.9,
+            max_tokens=400,
+        )
+    except Exception as e:
+        logger.warning(f"Adapting a cached bid text failed: {e}")
+        return None
+    adapted = (response.choices[0].message.content or "").strip()
+    return adapted if adapted and adapted != text else None
+
+
+async def lookup_for(db: AsyncSession, profile_id: str, job_description: str) -> Optional[SemanticLookup]:
+    """A SemanticLookup if the profile has opted in and has an active prompt, else None."""
+    tenant_id = await tenant_for(db, profile_id)
+    if tenant_id is None:
+        return None
+    prompt = await get_active_prompt(db, profile_id)
+    if prompt is None:
+        return None
+    return SemanticLookup(profile_id, tenant_id, prompt.digest, job_description)
+
+
+async def get_stats() -> Dict[str, Any]:
+    counters = await redis_cache_client.get_counters(STATS_KEY)
+    hits, adapted, misses = (counters.get(name, 0) for name in ("hits", "adapted_hits", "misses"))
+    total = hits + adapted + misses
+    return {
+        "hits": hits,
+        "adapted_hits": adapted,
+        "misses": misses,
+        "hit_rate": round((hits + adapted) / total, 4) if total else 0.0,
+    }
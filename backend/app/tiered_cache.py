@@ -0,0 +1,284 @@
+"""
+Two-tier cache: an in-process LRU (L1) in front of Redis (L2).
+
+    @tiered_cache("preview_cache")
+    async def _complete_preview(full_text: str) -> Optional[str]: ...
+
+A lookup is answered from L1 when possible (no network at all), then from
+Redis, and only then computed. Concurrent misses for the same key inside one
+process share a single computation (single-flight), so a burst of identical
+requests makes one OpenAI call instead of one per request. ``None`` results
+and exceptions are not cached.
+
+invalidate()/invalidate_all() drop the key from this process's L1 and from
+Redis and publish the key on CACHE_INVALIDATION_CHANNEL; every worker running
+the listener (start_invalidation_listener(), started in app/main.py) drops it
+from its own L1. While the listener is disconnected, an L1 entry can be stale
+for at most its TTL.
+
+Every invalidation bumps the key's generation. A load that was already running
+when its key was invalidated still answers the callers waiting on it, but does
+not store what it read or computed: that value predates the invalidation.
+"""
+import asyncio
+import functools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+from app.redis_cache import RedisCache, encode_value, redis_cache_client
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_ALL_KEYS = "*"
+
+# namespace -> cache, so invalidation messages can find the right L1
+_registry: Dict[str, "TieredCache"] = {}
+_listener_task: Optional[asyncio.Task] = None
+
+
+class LRUCache:
+    """
+    In-process LRU with a per-entry TTL, bounded by entry count and optionally
+    by max_bytes (entries are sized as their encoded Redis payload). Not
+    thread-safe; meant for one event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self.delete(key)
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        size = len(encode_value(value)) if self.max_bytes is not None else 0
+        self.delete(key)
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value, size)
+        self.size_bytes += size
+        while len(self._data) > self.max_entries or (self.max_bytes is not None and self.size_bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self.size_bytes -= evicted_size
+
+    def delete(self, key: str) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[2]
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache:
+    def __init__(
+        self,
+        namespace: str,
+        l1_max_entries: Optional[int] = None,
+        l1_ttl_seconds: Optional[float] = None,
+        l2_ttl_seconds: Optional[int] = None,
+        l2: Optional[RedisCache] = None,
+        l1_max_bytes: Optional[int] = None,
+        l2_max_bytes: Optional[int] = None,
+    ):
+        self.namespace = namespace
+        self.l1 = LRUCache(
+            l1_max_entries or settings.CACHE_L1_MAX_ENTRIES,
+            l1_ttl_seconds or settings.CACHE_L1_TTL_SECONDS,
+            l1_max_bytes,
+        )
+        self.l2 = l2 or redis_cache_client
+        self.l2_ttl_seconds = l2_ttl_seconds  # None: REDIS_CACHE_TTL_SECONDS
+        self.l2_max_bytes = l2_max_bytes  # None: no namespace budget, only the TTL
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._epoch = 0  # bumped by invalidate_all()
+        self._generations: Dict[str, int] = {}  # bumped by invalidate(key)
+        _registry[namespace] = self
+
+    def _generation(self, key: str) -> tuple:
+        return self._epoch, self._generations.get(key, 0)
+
+    def _bump(self, key: str) -> None:
+        if key == _ALL_KEYS:
+            self._epoch += 1
+            self._generations.clear()
+        else:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.l1.get(key)
+        if value is not _MISSING:
+            return value
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # shield: a cancelled caller must not cancel the load the other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def lookup(self, key: str) -> Optional[Any]:
+        """L1, then Redis; None on a miss. Does not compute or single-flight."""
+        value = self.l1.get(key)
+        if value is not _MISSING:
+            return value
+        redis_key = self.redis_key(key)
+        generation = self._generation(key)
+        value = await self.l2.get(redis_key)
+        if value is not None:
+            logger.debug(f"L2 cache hit: {redis_key}")
+            if self.l2_max_bytes is not None:
+                await self.l2.touch(redis_key, self.namespace)
+            if self._generation(key) == generation:
+                self.l1.set(key, value)
+        return value
+
+    async def store(self, key: str, value: Any) -> None:
+        redis_key = self.redis_key(key)
+        if self.l2_max_bytes is not None:
+            await self.l2.set_within_budget(
+                redis_key, value, self.namespace, self.l2_max_bytes, ttl_seconds=self.l2_ttl_seconds
+            )
+        else:
+            await self.l2.set(redis_key, value, ttl_seconds=self.l2_ttl_seconds)
+        self.l1.set(key, value)
+
+    async def _load(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generation(key)
+        value = await self.lookup(key)
+        if value is not None:
+            return value
+        value = await compute()
+        if value is not None:
+            if self._generation(key) == generation:
+                await self.store(key, value)
+            else:
+                logger.debug(f"Not caching {self.redis_key(key)}: invalidated while it was computed")
+        return value
+
+    async def invalidate(self, key: str) -> None:
+        self._bump(key)
+        self.l1.delete(key)
+        self._inflight.pop(key, None)
+        await self.l2.delete(self.redis_key(key))
+        await _publish(self.namespace, key)
+
+    async def invalidate_all(self) -> None:
+        self._bump(_ALL_KEYS)
+        self.l1.clear()
+        self._inflight.clear()
+        await self.l2.clear_cache_by_prefix(self.namespace)
+        await _publish(self.namespace, _ALL_KEYS)
+
+    def _drop_local(self, key: str) -> None:
+        self._bump(key)
+        if key == _ALL_KEYS:
+            self.l1.clear()
+        else:
+            self.l1.delete(key)
+
+
+def tiered_cache(
+    namespace: str,
+    key: Optional[Callable[..., str]] = None,
+    **cache_options: Any,
+) -> Callable:
+    """
+    Caches an async function through a TieredCache. ``key`` builds the cache key
+    from the call's arguments (default: the str() of the positional arguments).
+    The cache is available as ``func.cache``.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        cache = TieredCache(namespace, **cache_options)
+        make_key = key or (lambda *args: ":".join(str(arg) for arg in args))
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await cache.get_or_compute(make_key(*args, **kwargs), lambda: func(*args, **kwargs))
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+# --- Cross-worker L1 invalidation over Redis pub/sub ---
+
+async def _publish(namespace: str, key: str) -> None:
+    try:
+        client = await redis_cache_client.get_client()
+        await client.publish(settings.CACHE_INVALIDATION_CHANNEL, f"{namespace}\n{key}")
+    except Exception as e:
+        logger.warning(f"Cache invalidation publish failed for {namespace}:{key}: {e}")
+
+
+def handle_invalidation(message: Any) -> None:
+    if isinstance(message, bytes):
+        message = message.decode()
+    namespace, _, key = str(message).partition("\n")
+    cache = _registry.get(namespace)
+    if cache is not None:
+        cache._drop_local(key)
+
+
+async def _listen() -> None:
+    while True:
+        try:
+            client = await redis_cache_client.get_client()
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(settings.CACHE_INVALIDATION_CHANNEL)
+                while True:
+                    # Polling with an explicit timeout: a blocking listen() would hit
+                    # REDIS_SOCKET_TIMEOUT_SECONDS on every quiet period
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None:
+                        handle_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache invalidation listener disconnected: {e}; retrying")
+        # Whatever was published while we were away is lost; start from a clean L1
+        for cache in _registry.values():
+            cache.l1.clear()
+        await asyncio.sleep(settings.CACHE_INVALIDATION_RETRY_SECONDS)
+
+
+def start_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.get_running_loop().create_task(_listen())
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is not None:
+        _listener_task.cancel()
+        try:
+            await _listener_task
+        except asyncio.CancelledError:
+            pass
+        _listener_task = None
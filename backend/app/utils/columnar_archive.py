@@ -0,0 +1,96 @@
+"""
+Compressed columnar files for archived table rows.
+
+"parquet" (zstd) needs pyarrow; "npz" is numpy's compressed archive with one
+array per column plus a ``<column>__null`` mask, readable anywhere numpy is.
+Dict/list values (JSON columns) are stored as JSON strings and datetimes as
+datetime64[us] in both formats.
+"""
+import json
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+FORMATS = ("parquet", "npz")
+NULL_SUFFIX = "__null"
+
+
+def _normalise(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _column_array(values: Sequence[Any]):
+    present = [v for v in values if v is not None]
+    mask = np.array([v is None for v in values], dtype=bool)
+    if present and all(isinstance(v, datetime) for v in present):
+        return np.array([v if v is not None else np.datetime64("NaT") for v in values], dtype="datetime64[us]"), mask
+    if present and all(isinstance(v, bool) for v in present):
+        return np.array([bool(v) for v in values], dtype=bool), mask
+    if present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        if all(isinstance(v, int) for v in present):
+            return np.array([v if v is not None else 0 for v in values], dtype=np.int64), mask
+        return np.array([v if v is not None else np.nan for v in values], dtype=np.float64), mask
+    return np.array(["" if v is None else str(v) for v in values], dtype=str), mask
+
+
+def write_archive(rows: List[Dict[str, Any]], path: Path, fmt: str) -> Path:
+    """Writes rows (all with the same keys) to ``path`` + the format's extension."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown archive format {fmt!r}; expected one of {FORMATS}")
+    path = Path(path)
+    path = path.parent / f"{path.name}.{fmt}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows = [{k: _normalise(v) for k, v in row.items()} for row in rows]
+    columns = list(rows[0]) if rows else []
+
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("RETENTION_ARCHIVE_FORMAT='parquet' requires pyarrow; install it or use 'npz'") from e
+        pq.write_table(pa.Table.from_pylist(rows), path, compression="zstd")
+        return path
+
+    arrays: Dict[str, np.ndarray] = {}
+    for column in columns:
+        values, mask = _column_array([row[column] for row in rows])
+        arrays[column] = values
+        arrays[column + NULL_SUFFIX] = mask
+    np.savez_compressed(path, **arrays)
+    return path
+
+
+def read_archive(path: Path) -> List[Dict[str, Any]]:
+    """Rows back from an archive file; JSON columns stay JSON strings."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return pq.read_table(path).to_pylist()
+
+    with np.load(path, allow_pickle=False) as data:
+        columns = [name for name in data.files if not name.endswith(NULL_SUFFIX)]
+        decoded = {}
+        for column in columns:
+            values, mask = data[column], data[column + NULL_SUFFIX]
+            if values.dtype.kind == "M":
+                items = values.astype("datetime64[us]").astype(datetime).tolist()
+            else:
+                items = values.tolist()
+            decoded[column] = [None if null else item for item, null in zip(items, mask.tolist())]
+    n_rows = len(decoded[columns[0]]) if columns else 0
+    return [{column: decoded[column][i] for column in columns} for i in range(n_rows)]
+
+
+def month_key(value: Any) -> str:
+    """YYYY-MM of a date/datetime, used to lay archives out by month."""
+    if isinstance(value, (date, datetime)):
+        return f"{value:%Y-%m}"
+    return str(value)[:7]
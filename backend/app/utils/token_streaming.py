@@ -0,0 +1,103 @@
+"""
+Delivery of streamed LLM output to clients.
+
+Generators in the services yield text deltas as the model produces them.
+sse_response() turns such a generator into a Server-Sent Events response;
+relay_to_websocket() forwards it to every socket connected on
+/ws/status/{client_id} (app/websocket_manager.py). Both send the same events:
+
+* ``token``  {"delta": "..."}, once per chunk
+* ``done``   {"text": "..."}, the complete (stripped) text
+* ``error``  {"detail": "..."}, if generation fails part-way
+
+Over the WebSocket, the event name is the message ``type`` prefixed with
+``generation_``, and every message carries the stream_id.
+
+Whole results (not tokens) of a batch are streamed as NDJSON by
+ndjson_response(): one JSON object per line, flushed as each one is ready.
+"""
+import json
+import logging
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+def new_stream_id() -> str:
+    return uuid.uuid4().hex
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(tokens: AsyncIterator[str]) -> StreamingResponse:
+    async def events() -> AsyncIterator[str]:
+        parts = []
+        try:
+            async for delta in tokens:
+                parts.append(delta)
+                yield sse_event("token", {"delta": delta})
+        except Exception as e:
+            logger.error(f"Streaming generation failed: {e}", exc_info=True)
+            yield sse_event("error", {"detail": "Generation failed"})
+            return
+        yield sse_event("done", {"text": "".join(parts).strip()})
+
+    # X-Accel-Buffering: nginx would otherwise hold the events back until the end
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def ndjson_response(items: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    async def lines() -> AsyncIterator[str]:
+        async for item in items:
+            yield json.dumps(item, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def relay_to_websocket(tokens: AsyncIterator[str], client_id: str, stream_id: str) -> Optional[str]:
+    """Forwards the deltas to the client's WebSockets. Returns the full text, or None on failure."""
+    async def send(event: str, **data: Any) -> None:
+        message = {"type": f"generation_{event}", "stream_id": stream_id, **data}
+        await manager.broadcast_to_client(json.dumps(message, ensure_ascii=False), client_id)
+
+    parts = []
+    try:
+        async for delta in tokens:
+            parts.append(delta)
+            await send("token", delta=delta)
+    except Exception as e:
+        logger.error(f"Streaming generation {stream_id} for client {client_id} failed: {e}", exc_info=True)
+        await send("error", detail="Generation failed")
+        return None
+    text = "".join(parts).strip()
+    await send("done", text=text)
+    return text
+
+
+def stream_to_client(tokens: AsyncIterator[str], background_tasks: BackgroundTasks, client_id: Optional[str] = None):
+    """
+    Endpoint helper: SSE by default; with a client_id the tokens go to that
+    client's WebSockets from a background task and the request returns 202
+    with the stream_id to watch for.
+    """
+    if client_id is None:
+        return sse_response(tokens)
+    stream_id = new_stream_id()
+    background_tasks.add_task(relay_to_websocket, tokens, client_id, stream_id)
+    return JSONResponse(status_code=202, content={"stream_id": stream_id, "client_id": client_id})
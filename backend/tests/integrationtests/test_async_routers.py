@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.jwt import create_access_token
+from app.database import Base, get_db
+from app.main import app
+from app.models import AutobidLog, Job, User
+
+
+class TestAsyncRouters(unittest.IsolatedAsyncioTestCase):
+    """Runs the profile, agency, bid and autobid-log routers against aiosqlite."""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'routers.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        self.job_id = uuid.uuid4()
+        async with self.session_factory() as session:
+            session.add(User(id=1, email="owner@example.com", hashed_password="x", role="user"))
+            session.add(User(id=2, email="other@example.com", hashed_password="x", role="user"))
+            session.add(Job(id=self.job_id, title="FastAPI backend"))
+            await session.commit()
+
+        async def _get_test_db():
+            async with self.session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _get_test_db
+        self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        app.dependency_overrides.pop(get_db, None)
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _auth(self, email="owner@example.com", role="user"):
+        token = create_access_token({"sub": email, "role": role})
+        return {"Authorization": f"Bearer {token}"}
+
+    async def _create_profile(self, name="Main"):
+        r = await self.client.post("/profiles/", headers=self._auth(),
+                                   json={"name": name, "profile_type": "personal", "skills": ["python"]})
+        self.assertEqual(r.status_code, 201, r.text)
+        return r.json()
+
+    async def test_profiles_are_scoped_to_the_current_user(self):
+        profile = await self._create_profile()
+        self.assertEqual(profile["user_id"], 1)
+
+        r = await self.client.get("/profiles/", headers=self._auth())
+        self.assertEqual([p["id"] for p in r.json()], [profile["id"]])
+
+        r = await self.client.get("/profiles/", headers=self._auth("other@example.com"))
+        self.assertEqual(r.json(), [])
+
+    async def test_agency_profiles(self):
+        await self._create_profile()
+        r = await self.client.post("/agency-profiles/agency-profiles/create", headers=self._auth(),
+                                   json={"name": "Studio", "autobid_enabled": True})
+        self.assertEqual(r.status_code, 200, r.text)
+        self.assertEqual(r.json()["profile_type"], "agency")
+
+        r = await self.client.get("/agency-profiles/agency-profiles/my", headers=self._auth())
+        self.assertEqual([p["name"] for p in r.json()], ["Studio"])
+
+    async def test_bids_and_outcomes(self):
+        profile = await self._create_profile()
+        bid_payload = {"profile_id": profile["id"], "job_id": str(self.job_id), "amount": 50.0,
+                       "predicted_success_proba": 0.4}
+
+        r = await self.client.post("/bids/", headers=self._auth("other@example.com"), json=bid_payload)
+        self.assertEqual(r.status_code, 403)
+
+        r = await self.client.post("/bids/", headers=self._auth(), json=bid_payload)
+        self.assertEqual(r.status_code, 200, r.text)
+        bid = r.json()
+        self.assertEqual(bid["predicted_success_proba"], 0.4)
+
+        r = await self.client.get("/bids/", headers=self._auth())
+        self.assertEqual([b["id"] for b in r.json()["items"]], [bid["id"]])
+        r = await self.client.get("/bids/", headers=self._auth("other@example.com"))
+        self.assertEqual(r.json(), {"items": [], "next_cursor": None})
+        r = await self.client.get("/bids/", headers=self._auth("other@example.com", role="superadmin"))
+        self.assertEqual(len(r.json()["items"]), 1)
+
+        r = await self.client.post(f"/bids/{bid['id']}/outcomes", json={"bid_id": bid["id"], "is_success": True})
+        self.assertEqual(r.status_code, 200, r.text)
+        self.assertTrue(r.json()["is_success"])
+        self.assertIsNotNone(r.json()["outcome_timestamp"])
+
+        r = await self.client.post("/bids/missing/outcomes", json={"bid_id": "missing", "is_success": False})
+        self.assertEqual(r.status_code, 404)
+
+    async def test_autobid_logs_newest_first(self):
+        profile = await self._create_profile()
+        async with self.session_factory() as session:
+            for status in ("skipped", "success"):
+                session.add(AutobidLog(profile_id=profile["id"], job_title="FastAPI backend",
+                                       job_link="https://example.com/job", status=status))
+                await session.commit()
+
+        r = await self.client.get(f"/autobidder/logs/autobid-logs/{profile['id']}")
+        self.assertEqual(r.status_code, 200, r.text)
+        self.assertEqual([log["status"] for log in r.json()["items"]], ["success", "skipped"])
+
+        r = await self.client.get(f"/autobidder/logs/autobid-logs/{profile['id']}/stats")
+        self.assertEqual(r.status_code, 200, r.text)
+        self.assertEqual(r.json()["by_status"], {"skipped": 1, "success": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
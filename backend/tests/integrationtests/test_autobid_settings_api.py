@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.models import Profile, User
+from app.services.auth_service import get_current_db_user
+from app.services.semantic_bid_cache import _load_opt_in, tenant_for
+
+
+class TestAutobidSettingsApi(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'settings.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.session_factory() as session:
+            owner = User(id=1, email="owner@example.com", hashed_password="x")
+            session.add_all([owner, User(id=2, email="other@example.com", hashed_password="x")])
+            session.add(Profile(id="mine", name="P1", profile_type="personal", user_id=1))
+            session.add(Profile(id="not-mine", name="P2", profile_type="personal", user_id=2))
+            await session.commit()
+
+        async def _get_test_db():
+            async with self.session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _get_test_db
+        app.dependency_overrides[get_current_db_user] = lambda: owner
+        self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_current_db_user, None)
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def test_update_sets_and_keeps_min_success_proba(self):
+        response = await self.client.put("/autobidder/settings/mine",
+                                         json={"enabled": True, "daily_limit": 5, "min_success_proba": 0.4})
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(response.json()["min_success_proba"], 0.4)
+
+        response = await self.client.put("/autobidder/settings/mine", json={"enabled": False, "daily_limit": 3})
+        self.assertEqual(response.status_code, 200, response.text)
+
+        response = await self.client.get("/autobidder/settings/mine")
+        self.assertEqual(response.status_code, 200, response.text)
+        body = response.json()
+        self.assertEqual((body["enabled"], body["daily_limit"], body["min_success_proba"]), (False, 3, 0.4))
+
+    async def test_toggling_the_semantic_cache_takes_effect_immediately(self):
+        cache = _load_opt_in.cache
+        l2 = patch.object(cache, "l2", new_callable=AsyncMock)
+        l2.start().get.return_value = None
+        self.addCleanup(l2.stop)
+        publish = patch("app.tiered_cache._publish", new_callable=AsyncMock)
+        publish.start()
+        self.addCleanup(publish.stop)
+        cache.l1.clear()
+
+        async def _tenant():
+            async with self.session_factory() as db:
+                return await tenant_for(db, "mine")
+
+        await self.client.put("/autobidder/settings/mine", json={"enabled": True, "daily_limit": 5})
+        self.assertIsNone(await _tenant())  # now cached as "not opted in"
+
+        response = await self.client.put("/autobidder/settings/mine",
+                                         json={"enabled": True, "daily_limit": 5, "semantic_cache_enabled": True})
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(await _tenant(), "1")
+
+        # Leaving the field out keeps the opt-in
+        await self.client.put("/autobidder/settings/mine", json={"enabled": False, "daily_limit": 5})
+        self.assertEqual(await _tenant(), "1")
+
+        await self.client.put("/autobidder/settings/mine",
+                              json={"enabled": True, "daily_limit": 5, "semantic_cache_enabled": False})
+        self.assertIsNone(await _tenant())
+
+    async def test_rejects_out_of_range_threshold(self):
+        response = await self.client.put("/autobidder/settings/mine",
+                                         json={"enabled": True, "daily_limit": 5, "min_success_proba": 1.5})
+        self.assertEqual(response.status_code, 422)
+
+    async def test_profiles_of_other_users_are_not_found(self):
+        for method in ("get", "put"):
+            kwargs = {"json": {"enabled": True, "daily_limit": 5}} if method == "put" else {}
+            response = await getattr(self.client, method)("/autobidder/settings/not-mine", **kwargs)
+            self.assertEqual(response.status_code, 404, method)
+
+    async def test_requires_authentication(self):
+        app.dependency_overrides.pop(get_current_db_user)
+        response = await self.client.put("/autobidder/settings/mine", json={"enabled": True, "daily_limit": 5})
+        self.assertIn(response.status_code, (401, 403))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.limiter import limiter
+from app.main import app
+from app.models import AIPrompt, Profile, User
+from app.services.auth_service import get_current_db_user
+from app.services.keyword_profile_service import get_top_keywords_for_profile
+from app.services.prompt_cache_service import _load_active_prompt
+from app.services.semantic_bid_cache import _load_opt_in
+
+
+async def _slow_completion(**kwargs):
+    description = kwargs["messages"][1]["content"]
+    await asyncio.sleep(0.2)
+    if "broken" in description:
+        raise RuntimeError("upstream hiccup")
+    return Mock(choices=[Mock(message=Mock(content=f"  Bid for {description.splitlines()[0]}  "))])
+
+
+class TestBidBatch(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'batch.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.session_factory() as session:
+            owner = User(id=1, email="owner@example.com", hashed_password="x")
+            session.add_all([owner, User(id=2, email="other@example.com", hashed_password="x")])
+            session.add(Profile(id="profile-1", name="P1", profile_type="personal", user_id=1))
+            session.add(Profile(id="no-prompt", name="P2", profile_type="personal", user_id=1))
+            session.add(Profile(id="not-mine", name="P3", profile_type="personal", user_id=2))
+            session.add(AIPrompt(id=1, profile_id="profile-1", name="Default", is_active=True,
+                                 prompt_text="{job_description}"))
+            await session.commit()
+
+        async def _get_test_db():
+            async with self.session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _get_test_db
+        app.dependency_overrides[get_current_db_user] = lambda: owner
+        limiter.reset()
+        self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+        for cache in (_load_active_prompt.cache, get_top_keywords_for_profile.cache, _load_opt_in.cache):
+            p = patch.object(cache, "l2", new_callable=AsyncMock)
+            p.start().get.return_value = None
+            self.addCleanup(p.stop)
+            cache.l1.clear()
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_current_db_user, None)
+        limiter.reset()
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def test_drafts_run_concurrently_and_failures_stay_local(self):
+        jobs = [{"id": f"job-{i}", "description": f"Job number {i}"} for i in range(10)]
+        jobs[3]["description"] = "A broken job"
+
+        with patch("app.services.llm_dispatcher.client.chat.completions.create",
+                   AsyncMock(side_effect=_slow_completion)) as mock_create:
+            started = time.monotonic()
+            r = await self.client.post("/autobidder/drafts/profile-1/batch", json={"jobs": jobs})
+            elapsed = time.monotonic() - started
+
+        self.assertEqual(r.status_code, 200, r.text)
+        self.assertEqual(r.headers["content-type"], "application/x-ndjson")
+        items = {item["index"]: item for item in map(json.loads, r.text.splitlines())}
+        self.assertEqual(sorted(items), list(range(10)))
+        self.assertEqual(items[0], {"index": 0, "job_id": "job-0", "bid_text": "Bid for Job number 0", "error": None})
+        self.assertIsNone(items[3]["bid_text"])
+        self.assertEqual(items[3]["error"], "upstream hiccup")
+        self.assertEqual(mock_create.await_count, 10)
+        self.assertLess(elapsed, 1.0)  # 10 x 0.2s one after another would take 2s
+
+    async def test_profile_without_prompt_gets_the_default_text(self):
+        r = await self.client.post("/autobidder/drafts/no-prompt/batch", json={"jobs": [{"description": "x"}]})
+        self.assertEqual(json.loads(r.text)["bid_text"], "Здравствуйте! Заинтересован в вашем проекте.")
+
+    async def test_only_the_owner_can_draft_for_a_profile(self):
+        for profile_id in ("not-mine", "nobody"):
+            r = await self.client.post(f"/autobidder/drafts/{profile_id}/batch", json={"jobs": [{"description": "x"}]})
+            self.assertEqual(r.status_code, 404)
+
+        app.dependency_overrides.pop(get_current_db_user)
+        r = await self.client.post("/autobidder/drafts/profile-1/batch", json={"jobs": [{"description": "x"}]})
+        self.assertIn(r.status_code, (401, 403))
+
+    async def test_batches_are_rate_limited(self):
+        with patch("app.services.llm_dispatcher.client.chat.completions.create",
+                   AsyncMock(side_effect=_slow_completion)):
+            codes = [
+                (await self.client.post("/autobidder/drafts/profile-1/batch", json={"jobs": [{"description": "x"}]})).status_code
+                for _ in range(6)
+            ]
+        self.assertEqual(codes, [200] * 5 + [429])
+
+    async def test_batch_size_is_bounded(self):
+        r = await self.client.post("/autobidder/drafts/profile-1/batch", json={"jobs": []})
+        self.assertEqual(r.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
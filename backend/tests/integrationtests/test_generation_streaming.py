@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.models import AIPrompt
+from app.services.ai_prompt_service import _complete_preview
+
+
+def _chunk(text):
+    return Mock(choices=[Mock(delta=Mock(content=text))])
+
+
+def _fake_stream(*deltas):
+    async def create(**kwargs):
+        assert kwargs.get("stream") is True
+
+        async def chunks():
+            for delta in deltas:
+                yield _chunk(delta)
+        return chunks()
+    return AsyncMock(side_effect=create)
+
+
+def _sse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestGenerationStreaming(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'stream.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.session_factory() as session:
+            session.add(AIPrompt(id=1, profile_id="profile-1", name="Default", is_active=True,
+                                 prompt_text="Write a proposal for: {job_description}"))
+            await session.commit()
+
+        async def _get_test_db():
+            async with self.session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _get_test_db
+        self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+        _complete_preview.cache.l1.clear()
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        app.dependency_overrides.pop(get_db, None)
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    @patch.object(_complete_preview.cache, "l2", new_callable=AsyncMock)
+    async def test_preview_streams_over_sse_and_caches_the_final_text(self, mock_l2):
+        mock_l2.get.return_value = None
+        payload = {"prompt_id": "1", "description": "FastAPI backend"}
+        with patch("app.services.llm_dispatcher.client.chat.completions.create",
+                   _fake_stream("Short ", "preview.")) as mock_create:
+            r = await self.client.post("/ai/prompts/preview/stream", json=payload)
+            self.assertEqual(r.status_code, 200, r.text)
+            self.assertTrue(r.headers["content-type"].startswith("text/event-stream"))
+            self.assertEqual(_sse_events(r.text), [
+                ("token", {"delta": "Short "}),
+                ("token", {"delta": "preview."}),
+                ("done", {"text": "Short preview."}),
+            ])
+            mock_l2.set_within_budget.assert_awaited_once()
+
+            r = await self.client.post("/ai/prompts/preview/stream", json=payload)
+            self.assertEqual(_sse_events(r.text)[-1], ("done", {"text": "Short preview."}))
+            mock_create.assert_awaited_once()
+
+    async def test_bid_preview_tokens_are_relayed_to_the_websocket(self):
+        with patch("app.services.llm_dispatcher.client.chat.completions.create",
+                   _fake_stream("Hello, ", "I can help.")), \
+                patch("app.utils.token_streaming.manager.broadcast_to_client", new_callable=AsyncMock) as mock_send:
+            r = await self.client.post("/autobidder/prompts/1/preview/stream", params={"client_id": "owner@example.com"})
+
+        self.assertEqual(r.status_code, 202, r.text)
+        stream_id = r.json()["stream_id"]
+        messages = [json.loads(call.args[0]) for call in mock_send.await_args_list]
+        self.assertEqual({call.args[1] for call in mock_send.await_args_list}, {"owner@example.com"})
+        self.assertEqual({m["stream_id"] for m in messages}, {stream_id})
+        self.assertEqual([m["type"] for m in messages], ["generation_token", "generation_token", "generation_done"])
+        self.assertEqual(messages[-1]["text"], "Hello, I can help.")
+
+    async def test_failures_mid_stream_end_with_an_error_event(self):
+        async def create(**kwargs):
+            async def chunks():
+                yield _chunk("Hel")
+                raise RuntimeError("connection reset")
+            return chunks()
+
+        with patch("app.services.llm_dispatcher.client.chat.completions.create", AsyncMock(side_effect=create)):
+            r = await self.client.post("/autobidder/prompts/1/preview/stream")
+        self.assertEqual(_sse_events(r.text), [("token", {"delta": "Hel"}), ("error", {"detail": "Generation failed"})])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.jwt import create_access_token
+from app.database import Base, get_db
+from app.main import app
+from app.models import Job, User
+
+START = datetime(2024, 5, 1)
+
+
+class TestJobsAPI(unittest.IsolatedAsyncioTestCase):
+    """Jobs router against aiosqlite, including the FTS5 search fallback."""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'jobs.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        self.ids = [uuid.uuid4() for _ in range(7)]
+        titles = ["Python FastAPI backend", "React dashboard", "Django REST API",
+                  "Logo design", "FastAPI microservice", "Vue frontend", "Data pipeline in Python"]
+        embeddings = [[1, 0, 0], [0, 1, 0], [0.9, 0.1, 0], [0, 0, 1], [0.95, 0, 0.05], [0.1, 1, 0], None]
+        async with self.session_factory() as session:
+            session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+            for i, (title, embedding) in enumerate(zip(titles, embeddings)):
+                session.add(Job(id=self.ids[i], title=title, description=f"{title} project",
+                                description_embedding=embedding, created_at=START + timedelta(hours=i)))
+            await session.commit()
+
+        async def _get_test_db():
+            async with self.session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_db] = _get_test_db
+        self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        app.dependency_overrides.pop(get_db, None)
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _auth(self, email="owner@example.com", role="user"):
+        token = create_access_token({"sub": email, "role": role})
+        return {"Authorization": f"Bearer {token}"}
+
+    async def _titles(self, **params):
+        titles, cursor = [], None
+        while True:
+            r = await self.client.get("/jobs/", params={**params, **({"cursor": cursor} if cursor else {})})
+            self.assertEqual(r.status_code, 200, r.text)
+            titles.extend(item["title"] for item in r.json()["items"])
+            cursor = r.json()["next_cursor"]
+            if cursor is None:
+                return titles
+
+    async def test_pages_newest_first_without_embeddings(self):
+        r = await self.client.get("/jobs/", params={"limit": 3})
+        page = r.json()
+        self.assertEqual(len(page["items"]), 3)
+        self.assertNotIn("description_embedding", page["items"][0])
+        self.assertIsNotNone(page["next_cursor"])
+
+        titles = await self._titles(limit=3)
+        self.assertEqual(titles[0], "Data pipeline in Python")
+        self.assertEqual(len(titles), 7)
+
+        r = await self.client.get("/jobs/", params={"limit": 1, "include_embedding": True})
+        self.assertIn("description_embedding", r.json()["items"][0])
+
+    async def test_full_text_search(self):
+        self.assertEqual(await self._titles(q="fastapi", limit=1),
+                         ["FastAPI microservice", "Python FastAPI backend"])
+        self.assertEqual(await self._titles(q='python "pipeline'), ["Data pipeline in Python"])
+
+        async with self.session_factory() as session:
+            job = await session.get(Job, self.ids[3])
+            job.title = "FastAPI admin"
+            await session.commit()
+        self.assertIn("FastAPI admin", await self._titles(q="fastapi"))
+
+    async def test_similar_jobs(self):
+        r = await self.client.get(f"/jobs/{self.ids[0]}/similar", params={"limit": 2})
+        self.assertEqual(r.status_code, 200, r.text)
+        similar = r.json()
+        self.assertEqual([item["title"] for item in similar], ["FastAPI microservice", "Django REST API"])
+        self.assertGreater(similar[0]["similarity"], similar[1]["similarity"])
+
+        r = await self.client.get(f"/jobs/{self.ids[6]}/similar")
+        self.assertEqual(r.json(), [])
+        r = await self.client.get(f"/jobs/{uuid.uuid4()}/similar")
+        self.assertEqual(r.status_code, 404)
+
+    async def test_crud(self):
+        auth = self._auth()
+        r = await self.client.post("/jobs/", headers=auth,
+                                   json={"title": "New job", "description": "Write tests", "budget": 300})
+        self.assertEqual(r.status_code, 201, r.text)
+        job_id = r.json()["id"]
+
+        r = await self.client.put(f"/jobs/{job_id}", headers=auth, json={"budget": 450})
+        self.assertEqual(r.json()["budget"], 450)
+        self.assertEqual((await self.client.get(f"/jobs/{job_id}")).json()["title"], "New job")
+
+        self.assertEqual((await self.client.delete(f"/jobs/{job_id}", headers=auth)).status_code, 204)
+        self.assertEqual((await self.client.get(f"/jobs/{job_id}")).status_code, 404)
+        self.assertEqual(await self._titles(q="tests"), [])
+
+    async def test_writes_require_authentication(self):
+        job_id = self.ids[0]
+        bad_token = {"Authorization": "Bearer not-a-token"}
+        for headers in (bad_token, {}):
+            r = await self.client.post("/jobs/", headers=headers, json={"title": "Spam", "description": "x"})
+            self.assertIn(r.status_code, (401, 403))
+            r = await self.client.put(f"/jobs/{job_id}", headers=headers, json={"budget": 1})
+            self.assertIn(r.status_code, (401, 403))
+            r = await self.client.delete(f"/jobs/{job_id}", headers=headers)
+            self.assertIn(r.status_code, (401, 403))
+        self.assertEqual((await self.client.post("/jobs/", headers=bad_token, json={"title": "x"})).status_code, 401)
+        self.assertEqual((await self.client.get(f"/jobs/{job_id}")).json()["title"], "Python FastAPI backend")
+
+    async def test_bad_cursor(self):
+        r = await self.client.get("/jobs/", params={"cursor": "junk"})
+        self.assertEqual(r.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
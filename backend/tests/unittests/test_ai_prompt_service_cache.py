@@ -4,7 +4,8 @@ import asyncio # For running async functions in tests
 
 # Assuming ai_prompt_service is structured to allow these imports
 # Adjust paths if necessary based on actual project structure and sys.path in test runner
-from app.services.ai_prompt_service import generate_preview
+from app.config import settings
+from app.services.ai_prompt_service import _complete_preview, generate_preview, preview_cache_key
 # Removed imports for preview_cache and MAX_CACHE_SIZE as they are no longer used in tests
 # from app.config import settings # To mock settings.REDIS_CACHE_TTL_SECONDS if needed
 
@@ -22,21 +23,20 @@ def async_test(coro):
             asyncio.set_event_loop(None) # Clean up to avoid interference
     return wrapper
 
-@patch('app.services.ai_prompt_service.redis_cache_client', new_callable=AsyncMock)
+@patch.object(_complete_preview.cache, 'l2', new_callable=AsyncMock)
 class TestGeneratePreviewCachingWithRedis(unittest.IsolatedAsyncioTestCase):
 
     async def asyncSetUp(self):
-        """Clear any potential side-effects or reset mocks if needed."""
+        """The in-process L1 outlives a test; start each one empty."""
         # The @patch decorator itself handles resetting the mock object (mock_redis_client)
-        # for each test method. So, explicit reset here might not be needed for mock_redis_client.
-        # If there were other shared resources, this would be the place to reset them.
-        pass
+        # for each test method.
+        _complete_preview.cache.l1.clear()
 
-    @patch('app.services.ai_prompt_service.client.chat.completions.create', new_callable=AsyncMock)
+    @patch('app.services.llm_dispatcher.client.chat.completions.create', new_callable=AsyncMock)
     async def test_cache_hit(self, mock_openai_call, mock_redis_client):
         """Test that a repeated call with the same input uses the Redis cache."""
         test_input_text = "test cache hit text"
-        cache_key = f"preview_cache:{test_input_text}"
+        cache_key = f"preview_cache:{preview_cache_key(test_input_text)}"
         cached_value = "cached preview text from Redis"
         
         mock_redis_client.get.return_value = cached_value # Simulate cache hit
@@ -48,19 +48,19 @@ class TestGeneratePreviewCachingWithRedis(unittest.IsolatedAsyncioTestCase):
         mock_openai_call.assert_not_called() # OpenAI should not be called
         self.assertEqual(result1, cached_value)
 
-        # Second call - should also hit the cache
+        # Second call - served from the in-process L1, Redis is not asked again
         result2 = await generate_preview(test_input_text)
         
-        self.assertEqual(mock_redis_client.get.call_count, 2) # Called again
+        self.assertEqual(mock_redis_client.get.call_count, 1)
         mock_openai_call.assert_not_called() # Still not called
         self.assertEqual(result2, cached_value)
 
     @patch('app.services.ai_prompt_service.settings.REDIS_CACHE_TTL_SECONDS', 3600) # Mock TTL for predictability
-    @patch('app.services.ai_prompt_service.client.chat.completions.create', new_callable=AsyncMock)
+    @patch('app.services.llm_dispatcher.client.chat.completions.create', new_callable=AsyncMock)
     async def test_cache_miss_then_cache_hit(self, mock_openai_call, mock_redis_client):
         """Test cache miss (API call, then cache set) followed by a cache hit."""
         test_input_text = "new text for cache miss"
-        cache_key = f"preview_cache:{test_input_text}"
+        cache_key = f"preview_cache:{preview_cache_key(test_input_text)}"
         fresh_preview_from_openai = "fresh preview from OpenAI"
 
         # --- First call: Cache Miss ---
@@ -79,7 +79,9 @@ class TestGeneratePreviewCachingWithRedis(unittest.IsolatedAsyncioTestCase):
         mock_openai_call.assert_called_once()
         # Assert that redis_cache_client.set was called correctly
         # The TTL value comes from the mocked settings.REDIS_CACHE_TTL_SECONDS (3600)
-        mock_redis_client.set.assert_called_once_with(cache_key, fresh_preview_from_openai)
+        mock_redis_client.set_within_budget.assert_called_once_with(
+            cache_key, fresh_preview_from_openai, "preview_cache", settings.PREVIEW_CACHE_REDIS_MAX_BYTES, ttl_seconds=None
+        )
         self.assertEqual(result_miss, fresh_preview_from_openai)
 
         # --- Second call: Cache Hit ---
@@ -89,16 +91,55 @@ class TestGeneratePreviewCachingWithRedis(unittest.IsolatedAsyncioTestCase):
         mock_redis_client.get.return_value = fresh_preview_from_openai
         # OpenAI mock should not be called again, so its state from the first call is fine.
         # Set mock should not be called again either.
-        mock_redis_client.set.reset_mock()
+        mock_redis_client.set_within_budget.reset_mock()
+        _complete_preview.cache.l1.clear() # as if another worker had cached it
 
 
         result_hit = await generate_preview(test_input_text)
         
         mock_redis_client.get.assert_called_once_with(cache_key) # Get was called
         mock_openai_call.assert_called_once() # OpenAI still only called once in total for this test
-        mock_redis_client.set.assert_not_called() # Set was not called this time
+        mock_redis_client.set_within_budget.assert_not_called() # Set was not called this time
+        mock_redis_client.touch.assert_called_once_with(cache_key, "preview_cache")
         self.assertEqual(result_hit, fresh_preview_from_openai)
 
+    @patch('app.services.llm_dispatcher.client.chat.completions.create', new_callable=AsyncMock)
+    async def test_concurrent_misses_share_one_api_call(self, mock_openai_call, mock_redis_client):
+        mock_redis_client.get.return_value = None
+
+        async def slow_completion(**kwargs):
+            await asyncio.sleep(0.05)
+            mock_choice = unittest.mock.Mock()
+            mock_choice.message.content = "shared preview"
+            return unittest.mock.Mock(choices=[mock_choice])
+
+        mock_openai_call.side_effect = slow_completion
+        results = await asyncio.gather(*(generate_preview("stampede text") for _ in range(10)))
+
+        self.assertEqual(results, ["shared preview"] * 10)
+        mock_openai_call.assert_called_once()
+        mock_redis_client.set_within_budget.assert_called_once()
+
+    @patch('app.services.llm_dispatcher.client.chat.completions.create', new_callable=AsyncMock)
+    async def test_api_errors_are_not_cached(self, mock_openai_call, mock_redis_client):
+        mock_redis_client.get.return_value = None
+        mock_openai_call.side_effect = RuntimeError("rate limited")
+
+        self.assertEqual(await generate_preview("failing text"), "Error generating preview due to API issue.")
+        await generate_preview("failing text")
+
+        self.assertEqual(mock_openai_call.call_count, 2)
+        mock_redis_client.set_within_budget.assert_not_called()
+
+    def test_cache_key_is_a_fixed_size_digest_of_normalised_text(self, mock_redis_client):
+        long_text = "Build a FastAPI backend.  " * 2000
+        key = preview_cache_key(long_text)
+        self.assertEqual(len(key), 64)
+        self.assertEqual(key, preview_cache_key("  " + long_text.replace("  ", "\n")))
+        self.assertNotEqual(key, preview_cache_key(long_text + "!"))
+        with patch('app.services.ai_prompt_service.settings.OPENAI_MODEL', "another-model"):
+            self.assertNotEqual(key, preview_cache_key(long_text))
+
     # test_cache_eviction is removed as per instructions.
 
 if __name__ == '__main__':
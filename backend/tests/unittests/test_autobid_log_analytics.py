@@ -0,0 +1,132 @@
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base
+from app.models import AutobidLog, AutobidLogDailyRollup, Profile, User
+from app.repositories import AutobidLogRepository
+from app.services.autobid_log_analytics_service import get_log_stats, get_watermark, refresh_rollups
+
+START = datetime(2024, 6, 1, 9)
+
+
+class TestAutobidLogAnalytics(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'logs.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.session_factory() as session:
+            session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+            session.add(Profile(id="p1", name="P1", profile_type="personal", user_id=1))
+            session.add(Profile(id="p2", name="P2", profile_type="personal", user_id=1))
+            await session.commit()
+        # day 0: 3 logs, day 1: 2 logs, day 2: 1 log for p1; one log for p2
+        await self._add_logs([
+            ("p1", 0, "bid_placed_ml_approved", 0.82),
+            ("p1", 0, "skipped_ml_rejected", 0.31),
+            ("p1", 0, "skipped_ml_rejected", 0.35),
+            ("p1", 1, "stopped_daily_limit", 0.77),
+            ("p1", 1, "skipped_ml_failure", None),
+            ("p1", 2, "bid_placed_ml_approved", 0.9),
+            ("p2", 0, "bid_placed_ml_approved", 0.6),
+        ])
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def _add_logs(self, logs):
+        async with self.session_factory() as session:
+            for i, (profile_id, day, status, score) in enumerate(logs):
+                session.add(AutobidLog(profile_id=profile_id, job_title=f"job {i}", job_link="https://example.com",
+                                       status=status, score=score,
+                                       created_at=START + timedelta(days=day, minutes=i)))
+            await session.commit()
+
+    async def _stats(self, **kwargs):
+        async with self.session_factory() as session:
+            return await get_log_stats(session, "p1", **kwargs)
+
+    async def _refresh(self):
+        async with self.session_factory() as session:
+            return await refresh_rollups(session)
+
+    async def test_raw_aggregation(self):
+        with patch.object(settings, "AUTOBID_LOG_ROLLUPS_ENABLED", False):
+            stats = await self._stats()
+        self.assertEqual(stats["total"], 6)
+        self.assertEqual(stats["by_status"]["skipped_ml_rejected"], 2)
+        self.assertEqual(stats["unscored"], 1)
+        self.assertEqual([(b["lower"], b["count"]) for b in stats["score_histogram"]],
+                         [(0.3, 2), (0.7, 1), (0.8, 1), (0.9, 1)])
+        self.assertEqual([(d["day"], d["total"]) for d in stats["daily"]],
+                         [(date(2024, 6, 1), 3), (date(2024, 6, 2), 2), (date(2024, 6, 3), 1)])
+
+        with patch.object(settings, "AUTOBID_LOG_ROLLUPS_ENABLED", False):
+            ranged = await self._stats(date_from=date(2024, 6, 2), date_to=date(2024, 6, 2))
+        self.assertEqual(ranged["total"], 2)
+
+    async def test_rollups_plus_tail_match_raw(self):
+        with patch.object(settings, "AUTOBID_LOG_ROLLUP_BATCH", 4):
+            self.assertEqual(await self._refresh(), 4)  # ids 1..4
+        await self._add_logs([("p1", 2, "skipped_ml_rejected", 0.12)])
+
+        with patch.object(settings, "AUTOBID_LOG_ROLLUPS_ENABLED", False):
+            raw = await self._stats()
+        mixed = await self._stats()  # rollups for ids 1..4, raw tail for the rest
+        self.assertEqual(mixed, raw)
+        self.assertEqual(mixed["total"], 7)
+
+        self.assertEqual(await self._refresh(), 4)
+        self.assertEqual(await self._refresh(), 0)
+        async with self.session_factory() as session:
+            self.assertEqual(await get_watermark(session), 8)
+            rollup = await session.get(AutobidLogDailyRollup, ("p1", date(2024, 6, 1), "skipped_ml_rejected", 3))
+            self.assertEqual(rollup.count, 2)
+        self.assertEqual(await self._stats(), raw)
+
+    async def test_recent_logs_stay_in_the_tail_until_they_settle(self):
+        async with self.session_factory() as session:
+            # id 8 was just written; id 9 is older but only became visible now,
+            # like a transaction that committed late
+            session.add(AutobidLog(profile_id="p1", job_title="recent", job_link="https://example.com",
+                                   status="bid_placed_ml_approved", score=0.5, created_at=datetime.utcnow()))
+            session.add(AutobidLog(profile_id="p1", job_title="late", job_link="https://example.com",
+                                   status="skipped_ml_rejected", score=0.5, created_at=START))
+            await session.commit()
+
+        self.assertEqual(await self._refresh(), 7)  # ids 1..7: the watermark stops below the recent id
+        async with self.session_factory() as session:
+            self.assertEqual(await get_watermark(session), 7)
+        with patch.object(settings, "AUTOBID_LOG_ROLLUPS_ENABLED", False):
+            raw = await self._stats()
+        self.assertEqual(await self._stats(), raw)
+        self.assertEqual(raw["total"], 8)
+
+        with patch.object(settings, "AUTOBID_LOG_ROLLUP_LAG_SECONDS", -60):
+            self.assertEqual(await self._refresh(), 2)
+        self.assertEqual(await self._stats(), raw)
+
+    async def test_log_pages(self):
+        async with self.session_factory() as session:
+            repository = AutobidLogRepository(session)
+            first, has_more = await repository.page("p1", limit=4)
+            self.assertTrue(has_more)
+            last = first[-1]
+            rest, has_more = await repository.page("p1", limit=4, after=(last.created_at, last.id))
+        self.assertFalse(has_more)
+        self.assertEqual([log.job_title for log in first + rest], [f"job {i}" for i in range(5, -1, -1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Profile, User
+from app.services.autobidder_settings_service import upsert_autobid_settings
+
+
+class TestUpsertAutobidSettings(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'settings.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.session_factory() as session:
+            session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+            session.add(Profile(id="p1", name="P1", profile_type="personal", user_id=1))
+            await session.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def test_passes_through_min_success_proba_and_keeps_it_when_unset(self):
+        async with self.session_factory() as db:
+            created = await upsert_autobid_settings("p1", True, 5, db, min_success_proba=0.4)
+            self.assertEqual(created.min_success_proba, 0.4)
+
+            updated = await upsert_autobid_settings("p1", False, 3, db)
+            self.assertEqual((updated.enabled, updated.daily_limit), (False, 3))
+            self.assertEqual(updated.min_success_proba, 0.4)
+
+    @patch("app.services.autobidder_settings_service.semantic_bid_cache.invalidate_opt_in", new_callable=AsyncMock)
+    async def test_semantic_cache_opt_in_change_invalidates_the_cached_tenant(self, mock_invalidate):
+        async with self.session_factory() as db:
+            created = await upsert_autobid_settings("p1", True, 5, db, semantic_cache_enabled=True)
+            self.assertTrue(created.semantic_cache_enabled)
+            mock_invalidate.assert_awaited_once_with("p1")
+
+            updated = await upsert_autobid_settings("p1", True, 5, db)
+            self.assertTrue(updated.semantic_cache_enabled)
+            self.assertEqual(mock_invalidate.await_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import Bid, Job, Profile, User
+from app.repositories.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.services.bids_service import list_bids_service
+
+START = datetime(2024, 3, 1)
+
+
+class TestCursor(unittest.TestCase):
+
+    def test_round_trip(self):
+        cursor = encode_cursor(START, "bid-7")
+        self.assertEqual(decode_cursor(cursor), (START, "bid-7"))
+
+    def test_garbage_is_rejected(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not-a-cursor")
+
+
+class TestBidPagination(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'bids.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with self.session_factory() as session:
+            self.owner = User(id=1, email="owner@example.com", hashed_password="x")
+            self.other = User(id=2, email="other@example.com", hashed_password="x")
+            session.add_all([self.owner, self.other])
+            session.add(Profile(id="p1", name="P1", profile_type="personal", user_id=1))
+            session.add(Profile(id="p2", name="P2", profile_type="personal", user_id=1))
+            session.add(Profile(id="p3", name="P3", profile_type="personal", user_id=2))
+            job = Job(id=uuid.uuid4(), title="job")
+            session.add(job)
+            for i in range(25):
+                # Pairs of bids share a timestamp so pages have to break ties on id
+                session.add(Bid(id=f"bid-{i:02d}", profile_id=("p1", "p2", "p3")[i % 3], job_id=job.id,
+                                amount=10.0 + i, status="won" if i % 5 == 0 else "created",
+                                submitted_at=START + timedelta(hours=i // 2)))
+            await session.commit()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def _all_pages(self, user, limit, **filters):
+        pages, cursor = [], None
+        async with self.session_factory() as session:
+            while True:
+                page = await list_bids_service(user, session, cursor=cursor, limit=limit, **filters)
+                pages.append([item["id"] for item in page["items"]])
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return pages
+
+    async def test_pages_cover_every_bid_once_newest_first(self):
+        pages = await self._all_pages(self.owner, limit=4, all_users=True)
+        ids = [bid_id for page in pages for bid_id in page]
+        self.assertEqual(ids, [f"bid-{i:02d}" for i in range(24, -1, -1)])
+        self.assertEqual([len(page) for page in pages], [4, 4, 4, 4, 4, 4, 1])
+
+    async def test_users_only_see_their_profiles(self):
+        pages = await self._all_pages(self.other, limit=3)
+        ids = [bid_id for page in pages for bid_id in page]
+        self.assertEqual(ids, [f"bid-{i:02d}" for i in range(23, -1, -3)])
+
+    async def test_filters(self):
+        pages = await self._all_pages(self.owner, limit=10, profile_id="p1", status="won",
+                                      submitted_from=START + timedelta(hours=1),
+                                      submitted_to=START + timedelta(hours=12))
+        self.assertEqual(pages, [["bid-15"]])
+
+    async def test_projection(self):
+        async with self.session_factory() as session:
+            page = await list_bids_service(self.owner, session, limit=1, fields="status,amount")
+            self.assertEqual(page["items"], [{"status": "created", "amount": 34.0}])
+
+            with self.assertRaises(HTTPException) as ctx:
+                await list_bids_service(self.owner, session, fields="id,hashed_password")
+            self.assertEqual(ctx.exception.status_code, 400)
+
+    async def test_deep_page_is_an_index_range_scan(self):
+        cursor = encode_cursor(START + timedelta(hours=3), "bid-06")
+        async with self.engine.connect() as conn:
+            plan = await conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT id FROM bids "
+                "WHERE submitted_at < :ts OR (submitted_at = :ts AND id < :id) "
+                "ORDER BY submitted_at DESC, id DESC LIMIT 5"
+            ), {"ts": decode_cursor(cursor)[0], "id": "bid-06"})
+            details = " ".join(row[-1] for row in plan)
+        self.assertIn("ix_bids_submitted_at_id", details)
+        self.assertNotIn("TEMP B-TREE", details)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.browser.browser_pool import BrowserPool
+
+
+class _FakeContext:
+    def __init__(self, storage_state):
+        self.storage_state_loaded = storage_state
+        self.handlers = []
+        self.closed = False
+
+    def on(self, event, handler):
+        if event == "page":
+            self.handlers.append(handler)
+
+    async def route(self, pattern, handler):
+        self.route_handler = handler
+
+    async def new_page(self):
+        page = SimpleNamespace(main_frame=None, on=lambda event, handler: None)
+        for handler in self.handlers:
+            handler(page)
+
+    async def storage_state(self, path):
+        with open(path, "w") as f:
+            json.dump({"cookies": ["refreshed"]}, f)
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, storage_state=None, **options):
+        context = _FakeContext(storage_state)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.connected = False
+
+
+class TestBrowserPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        patcher = patch("app.browser.browser_pool.settings.BROWSER_AUTH_STATE_DIR", self.state_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with open(os.path.join(self.state_dir, "p1_auth.json"), "w") as f:
+            json.dump({"cookies": []}, f)
+
+        self.launched = []
+
+        async def launcher():
+            self.launched.append(_FakeBrowser())
+            return self.launched[-1]
+
+        self.pool = BrowserPool(headless=True, max_contexts=2, recycle_after_pages=3, launcher=launcher)
+
+    async def asyncTearDown(self):
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    async def test_profiles_share_one_browser_with_their_own_sessions(self):
+        async with self.pool.lease("p1") as first, self.pool.lease("p2") as second:
+            self.assertIsNot(first, second)
+            self.assertEqual(first.storage_state_loaded, os.path.join(self.state_dir, "p1_auth.json"))
+            self.assertIsNone(second.storage_state_loaded)
+            self.assertTrue(hasattr(first, "route_handler"))  # resource blocking is on by default
+
+        self.assertEqual(len(self.launched), 1)
+        self.assertTrue(first.closed and second.closed)
+        with open(os.path.join(self.state_dir, "p1_auth.json")) as f:
+            self.assertEqual(json.load(f), {"cookies": ["refreshed"]})
+
+    async def test_browser_is_recycled_after_its_leases_end(self):
+        async with self.pool.lease("p1") as context:
+            for _ in range(3):
+                await context.new_page()
+            async with self.pool.lease("p2"):  # past the page budget: goes to a new browser
+                pass
+            self.assertEqual(len(self.launched), 2)
+            self.assertTrue(self.launched[0].connected)  # p1 is still using it
+        self.assertFalse(self.launched[0].connected)
+        self.assertEqual(self.pool.status()["generation"], 2)
+
+    async def test_disconnected_browser_is_relaunched(self):
+        await self.pool.start()
+        self.launched[0].connected = False
+        async with self.pool.lease("p1"):
+            pass
+        self.assertEqual(len(self.launched), 2)
+        self.assertTrue(self.pool.status()["healthy"])
+
+    async def test_leases_beyond_the_limit_wait(self):
+        entered = []
+
+        async def run(profile_id):
+            async with self.pool.lease(profile_id, save_state=False):
+                entered.append(profile_id)
+                await asyncio.sleep(0.05)
+
+        tasks = [asyncio.create_task(run(f"p{i}")) for i in range(3)]
+        await asyncio.sleep(0.02)
+        self.assertEqual(len(entered), 2)
+        await asyncio.gather(*tasks)
+        self.assertEqual(len(entered), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from app.config import settings
+from app.services.captcha_service import CaptchaError, CaptchaService, MockCaptchaProvider
+
+FAST = {
+    "CAPTCHA_EXPECTED_SOLVE_SECONDS": 0.01,
+    "CAPTCHA_MIN_POLL_SECONDS": 0.01,
+    "CAPTCHA_MAX_POLL_SECONDS": 0.02,
+    "CAPTCHA_TIMEOUT_SECONDS": 1.0,
+    "CAPTCHA_TOKEN_TTL_SECONDS": 60.0,
+}
+
+
+class TestCaptchaService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        patcher = patch.multiple(settings, **FAST)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_solves_overlap_and_share_poll_rounds(self):
+        provider = MockCaptchaProvider(solve_seconds=0.1)
+        service = CaptchaService([provider])
+        self.addAsyncCleanup(service.close)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        futures = [service.submit("https://example.com", f"key-{i}") for i in range(5)]
+        tokens = await asyncio.gather(*futures)
+        elapsed = loop.time() - started
+
+        self.assertEqual(len(set(tokens)), 5)
+        self.assertLess(elapsed, 0.3)  # one after another they take 0.5s
+        self.assertLess(provider.polls, 20)  # every pending task checked in the same round
+        self.assertEqual(service.snapshot()["providers"]["mock"]["solved"], 5)
+
+    async def test_fails_over_to_the_next_provider(self):
+        broken = MockCaptchaProvider(name="primary", fail_sitekeys=("key",))
+        backup = MockCaptchaProvider(name="backup")
+        service = CaptchaService([broken, backup])
+        self.addAsyncCleanup(service.close)
+
+        token = await service.solve("https://example.com", "key")
+
+        self.assertTrue(token.startswith("backup-token"))
+        self.assertEqual(service.stats["primary"]["failed"], 1)
+        # The failed provider cools down: the next task goes straight to the backup
+        await service.solve("https://example.com", "other")
+        self.assertEqual(len(broken.created), 1)
+        self.assertEqual(len(backup.created), 2)
+
+    async def test_raises_when_every_provider_fails(self):
+        service = CaptchaService([MockCaptchaProvider(fail_sitekeys=("key",))])
+        self.addAsyncCleanup(service.close)
+
+        with self.assertRaises(CaptchaError):
+            await service.solve("https://example.com", "key")
+
+    async def test_timeout_hands_the_task_to_the_next_provider(self):
+        slow = MockCaptchaProvider(name="slow", solve_seconds=60)
+        backup = MockCaptchaProvider(name="backup")
+        service = CaptchaService([slow, backup])
+        self.addAsyncCleanup(service.close)
+
+        with patch.object(settings, "CAPTCHA_TIMEOUT_SECONDS", 0.05):
+            token = await asyncio.wait_for(service.solve("https://example.com", "key"), timeout=1)
+
+        self.assertTrue(token.startswith("backup-token"))
+        self.assertEqual(service.stats["slow"]["failed"], 1)
+
+    async def test_prefetched_token_is_handed_out_once(self):
+        provider = MockCaptchaProvider()
+        service = CaptchaService([provider])
+        self.addAsyncCleanup(service.close)
+
+        service.prefetch("https://example.com", "key")
+        for _ in range(50):
+            if service.snapshot()["cached_tokens"]:
+                break
+            await asyncio.sleep(0.01)
+
+        first = service.submit("https://example.com", "key")
+        self.assertTrue(first.done())  # served from the cache, no new task
+        self.assertEqual(len(provider.created), 1)
+
+        second = await service.solve("https://example.com", "key")
+        self.assertNotEqual(await first, second)
+        self.assertEqual(len(provider.created), 2)
+
+    async def test_expired_tokens_are_not_reused(self):
+        provider = MockCaptchaProvider()
+        service = CaptchaService([provider])
+        self.addAsyncCleanup(service.close)
+
+        with patch.object(settings, "CAPTCHA_TOKEN_TTL_SECONDS", 0):
+            service.prefetch("https://example.com", "key")
+            await asyncio.sleep(0.1)
+            await service.solve("https://example.com", "key")
+
+        self.assertEqual(len(provider.created), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.jwt import create_access_token
+from app.config import settings
+from app.database import InstrumentedPool, _engine_options, _on_connect, pool_metrics
+from app.main import app
+
+
+class TestEngineOptions(unittest.TestCase):
+
+    def test_postgres_gets_pool_and_statement_timeout(self):
+        with patch.multiple(settings, DB_POOL_SIZE=7, DB_STATEMENT_TIMEOUT_MS=1500):
+            options = _engine_options("postgresql+asyncpg://u:p@db/app")
+        self.assertIs(options["poolclass"], InstrumentedPool)
+        self.assertEqual(options["pool_size"], 7)
+        self.assertFalse(options["echo"])
+        self.assertEqual(options["connect_args"]["server_settings"]["statement_timeout"], "1500")
+
+    def test_in_memory_sqlite_keeps_default_pool(self):
+        self.assertEqual(_engine_options("sqlite+aiosqlite://"), {"echo": settings.DB_ECHO})
+
+
+class TestPoolReuse(unittest.IsolatedAsyncioTestCase):
+    """Runs on its own file-backed SQLite engine, so no database server is needed."""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        url = f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'pool.db')}"
+        self.engine = create_async_engine(url, **_engine_options(url))
+        event.listen(self.engine.sync_engine, "connect", _on_connect)
+        self.session_factory = sessionmaker(bind=self.engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def test_sessions_reuse_pooled_connection(self):
+        self.assertIsInstance(self.engine.pool, InstrumentedPool)
+        before = pool_metrics.snapshot()
+        for _ in range(5):
+            async with self.session_factory() as session:
+                await session.execute(text("SELECT 1"))
+        after = pool_metrics.snapshot()
+
+        self.assertGreaterEqual(after["checkouts"] - before["checkouts"], 5)
+        self.assertLessEqual(after["connections_created"] - before["connections_created"], 1)
+        self.assertEqual(self.engine.pool.checkedout(), 0)
+        self.assertIn("wait_ms_p95", after)
+
+
+class TestPoolMetricsRoute(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    def _auth(self, role):
+        token = create_access_token({"sub": "someone@example.com", "role": role})
+        return {"Authorization": f"Bearer {token}"}
+
+    async def test_only_superadmins_see_pool_metrics(self):
+        response = await self.client.get("/metrics/db")
+        self.assertIn(response.status_code, (401, 403))
+        response = await self.client.get("/metrics/db", headers=self._auth("user"))
+        self.assertEqual(response.status_code, 403)
+
+        response = await self.client.get("/metrics/db", headers=self._auth("superadmin"))
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertIn("checkouts", response.json())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base
+from app.models import AutobidSettings, Bid, BidOutcome, Job, Profile, User
+from app.services.decision_engine import (
+    SKIP_BELOW_THRESHOLD,
+    SKIP_DAILY_LIMIT,
+    SKIP_NO_PREDICTION,
+    optimal_threshold,
+    select_bids,
+    tune_profile_thresholds,
+)
+
+
+def _job(title, budget=None):
+    return Job(id=uuid.uuid4(), title=title, budget=budget)
+
+
+class TestSelectBids(unittest.TestCase):
+
+    def test_picks_top_expected_value_not_discovery_order(self):
+        cheap, big, mid, weak = _job("cheap", 50), _job("big", 1000), _job("mid", 300), _job("weak", 5000)
+        scored = [(cheap, 0.9), (big, 0.6), (mid, 0.7), (weak, 0.1)]
+
+        selected, skipped = select_bids(scored, daily_limit=2, threshold=0.5)
+
+        self.assertEqual([c["job"].title for c in selected], ["big", "mid"])
+        reasons = {c["job"].title: c["reason"] for c in skipped}
+        self.assertEqual(reasons, {"cheap": SKIP_DAILY_LIMIT, "weak": SKIP_BELOW_THRESHOLD})
+
+    def test_missing_budget_and_prediction(self):
+        known, unknown, failed = _job("known", 100), _job("unknown"), _job("failed", 100)
+
+        selected, skipped = select_bids([(known, 0.5), (unknown, 0.8), (failed, None)], daily_limit=5, threshold=0.5)
+
+        self.assertEqual([c["job"].title for c in selected], ["unknown", "known"])  # batch median as value
+        self.assertEqual(selected[0]["value"], 100)
+        self.assertEqual(skipped[0]["reason"], SKIP_NO_PREDICTION)
+
+
+class TestOptimalThreshold(unittest.TestCase):
+
+    def test_maximises_realised_gain(self):
+        probas = [0.9, 0.8, 0.7, 0.4, 0.3, 0.2]
+        outcomes = [1, 1, 0, 1, 0, 0]
+        # gains with cost 0.2: 0.8, 1.6, 1.4, 2.2, 2.0, 1.8 -> bid down to 0.4
+        self.assertAlmostEqual(optimal_threshold(probas, outcomes, cost_ratio=0.2, bounds=[0.0, 1.0]), 0.4)
+
+    def test_unprofitable_history_returns_upper_bound(self):
+        self.assertEqual(optimal_threshold([0.6, 0.5], [0, 0], cost_ratio=0.2, bounds=[0.1, 0.9]), 0.9)
+
+    def test_ties_are_not_split(self):
+        # Both 0.5 bids go together: 1 + 0 - 2*0.4 = 0.2 > 0
+        self.assertEqual(optimal_threshold([0.5, 0.5], [1, 0], cost_ratio=0.4, bounds=[0.0, 1.0]), 0.5)
+
+
+class TestTuneProfileThresholds(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'decide.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def test_updates_profiles_with_enough_samples(self):
+        now = datetime(2024, 6, 1)
+        async with self.session_factory() as session:
+            session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+            for profile_id, n_bids in (("busy", 4), ("quiet", 1)):
+                session.add(Profile(id=profile_id, name=profile_id, profile_type="personal", user_id=1))
+                session.add(AutobidSettings(profile_id=profile_id, enabled=True, daily_limit=5))
+                for i in range(n_bids):
+                    job = Job(id=uuid.uuid4(), title=f"{profile_id} {i}")
+                    session.add(job)
+                    bid_id = f"{profile_id}-{i}"
+                    session.add(Bid(id=bid_id, profile_id=profile_id, job_id=job.id, amount=10.0,
+                                    submitted_at=now - timedelta(days=1),
+                                    predicted_success_proba=[0.9, 0.7, 0.4, 0.2][i]))
+                    session.add(BidOutcome(bid_id=bid_id, is_success=i < 2))
+            await session.commit()
+
+        with patch.multiple(settings, AUTOBID_THRESHOLD_MIN_SAMPLES=2, AUTOBID_BID_COST_RATIO=0.2,
+                            AUTOBID_THRESHOLD_BOUNDS=[0.05, 0.95]):
+            async with self.session_factory() as session:
+                thresholds = await tune_profile_thresholds(session, now=now)
+
+        self.assertEqual(thresholds, {"busy": 0.7})
+        async with self.session_factory() as session:
+            busy = await session.get(AutobidSettings, "busy")
+            quiet = await session.get(AutobidSettings, "quiet")
+        self.assertEqual(busy.min_success_proba, 0.7)
+        self.assertIsNone(quiet.min_success_proba)
+
+    async def test_bids_with_several_outcomes_count_once(self):
+        now = datetime(2024, 6, 1)
+        # (proba, outcomes): the 0.4 bid succeeded after four failed follow-ups
+        bids = [(0.9, [True]), (0.5, [False]), (0.4, [False, False, False, False, True])]
+        async with self.session_factory() as session:
+            session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+            session.add(Profile(id="p1", name="p1", profile_type="personal", user_id=1))
+            session.add(AutobidSettings(profile_id="p1", enabled=True, daily_limit=5))
+            for i, (proba, results) in enumerate(bids):
+                job = Job(id=uuid.uuid4(), title=f"job {i}")
+                session.add(job)
+                session.add(Bid(id=f"bid-{i}", profile_id="p1", job_id=job.id, amount=10.0,
+                                submitted_at=now - timedelta(days=1), predicted_success_proba=proba))
+                for is_success in results:
+                    session.add(BidOutcome(bid_id=f"bid-{i}", is_success=is_success))
+            await session.commit()
+
+        with patch.multiple(settings, AUTOBID_THRESHOLD_MIN_SAMPLES=2, AUTOBID_BID_COST_RATIO=0.2,
+                            AUTOBID_THRESHOLD_BOUNDS=[0.05, 0.95]):
+            async with self.session_factory() as session:
+                thresholds = await tune_profile_thresholds(session, now=now)
+
+        # Per bid, gains are 0.8, 0.6, 1.4; counted per outcome row the last would be 0.6 and cut at 0.9
+        self.assertEqual(thresholds, {"p1": 0.4})
+
+
+if __name__ == "__main__":
+    unittest.main()
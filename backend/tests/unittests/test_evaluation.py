@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+from app.ml.evaluation import calibration_table, evaluate_predictions
+
+
+class TestEvaluatePredictions(unittest.TestCase):
+
+    def test_perfect_ranking(self):
+        y_true = np.array([0, 0, 1, 1])
+        y_score = np.array([0.1, 0.2, 0.8, 0.9])
+
+        metrics = evaluate_predictions(y_true, y_score, threshold=0.5, k=1)
+
+        self.assertEqual(metrics["n_eval_rows"], 4)
+        self.assertEqual(metrics["auc"], 1.0)
+        self.assertEqual(metrics["precision_at_threshold"], 1.0)
+        self.assertEqual(metrics["recall_at_threshold"], 1.0)
+        self.assertEqual(metrics["precision_at_k"], 1.0)
+        self.assertAlmostEqual(metrics["brier_score"], (0.01 + 0.04 + 0.04 + 0.01) / 4)
+
+    def test_precision_at_k_only_counts_candidates_above_threshold(self):
+        y_true = np.array([1, 0, 1, 0])
+        y_score = np.array([0.9, 0.8, 0.3, 0.2])
+
+        metrics = evaluate_predictions(y_true, y_score, threshold=0.5, k=3)
+
+        self.assertEqual(metrics["precision_at_k"], 0.5)  # only two candidates clear 0.5
+        self.assertEqual(metrics["recall_at_threshold"], 0.5)
+
+    def test_single_class_has_no_auc(self):
+        metrics = evaluate_predictions(np.zeros(3), np.array([0.1, 0.2, 0.3]), threshold=0.5, k=5)
+        self.assertIsNone(metrics["auc"])
+        self.assertIsNone(metrics["precision_at_threshold"])
+        self.assertIsNone(metrics["precision_at_k"])
+
+    def test_calibration_table(self):
+        table = calibration_table(np.array([0, 1, 1]), np.array([0.05, 0.95, 1.0]))
+        self.assertEqual(len(table), 10)
+        self.assertEqual(table[0]["count"], 1)
+        self.assertEqual(table[9]["count"], 2)  # a score of 1.0 falls into the last bin
+        self.assertEqual(table[9]["fraction_positive"], 1.0)
+        self.assertIsNone(table[5]["mean_predicted"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+from app.browser.job_cards import CardSchemaError, extract_job_cards, parse_cards, parse_posted
+
+NOW = datetime(2025, 6, 14, 12, 0, 0)
+
+
+def _record(i, **overrides):
+    record = {"title": f"Job {i}", "href": f"/jobs/~01abc{i}/", "budget": "Fixed-price - Est. Budget: $1,500",
+              "posted": "Posted 2 hours ago"}
+    record.update(overrides)
+    return record
+
+
+class TestJobCards(unittest.IsolatedAsyncioTestCase):
+    async def test_whole_page_is_read_in_one_evaluation(self):
+        page = AsyncMock()
+        page.eval_on_selector_all.return_value = [_record(i) for i in range(50)]
+
+        cards = await extract_job_cards(page)
+
+        page.eval_on_selector_all.assert_awaited_once()
+        self.assertEqual(len(cards), 50)
+        self.assertEqual(cards[3].id, "~01abc3")
+        self.assertEqual(cards[3].link, "https://www.upwork.com/jobs/~01abc3/")
+        self.assertEqual(cards[3].budget, 1500.0)
+
+    def test_fields_are_parsed(self):
+        card = parse_cards([_record(1, budget="Hourly: $30.00-$55.50", posted="2025-06-14T09:30:00Z")], NOW)[0]
+        self.assertEqual(card.budget, 55.5)
+        self.assertEqual(card.posted_at, datetime(2025, 6, 14, 9, 30))
+        self.assertEqual(parse_posted("Posted an hour ago", NOW), datetime(2025, 6, 14, 11, 0))
+        self.assertIsNone(parse_posted("sometime", NOW))
+
+    def test_markup_changes_are_reported(self):
+        with self.assertRaisesRegex(CardSchemaError, "none had a link href"):
+            parse_cards([_record(i, href=None) for i in range(3)])
+        with self.assertLogs("app.browser.job_cards", level="WARNING"):
+            cards = parse_cards([_record(i, budget=None) for i in range(3)])
+        self.assertEqual([c.budget for c in cards], [None, None, None])
+        self.assertEqual(parse_cards([]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import SeenJob
+from app.services import job_store
+from app.utils.bloom_filter import BloomFilter
+
+
+def _cards(ids):
+    return [{"id": job_id, "title": f"Job {job_id}", "link": f"https://example.com/jobs/{job_id}"} for job_id in ids]
+
+
+class TestBloomFilter(unittest.TestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+        bloom.update(f"added-{i}" for i in range(10_000))
+
+        self.assertTrue(all(f"added-{i}" in bloom for i in range(10_000)))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+        self.assertLess(false_positives, 200)
+
+
+class TestJobStore(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'seen.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.session_factory() as session:
+            session.add(SeenJob(job_id="old-1", title="Old"))
+            await session.commit()
+
+        self.statements = []
+        event.listen(self.engine.sync_engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: self.statements.append(statement))
+        patcher = patch.object(job_store, "_bloom", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def test_a_page_of_cards_costs_one_query_per_step(self):
+        page = [f"new-{i}" for i in range(50)] + ["old-1"]
+        async with self.session_factory() as db:
+            await job_store.load_seen_jobs(db)
+            self.statements.clear()
+
+            unseen = await job_store.filter_unseen(db, page)
+            self.assertEqual(unseen, page[:50])
+            self.assertEqual(len(self.statements), 1)  # only "old-1" was a maybe
+
+            self.statements.clear()
+            inserted = await job_store.record_jobs(db, _cards(unseen), profile_id="p1")
+            self.assertEqual(sorted(inserted), sorted(unseen))
+            self.assertEqual(len([s for s in self.statements if s.lstrip().upper().startswith("INSERT")]), 1)
+
+            self.assertEqual(await job_store.filter_unseen(db, page + ["new-50"]), ["new-50"])
+            self.assertEqual((await db.get(SeenJob, "new-7")).profile_id, "p1")
+
+    async def test_recording_reports_only_jobs_nobody_recorded_before(self):
+        async with self.session_factory() as db:
+            # Another process recorded old-1 after this one built its filter
+            job_store._bloom = BloomFilter(1000)
+            inserted = await job_store.record_jobs(db, _cards(["old-1", "fresh"]), profile_id="p2")
+
+            self.assertEqual(inserted, ["fresh"])
+            self.assertIn("old-1", job_store._bloom)
+            self.assertEqual((await db.get(SeenJob, "old-1")).title, "Old")
+
+    async def test_jobs_beyond_the_bid_limit_stay_unseen_for_the_next_run(self):
+        page = _cards(["old-1", "a", "b", "c"])
+        async with self.session_factory() as db:
+            first_run = await job_store.claim_unseen(db, page, limit=1, profile_id="p1")
+            second_run = await job_store.claim_unseen(db, page, limit=1, profile_id="p1")
+
+            self.assertEqual([card["id"] for card in first_run], ["a"])
+            self.assertEqual([card["id"] for card in second_run], ["b"])
+            self.assertIsNone(await db.get(SeenJob, "c"))
+
+    async def test_claims_skip_jobs_another_process_took(self):
+        async with self.session_factory() as db:
+            # "a" looked unseen here, but another process records it first
+            async with self.session_factory() as other:
+                other.add(SeenJob(job_id="a"))
+                await other.commit()
+            with patch.object(job_store, "filter_unseen", return_value=["a", "b", "c"]):
+                claimed = await job_store.claim_unseen(db, _cards(["a", "b", "c"]), limit=2)
+
+            self.assertEqual([card["id"] for card in claimed], ["b", "c"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+from app.services import llm_dispatcher
+from app.services.llm_dispatcher import (
+    FakeLLMProvider,
+    FakeRateLimitError,
+    LLMDispatcher,
+    Priority,
+    TokenBucket,
+)
+
+
+def _request(text, model="gpt-4", **extra):
+    return dict(model=model, messages=[{"role": "user", "content": text}], max_tokens=50, **extra)
+
+
+class _ThrottledProvider(FakeLLMProvider):
+    """Answers 429 to the first ``failures`` calls."""
+
+    def __init__(self, failures, retry_after=0.01):
+        super().__init__()
+        self.failures = failures
+        self.retry_after = retry_after
+        self.sent_at = []
+
+    async def create(self, **request):
+        self.sent_at.append(asyncio.get_running_loop().time())
+        if self.failures:
+            self.failures -= 1
+            await asyncio.sleep(0.01)  # the 429 arrives after a round trip
+            raise FakeRateLimitError(retry_after=self.retry_after)
+        return await super().create(**request)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_wait_time_follows_the_refill_rate(self):
+        with patch("app.services.llm_dispatcher.time.monotonic", return_value=100.0):
+            bucket = TokenBucket(rate_per_minute=60)
+            bucket.take(60)
+            self.assertAlmostEqual(bucket.wait_time(2), 2.0)
+        with patch("app.services.llm_dispatcher.time.monotonic", return_value=101.0):
+            self.assertAlmostEqual(bucket.wait_time(2), 1.0)
+            bucket.adjust(-30)  # the request used 30 units less than reserved
+            self.assertEqual(bucket.wait_time(2), 0.0)
+
+
+class TestLLMDispatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_interactive_requests_jump_the_queue(self):
+        provider = FakeLLMProvider(latency=0.01)
+        dispatcher = LLMDispatcher(provider, max_concurrency=1)
+
+        background = [asyncio.create_task(dispatcher.complete(Priority.BACKGROUND, **_request(f"bg{i}")))
+                      for i in range(3)]
+        await asyncio.sleep(0)  # bg0 is admitted, bg1 and bg2 queue
+        interactive = asyncio.create_task(dispatcher.complete(Priority.INTERACTIVE, **_request("preview")))
+        await asyncio.gather(*background, interactive)
+
+        order = [call["messages"][0]["content"] for call in provider.calls]
+        self.assertEqual(order, ["bg0", "preview", "bg1", "bg2"])
+
+    async def test_throttling_halves_concurrency_and_retries(self):
+        dispatcher = LLMDispatcher(_ThrottledProvider(failures=2), max_concurrency=8)
+
+        response = await dispatcher.complete(**_request("hello"))
+
+        self.assertEqual(response.choices[0].message.content, "This is a generated reply.")
+        self.assertEqual(dispatcher.usage["gpt-4"].throttled, 2)
+        self.assertLess(dispatcher.concurrency.limit, 3)
+        self.assertEqual(dispatcher.concurrency.in_flight, 0)
+
+    async def test_a_429_pauses_queued_requests_too(self):
+        provider = _ThrottledProvider(failures=1, retry_after=0.2)
+        dispatcher = LLMDispatcher(provider, max_concurrency=1)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        await asyncio.gather(dispatcher.complete(**_request("a")), dispatcher.complete(**_request("b")))
+
+        # "b" was queued behind the throttled "a": it must not go out during the pause
+        self.assertEqual(len(provider.sent_at), 3)
+        self.assertTrue(all(at - started >= 0.2 for at in provider.sent_at[1:]), provider.sent_at)
+
+    async def test_gives_up_after_the_configured_retries(self):
+        dispatcher = LLMDispatcher(_ThrottledProvider(failures=10))
+        with patch("app.services.llm_dispatcher.settings.LLM_MAX_RETRIES", 1):
+            with self.assertRaises(FakeRateLimitError):
+                await dispatcher.complete(**_request("hello"))
+        self.assertEqual(dispatcher.concurrency.in_flight, 0)
+
+    @unittest.skipIf(llm_dispatcher.client is None, "OPENAI_API_KEY is not set")
+    async def test_sdk_does_not_retry_behind_the_dispatcher(self):
+        self.assertEqual(llm_dispatcher.client.max_retries, 0)
+
+    async def test_requests_per_minute_are_spread_out(self):
+        dispatcher = LLMDispatcher(FakeLLMProvider())
+        with patch.dict("app.services.llm_dispatcher.settings.LLM_RATE_LIMITS", {"small": (600, 1_000_000)}):
+            bucket = dispatcher._limits_for("small")[0]
+            bucket.tokens = 1  # one request left, then one every 0.1s
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            await asyncio.gather(*(dispatcher.complete(**_request(str(i), model="small")) for i in range(3)))
+            self.assertGreaterEqual(loop.time() - started, 0.18)
+
+    async def test_tokens_and_cost_are_accounted(self):
+        dispatcher = LLMDispatcher(FakeLLMProvider(reply="one two three"))
+        await dispatcher.complete(**_request("x" * 400))
+        chunks = [chunk async for chunk in dispatcher.stream(Priority.BACKGROUND, **_request("y" * 400))]
+
+        self.assertEqual("".join(c.choices[0].delta.content for c in chunks), "one two three")
+        usage = dispatcher.usage_snapshot()["models"]["gpt-4"]
+        self.assertEqual(usage["requests"], 2)
+        self.assertEqual(usage["prompt_tokens"], 202)
+        self.assertGreater(usage["cost_usd"], 0.006)
+        self.assertEqual(dispatcher.concurrency.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
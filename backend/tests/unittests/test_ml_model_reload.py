@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from sklearn.dummy import DummyClassifier
+
+from app.config import settings
+from app.ml.trainer import save_model
+from app.schemas.ml import PredictionFeaturesInput
+from app.services import ml_service
+
+
+def _model(version: str, success_rate: float) -> DummyClassifier:
+    successes = round(success_rate * 10)
+    model = DummyClassifier(strategy="prior").fit(np.zeros((10, 1)), [1] * successes + [0] * (10 - successes))
+    model.version = version
+    return model
+
+
+class TestModelReload(unittest.IsolatedAsyncioTestCase):
+    """Each test case stands for a worker that was never sent the reload request."""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+        self.model_path = Path(self.tmp_dir) / "model.joblib"
+        patcher = patch.multiple(ml_service, MODEL_PATH=self.model_path, MODEL=None,
+                                 _loaded_mtime=None, _next_reload_check_at=0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        save_model(_model("v1", 0.2), str(self.model_path))
+        ml_service.load_model_on_startup()
+
+    def _publish_from_another_worker(self, model):
+        save_model(model, str(self.model_path))
+        # Coarse filesystem timestamps could leave the mtime unchanged within one tick
+        stat = os.stat(self.model_path)
+        os.utime(self.model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    async def _predict(self):
+        return await ml_service.predict_success_proba_service(PredictionFeaturesInput(features={"x0": 0}))
+
+    async def test_picks_up_a_model_written_by_another_worker(self):
+        with patch.object(settings, "MODEL_RELOAD_CHECK_SECONDS", 0):
+            self.assertIn("version v1", (await self._predict()).model_info)
+
+            self._publish_from_another_worker(_model("v2", 0.7))
+            result = await self._predict()
+
+        self.assertIn("version v2", result.model_info)
+        self.assertAlmostEqual(result.success_probability, 0.7)
+
+    async def test_checks_the_file_at_most_once_per_interval(self):
+        with patch.object(settings, "MODEL_RELOAD_CHECK_SECONDS", 60):
+            await self._predict()
+            self._publish_from_another_worker(_model("v2", 0.7))
+            self.assertIn("version v1", (await self._predict()).model_info)
+
+            ml_service._next_reload_check_at = 0.0  # the interval has passed
+            self.assertIn("version v2", (await self._predict()).model_info)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+
+from app.browser.pacing import PacingScheduler
+
+
+class TestPacingScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_waiting_profiles_free_the_slot_for_others(self):
+        scheduler = PacingScheduler(concurrency=1, min_delay=0.1, max_delay=0.1)
+        events = []
+
+        def steps(profile_id, remaining):
+            async def step():
+                events.append(profile_id)
+                await asyncio.sleep(0.01)  # a browser session
+                return steps(profile_id, remaining - 1) if remaining > 1 else None
+            return step
+
+        for profile_id in ("a", "b", "c"):
+            scheduler.schedule(profile_id, steps(profile_id, 2))
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await scheduler.run_until_idle()
+        elapsed = loop.time() - started
+
+        # Every profile ran its first session before anyone's pause was over
+        self.assertEqual(events[:3], ["a", "b", "c"])
+        self.assertEqual(sorted(events), ["a", "a", "b", "b", "c", "c"])
+        self.assertLess(elapsed, 0.3)  # pauses overlapped; run back to back they take 0.3s + sessions
+        self.assertEqual(scheduler.pending(), 0)
+
+    async def test_a_failing_step_ends_only_its_own_run(self):
+        scheduler = PacingScheduler(concurrency=2, min_delay=0, max_delay=0)
+        done = []
+
+        async def broken():
+            raise RuntimeError("page crashed")
+
+        async def fine():
+            done.append("ok")
+
+        scheduler.schedule("a", broken)
+        scheduler.schedule("b", fine)
+        with self.assertLogs("app.browser.pacing", level="ERROR"):
+            await scheduler.run_until_idle()
+        self.assertEqual(done, ["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
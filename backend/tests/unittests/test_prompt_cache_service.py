@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import AIPrompt, AutobidLog
+from app.services.bid_generation_service import build_bid_prompt
+from app.services.keyword_profile_service import get_top_keywords_for_profile
+from app.services.prompt_cache_service import (
+    _load_active_prompt,
+    compile_template,
+    get_active_prompt,
+    invalidate_active_prompt,
+)
+
+
+class TestCompiledTemplates(unittest.TestCase):
+    def test_render_only_fills_the_job_description(self):
+        parts = compile_template("Job: {job_description}\nBudget {x}. Again: {job_description}")
+        self.assertEqual(len(parts), 3)
+        self.assertEqual("FastAPI".join(parts), "Job: FastAPI\nBudget {x}. Again: FastAPI")
+
+
+class TestPromptContextCache(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'prompts.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.session_factory() as session:
+            session.add(AIPrompt(id=7, profile_id="p1", name="Default", is_active=True,
+                                 prompt_text="Proposal for {job_description}"))
+            session.add(AutobidLog(profile_id="p1", job_title="FastAPI backend developer",
+                                   job_link="https://example.com/1", status="success"))
+            await session.commit()
+
+        self.statements = []
+        event.listen(self.engine.sync_engine, "before_cursor_execute", self._record)
+        self.patches = [
+            patch.object(cache, "l2", new_callable=AsyncMock)
+            for cache in (_load_active_prompt.cache, get_top_keywords_for_profile.cache)
+        ]
+        for p in self.patches:
+            p.start().get.return_value = None
+        _load_active_prompt.cache.l1.clear()
+        get_top_keywords_for_profile.cache.l1.clear()
+
+    async def asyncTearDown(self):
+        for p in self.patches:
+            p.stop()
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _record(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    async def test_steady_state_bid_prompt_needs_no_queries(self):
+        job = {"description": "Need a FastAPI backend"}
+        async with self.session_factory() as db:
+            first = await build_bid_prompt(job, "p1", db)
+            self.assertGreater(len(self.statements), 0)
+            self.statements.clear()
+            second = await build_bid_prompt(job, "p1", db)
+
+        self.assertEqual(self.statements, [])
+        self.assertEqual(first, second)
+        self.assertTrue(first.startswith("Proposal for Need a FastAPI backend"))
+        self.assertIn("affinity score +", first)
+
+    @patch("app.tiered_cache._publish", new_callable=AsyncMock)
+    async def test_invalidation_picks_up_the_new_prompt(self, mock_publish):
+        async with self.session_factory() as db:
+            self.assertEqual((await get_active_prompt(db, "p1")).render("x"), "Proposal for x")
+            prompt = await db.get(AIPrompt, 7)
+            prompt.prompt_text = "Updated: {job_description}"
+            await db.commit()
+            self.assertEqual((await get_active_prompt(db, "p1")).render("x"), "Proposal for x")  # still cached
+
+            await invalidate_active_prompt("p1")
+            self.assertEqual((await get_active_prompt(db, "p1")).render("x"), "Updated: x")
+            self.assertIsNone(await get_active_prompt(db, "no-prompt-profile"))
+        mock_publish.assert_awaited_once_with("active_prompt", "p1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import fnmatch
+import json
+import unittest
+
+import numpy as np
+
+from app.redis_cache import RedisCache, decode_value, encode_value
+
+
+class _InMemoryRedis:
+    """The handful of redis.asyncio.Redis calls RedisCache makes, over a dict."""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        self.calls.append(("mget", len(keys)))
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def scan_iter(self, match, count):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    async def unlink(self, *keys):
+        self.calls.append(("unlink", len(keys)))
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction):
+        redis, commands = self, []
+
+        class _Pipeline:
+            def set(self, key, value, ex=None):
+                commands.append((key, value))
+
+            async def execute(self):
+                redis.calls.append(("pipeline", len(commands)))
+                redis.data.update(commands)
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return _Pipeline()
+
+
+class TestCodec(unittest.TestCase):
+    def test_arrays_round_trip_as_raw_buffers(self):
+        array = np.arange(12, dtype=np.float32).reshape(3, 4)
+        encoded = encode_value(array)
+        self.assertLess(len(encoded), 100)
+        decoded = decode_value(encoded)
+        self.assertEqual(decoded.dtype, np.float32)
+        np.testing.assert_array_equal(decoded, array)
+
+    def test_json_values_and_numpy_scalars(self):
+        value = {"proba": np.float64(0.25), "ids": [1, 2], "text": "ok"}
+        self.assertEqual(decode_value(encode_value(value)), {"proba": 0.25, "ids": [1, 2], "text": "ok"})
+        self.assertIsNone(decode_value(encode_value(None)))
+
+    def test_values_written_with_json_dumps_still_decode(self):
+        self.assertEqual(decode_value(json.dumps("preview").encode()), "preview")
+        self.assertIsNone(decode_value(b"null"))
+
+
+class TestRedisCacheBulk(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = RedisCache("redis://unused")
+        self.redis = _InMemoryRedis()
+        self.cache._client = self.redis
+
+    async def test_set_many_and_get_many_are_chunked(self):
+        items = {f"emb:{i}": np.full(4, i, dtype=np.float32) for i in range(1200)}
+        await self.cache.set_many(items)
+        self.assertEqual([c for c in self.redis.calls if c[0] == "pipeline"],
+                         [("pipeline", 500), ("pipeline", 500), ("pipeline", 200)])
+
+        found = await self.cache.get_many(["emb:0", "emb:1199", "emb:missing"])
+        self.assertEqual(set(found), {"emb:0", "emb:1199"})
+        np.testing.assert_array_equal(found["emb:1199"], np.full(4, 1199, dtype=np.float32))
+
+    async def test_clear_cache_by_prefix_unlinks_while_scanning(self):
+        await self.cache.set_many({f"preview_cache:{i}": i for i in range(1001)})
+        await self.cache.set("other:1", "kept")
+
+        removed = await self.cache.clear_cache_by_prefix("preview_cache")
+
+        self.assertEqual(removed, 1001)
+        self.assertEqual([c for c in self.redis.calls if c[0] == "unlink"],
+                         [("unlink", 500), ("unlink", 500), ("unlink", 1)])
+        self.assertEqual(await self.cache.get("other:1"), "kept")
+
+    async def test_errors_degrade_to_cache_misses(self):
+        async def broken(*args, **kwargs):
+            raise ConnectionError("down")
+
+        self.redis.mget = broken
+        self.assertEqual(await self.cache.get_many(["a"]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.browser.resource_blocker import ResourceBlocker, ResourceStats
+
+
+def _route(resource_type, url):
+    return SimpleNamespace(request=SimpleNamespace(resource_type=resource_type, url=url),
+                           abort=AsyncMock(), continue_=AsyncMock())
+
+
+class TestResourceBlocker(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.stats = ResourceStats()
+        self.blocker = ResourceBlocker(
+            blocked_types=["image", "font"],
+            blocked_domains=["google-analytics.com"],
+            allowed_domains=["challenges.cloudflare.com"],
+            stats=self.stats,
+        )
+
+    def test_rules(self):
+        block = self.blocker.should_block
+        self.assertTrue(block("image", "https://www.upwork.com/logo.png"))
+        self.assertTrue(block("script", "https://ssl.google-analytics.com/ga.js"))
+        self.assertFalse(block("script", "https://www.upwork.com/app.js"))
+        self.assertFalse(block("image", "https://challenges.cloudflare.com/cdn/turnstile.png"))
+        self.assertFalse(block("document", "https://www.google-analytics.com/"))
+        self.assertFalse(block("script", "https://notgoogle-analytics.com/x.js"))
+
+    async def test_blocked_requests_are_aborted_and_counted(self):
+        routes = [_route("image", "https://a.com/1.png"), _route("font", "https://a.com/f.woff2"),
+                  _route("xhr", "https://a.com/api")]
+        for route in routes:
+            await self.blocker._handle(route)
+
+        routes[0].abort.assert_awaited_once()
+        routes[2].continue_.assert_awaited_once()
+        routes[2].abort.assert_not_awaited()
+        snapshot = self.stats.snapshot()
+        self.assertEqual((snapshot["requests"], snapshot["blocked"]), (3, 2))
+        self.assertEqual(snapshot["blocked_by_type"], {"image": 1, "font": 1})
+        self.assertEqual(snapshot["estimated_bytes_saved"], 100_000)
+
+    def test_page_load_time_runs_from_navigation_to_load(self):
+        handlers = {}
+        page = SimpleNamespace(main_frame="main", on=lambda event, handler: handlers.__setitem__(event, handler))
+        self.blocker._watch_page(page)
+
+        handlers["request"](SimpleNamespace(is_navigation_request=lambda: True, frame="main"))
+        handlers["load"](page)
+        handlers["load"](page)  # a load without a tracked navigation is ignored
+
+        self.assertEqual(self.stats.page_loads, 1)
+        self.assertIsNotNone(self.stats.snapshot()["avg_page_load_seconds"])
+
+
+if __name__ == "__main__":
+    unittest.main()
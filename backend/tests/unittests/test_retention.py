@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.database import Base
+from app.models import AutobidLog, Bid, BidOutcome, Job, Profile, User
+from app.services.autobid_log_analytics_service import get_log_stats
+from app.services.retention_service import apply_retention
+from app.utils.columnar_archive import read_archive, write_archive
+
+NOW = datetime(2024, 9, 15, 12)
+
+
+class TestColumnarArchive(unittest.TestCase):
+
+    def test_npz_round_trip(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir, True)
+        rows = [
+            {"id": 1, "score": 0.5, "status": "ok", "created_at": datetime(2024, 1, 2, 3, 4, 5), "meta": {"a": 1}},
+            {"id": 2, "score": None, "status": None, "created_at": None, "meta": None},
+        ]
+        path = write_archive(rows, Path(tmp_dir) / "sample", "npz")
+        self.assertEqual(path.suffix, ".npz")
+        self.assertEqual(read_archive(path), [
+            {"id": 1, "score": 0.5, "status": "ok", "created_at": datetime(2024, 1, 2, 3, 4, 5), "meta": '{"a": 1}'},
+            {"id": 2, "score": None, "status": None, "created_at": None, "meta": None},
+        ])
+
+
+class TestRetention(unittest.IsolatedAsyncioTestCase):
+    """Batch archive-and-delete path, as used on SQLite."""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'retention.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        async with self.session_factory() as session:
+            session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+            session.add(Profile(id="p1", name="P1", profile_type="personal", user_id=1))
+            job = Job(id=uuid.uuid4(), title="job")
+            session.add(job)
+            # One log and one bid per 10 days, going back 200 days
+            for i in range(20):
+                at = NOW - timedelta(days=10 * i + 1)
+                session.add(AutobidLog(profile_id="p1", job_title=f"job {i}", job_link="https://example.com",
+                                       status="skipped", score=0.4, created_at=at))
+                session.add(Bid(id=f"bid-{i:02d}", profile_id="p1", job_id=job.id, amount=5.0, submitted_at=at,
+                                bid_settings_snapshot={"budget": 100}))
+                session.add(BidOutcome(bid_id=f"bid-{i:02d}", is_success=i % 2 == 0, outcome_timestamp=at))
+            await session.commit()
+
+        patcher = patch.multiple(
+            settings,
+            RETENTION_ARCHIVE_DIR=os.path.join(self.tmp_dir, "archive"),
+            RETENTION_ARCHIVE_FORMAT="npz",
+            RETENTION_AUTOBID_LOGS_HOT_DAYS=90,
+            RETENTION_BIDS_HOT_DAYS=None,
+            RETENTION_BATCH_SIZE=3,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def _count(self, model):
+        async with self.session_factory() as session:
+            return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+    async def _retain(self):
+        async with self.session_factory() as session:
+            return await apply_retention(session, now=NOW)
+
+    def _archived(self, table):
+        rows = []
+        for path in sorted(Path(settings.RETENTION_ARCHIVE_DIR, table).rglob("*.npz")):
+            rows.extend(read_archive(path))
+        return rows
+
+    async def test_logs_outside_hot_window_are_archived(self):
+        with patch.object(settings, "AUTOBID_LOG_ROLLUPS_ENABLED", False):
+            before = await self._stats()
+        report = await self._retain()
+
+        self.assertEqual(report["autobid_logs"]["archived_rows"], 11)  # days 91..191
+        self.assertNotIn("bids", report)  # bids are kept unless RETENTION_BIDS_HOT_DAYS is set
+        self.assertEqual(await self._count(AutobidLog), 9)
+        self.assertEqual(await self._count(Bid), 20)
+
+        archived = self._archived("autobid_logs")
+        self.assertEqual(sorted(row["job_title"] for row in archived), sorted(f"job {i}" for i in range(9, 20)))
+        months = {path.parent.name for path in Path(settings.RETENTION_ARCHIVE_DIR, "autobid_logs").rglob("*.npz")}
+        self.assertEqual(months, {"2024-03", "2024-04", "2024-05", "2024-06"})
+
+        # Rolled up before deletion, so stats still cover the archived days
+        self.assertEqual(await self._stats(), before)
+        self.assertEqual((await self._retain())["autobid_logs"]["archived_rows"], 0)
+
+    async def test_bids_are_archived_with_their_outcomes(self):
+        with patch.object(settings, "RETENTION_BIDS_HOT_DAYS", 100):
+            report = await self._retain()
+        self.assertEqual(report["bids"]["archived_rows"], 10)
+        self.assertEqual(await self._count(Bid), 10)
+        self.assertEqual(await self._count(BidOutcome), 10)
+
+        outcomes = self._archived("bid_outcomes")
+        self.assertEqual(sorted(row["bid_id"] for row in outcomes), [f"bid-{i:02d}" for i in range(10, 20)])
+        bids = self._archived("bids")
+        self.assertEqual(bids[0]["bid_settings_snapshot"], '{"budget": 100}')
+
+    async def _stats(self):
+        async with self.session_factory() as session:
+            return await get_log_stats(session, "p1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import AutobidSettings, Profile, User
+from app.services import semantic_bid_cache
+from app.services.llm_dispatcher import FakeLLMProvider, LLMDispatcher, Priority
+from app.services.semantic_bid_cache import SemanticLookup, embed_text
+
+
+class _FakeRedisCache:
+    """The slice of RedisCache the semantic cache uses, in memory."""
+
+    def __init__(self):
+        self.values, self.counters = {}, {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl_seconds=None):
+        # Round-trip like the real codec: arrays come back as lists
+        self.values[key] = [dict(e, embedding=np.asarray(e["embedding"]).tolist()) for e in value]
+
+    async def claim(self, key, owner, ttl_seconds):
+        return self.values.setdefault(key, owner)
+
+    async def incr_counters(self, key, **increments):
+        for name, amount in increments.items():
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    async def get_counters(self, key):
+        return dict(self.counters)
+
+
+JOB = "Need a FastAPI backend developer for a REST API with PostgreSQL and Docker"
+
+
+class TestEmbedding(unittest.TestCase):
+    def test_similar_jobs_are_closer_than_unrelated_ones(self):
+        job = embed_text(JOB)
+        self.assertAlmostEqual(float(np.linalg.norm(job)), 1.0, places=5)
+        similar = embed_text(JOB + " deployment")
+        unrelated = embed_text("Logo design for a bakery, Illustrator and brand guidelines")
+        self.assertGreater(float(job @ similar), 0.9)
+        self.assertLess(float(job @ unrelated), 0.3)
+
+
+class TestSemanticLookup(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.redis = _FakeRedisCache()
+        self.provider = FakeLLMProvider(reply="A rephrased proposal.")
+        patches = [
+            patch.object(semantic_bid_cache, "redis_cache_client", self.redis),
+            patch.object(semantic_bid_cache, "get_llm_dispatcher", return_value=LLMDispatcher(self.provider)),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    async def test_same_profile_reuses_its_text(self):
+        await SemanticLookup("p1", "u1", "tmpl", JOB).remember("Hello, I built many FastAPI services.")
+
+        text = await SemanticLookup("p1", "u1", "tmpl", JOB).find(Priority.BACKGROUND)
+
+        self.assertEqual(text, "Hello, I built many FastAPI services.")
+        self.assertEqual(self.provider.calls, [])
+
+    async def test_other_profiles_get_an_adapted_text_they_own(self):
+        await SemanticLookup("p1", "u1", "tmpl", JOB).remember("Hello, I built many FastAPI services.")
+
+        text = await SemanticLookup("p2", "u1", "tmpl", JOB).find(Priority.BACKGROUND)
+        self.assertEqual(text, "A rephrased proposal.")
+        self.assertEqual(len(self.provider.calls), 1)
+
+        # The adapted text now belongs to p2: a third profile cannot be handed the same one
+        self.assertIsNone(await SemanticLookup("p3", "u1", "tmpl", JOB).find(Priority.BACKGROUND))
+
+    async def test_templates_and_unrelated_jobs_do_not_share_entries(self):
+        await SemanticLookup("p1", "u1", "tmpl", JOB).remember("Hello, I built many FastAPI services.")
+
+        self.assertIsNone(await SemanticLookup("p1", "u1", "other", JOB).find(Priority.BACKGROUND))
+        self.assertIsNone(await SemanticLookup("p1", "u1", "tmpl", "Logo design for a bakery").find(Priority.BACKGROUND))
+
+    async def test_profiles_of_other_users_never_see_the_entries(self):
+        await SemanticLookup("p1", "u1", "tmpl", JOB).remember("Hello, I built many FastAPI services.")
+
+        self.assertIsNone(await SemanticLookup("p9", "u2", "tmpl", JOB).find(Priority.BACKGROUND))
+        self.assertEqual(self.provider.calls, [])
+
+    async def test_hit_rate(self):
+        await SemanticLookup("p1", "u1", "tmpl", JOB).remember("Hello, I built many FastAPI services.")
+        await SemanticLookup("p1", "u1", "tmpl", JOB).find(Priority.BACKGROUND)
+        await SemanticLookup("p2", "u1", "tmpl", JOB).find(Priority.BACKGROUND)
+        await SemanticLookup("p1", "u1", "tmpl", "Logo design for a bakery").find(Priority.BACKGROUND)
+
+        stats = await semantic_bid_cache.get_stats()
+        self.assertEqual((stats["hits"], stats["adapted_hits"], stats["misses"]), (1, 1, 1))
+        self.assertAlmostEqual(stats["hit_rate"], 0.6667)
+
+
+
+class TestTenantFor(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'tenant.db')}")
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with self.session_factory() as session:
+            session.add(User(id=7, email="owner@example.com", hashed_password="x"))
+            session.add(Profile(id="in", name="In", profile_type="agency", user_id=7))
+            session.add(Profile(id="out", name="Out", profile_type="personal", user_id=7))
+            session.add(AutobidSettings(profile_id="in", enabled=True, daily_limit=5, semantic_cache_enabled=True))
+            session.add(AutobidSettings(profile_id="out", enabled=True, daily_limit=5))
+            await session.commit()
+        p = patch.object(semantic_bid_cache._load_opt_in.cache, "l2", new_callable=AsyncMock)
+        p.start().get.return_value = None
+        self.addCleanup(p.stop)
+        semantic_bid_cache._load_opt_in.cache.l1.clear()
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def test_opted_in_profiles_share_within_their_owner(self):
+        async with self.session_factory() as db:
+            self.assertEqual(await semantic_bid_cache.tenant_for(db, "in"), "7")
+            self.assertIsNone(await semantic_bid_cache.tenant_for(db, "out"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+from app.tiered_cache import LRUCache, TieredCache, _MISSING, handle_invalidation
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(cache.get("b"), _MISSING)
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+
+    def test_expired_entries_are_misses(self):
+        cache = LRUCache(max_entries=2, ttl_seconds=60)
+        with patch("app.tiered_cache.time.monotonic", return_value=1000.0):
+            cache.set("a", 1)
+        with patch("app.tiered_cache.time.monotonic", return_value=1061.0):
+            self.assertEqual(cache.get("a"), _MISSING)
+        self.assertEqual(len(cache), 0)
+
+    def test_byte_budget_evicts_oldest_entries(self):
+        cache = LRUCache(max_entries=100, ttl_seconds=60, max_bytes=250)
+        for key in "abc":
+            cache.set(key, "x" * 100)
+        self.assertEqual(cache.get("a"), _MISSING)
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.size_bytes, 250)
+        cache.delete("b")
+        cache.clear()
+        self.assertEqual(cache.size_bytes, 0)
+
+
+class TestTieredCacheInvalidation(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.l2 = AsyncMock()
+        self.l2.get.return_value = None
+        self.cache = TieredCache("test_tiered", l2=self.l2)
+        self.compute = AsyncMock(return_value="value")
+
+    @patch("app.tiered_cache._publish", new_callable=AsyncMock)
+    async def test_invalidate_drops_both_tiers_and_publishes(self, mock_publish):
+        await self.cache.get_or_compute("k", self.compute)
+        await self.cache.invalidate("k")
+
+        self.l2.delete.assert_awaited_once_with("test_tiered:k")
+        mock_publish.assert_awaited_once_with("test_tiered", "k")
+        await self.cache.get_or_compute("k", self.compute)
+        self.assertEqual(self.compute.await_count, 2)
+
+    async def test_messages_from_other_workers_drop_l1(self):
+        await self.cache.get_or_compute("k", self.compute)
+        await self.cache.get_or_compute("other", self.compute)
+
+        handle_invalidation(b"test_tiered\nk")
+        self.assertEqual(self.cache.l1.get("k"), _MISSING)
+        self.assertEqual(self.cache.l1.get("other"), "value")
+
+        handle_invalidation("test_tiered\n*")
+        self.assertEqual(len(self.cache.l1), 0)
+
+    @patch("app.tiered_cache._publish", new_callable=AsyncMock)
+    async def test_load_running_during_invalidation_does_not_store_its_value(self, mock_publish):
+        source = {"value": "old"}
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_compute():
+            value = source["value"]  # read before the update
+            started.set()
+            await release.wait()
+            return value
+
+        pending = asyncio.create_task(self.cache.get_or_compute("k", slow_compute))
+        await started.wait()
+        source["value"] = "new"
+        await self.cache.invalidate("k")
+        release.set()
+
+        self.assertEqual(await pending, "old")  # the caller that asked first still gets an answer
+        self.l2.set.assert_not_awaited()
+        self.assertEqual(self.cache.l1.get("k"), _MISSING)
+        self.assertEqual(await self.cache.get_or_compute("k", slow_compute), "new")
+
+    async def test_invalidation_from_another_worker_also_discards_running_loads(self):
+        started, release = asyncio.Event(), asyncio.Event()
+
+        async def slow_compute():
+            started.set()
+            await release.wait()
+            return "old"
+
+        pending = asyncio.create_task(self.cache.get_or_compute("k", slow_compute))
+        await started.wait()
+        handle_invalidation("test_tiered\n*")
+        release.set()
+        await pending
+
+        self.l2.set.assert_not_awaited()
+        self.assertEqual(self.cache.l1.get("k"), _MISSING)
+
+
+if __name__ == "__main__":
+    unittest.main()
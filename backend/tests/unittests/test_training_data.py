@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import Base
+from app.ml.feature_extraction import EMBEDDING_DIM, FEATURE_NAMES
+from app.ml.trainer import checkpoint_path, load_checkpoint, run_training, train_from_dataset
+from app.ml.training_data import assemble_training_dataset, iter_shards, load_manifest
+from app.models import Bid, BidOutcome, Job, ModelMetrics, Profile, User
+from app.services.model_metrics_service import ModelMetricsService
+
+START = datetime(2024, 1, 1)
+
+
+class TestTrainingDataAssembler(unittest.TestCase):
+    """Runs synchronously because run_training drives the assembler with asyncio.run."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        # NullPool: every asyncio.run() below gets its own event loop
+        self.engine = create_async_engine(
+            f"sqlite+aiosqlite:///{os.path.join(self.tmp_dir, 'train.db')}", poolclass=NullPool
+        )
+        self.session_factory = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        asyncio.run(self._seed())
+
+        for target in ("app.ml.training_data.AsyncSessionLocal", "app.ml.trainer.AsyncSessionLocal"):
+            patcher = patch(target, self.session_factory)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    async def _seed(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        rng = np.random.default_rng(0)
+        async with self.session_factory() as session:
+            session.add(User(id=1, email="owner@example.com", hashed_password="x"))
+            session.add(Profile(id="p1", name="P1", profile_type="personal", user_id=1,
+                                skills=["python", "sql"], experience_level="Expert"))
+            for i in range(12):
+                job = Job(id=uuid.uuid4(), title=f"job {i}",
+                          description_embedding=rng.random(EMBEDDING_DIM).tolist())
+                session.add(job)
+                bid = Bid(id=f"bid-{i:02d}", profile_id="p1", job_id=job.id, amount=10.0,
+                          submitted_at=START + timedelta(hours=i),
+                          bid_settings_snapshot={"budget": 100 + i, "is_fixed_price": True})
+                session.add(bid)
+                if i < 10:  # the last two bids have no outcome yet
+                    session.add(BidOutcome(bid_id=bid.id, is_success=i % 2 == 0,
+                                           outcome_timestamp=START + timedelta(days=1, hours=i)))
+            await session.commit()
+
+    async def _add_late_outcomes(self):
+        async with self.session_factory() as session:
+            for i in (10, 11):
+                session.add(BidOutcome(bid_id=f"bid-{i:02d}", is_success=True,
+                                       outcome_timestamp=START + timedelta(days=2, hours=i)))
+            await session.commit()
+
+    async def _metrics(self, model_version) -> ModelMetrics:
+        async with self.session_factory() as session:
+            return await ModelMetricsService(session).get_by_version(model_version)
+
+    def _paths(self):
+        return patch.multiple(
+            settings,
+            MODEL_PATH=os.path.join(self.tmp_dir, "artifacts", "model.joblib"),
+            TRAINING_DATA_DIR=os.path.join(self.tmp_dir, "current"),
+            TRAINING_DELTA_DIR=os.path.join(self.tmp_dir, "delta"),
+            TRAINING_NUM_BOOST_ROUND=5,
+            TRAINING_INCREMENTAL_BOOST_ROUND=2,
+        )
+
+    def test_assembles_labelled_bids_into_shards(self):
+        dataset_dir = os.path.join(self.tmp_dir, "dataset")
+        manifest = asyncio.run(assemble_training_dataset(dataset_dir, chunk_size=4))
+
+        self.assertEqual(manifest["n_rows"], 10)
+        self.assertEqual(manifest["n_positive"], 5)
+        self.assertEqual(len(manifest["shards"]), 3)
+        self.assertEqual(manifest["feature_names"], FEATURE_NAMES)
+        self.assertEqual(load_manifest(dataset_dir)["watermark"], "2024-01-02T09:00:00")
+
+        shards = list(iter_shards(dataset_dir))
+        self.assertIsInstance(shards[0][0], np.memmap)
+        X = np.concatenate([X for X, _, _ in shards])
+        y = np.concatenate([y for _, y, _ in shards])
+        self.assertEqual(y.tolist(), [1, 0] * 5)
+        col = FEATURE_NAMES.index
+        self.assertEqual(X[0, col("profile_num_skills")], 2.0)
+        self.assertEqual(X[0, col("profile_experience_level")], 3.0)
+        self.assertEqual(X[3, col("bid_temp_budget")], 103.0)
+        self.assertEqual(X[3, col("bid_temp_hour")], 3.0)
+
+    def test_since_only_picks_new_outcomes(self):
+        dataset_dir = os.path.join(self.tmp_dir, "delta")
+        manifest = asyncio.run(assemble_training_dataset(dataset_dir, since=datetime(2024, 1, 2, 7)))
+        self.assertEqual(manifest["n_rows"], 2)
+
+    def test_trainer_reads_memory_mapped_shards(self):
+        dataset_dir = os.path.join(self.tmp_dir, "dataset")
+        model_path = os.path.join(self.tmp_dir, "model.joblib")
+        asyncio.run(assemble_training_dataset(dataset_dir, chunk_size=4))
+
+        result = train_from_dataset(dataset_dir, model_path, num_boost_round=3)
+
+        self.assertTrue(os.path.isfile(model_path))
+        self.assertEqual(result["rows"], 8)  # newest 20% of labels held out
+        self.assertEqual(result["num_boost_round"], 3)
+        self.assertIn("logloss", result["holdout"])
+        self.assertEqual(result["evaluation"]["n_eval_rows"], 2)
+        self.assertIsNotNone(result["evaluation"]["latency_p95_ms"])
+
+    def test_incremental_run_continues_previous_model(self):
+        with self._paths():
+            first = run_training("incremental")  # no checkpoint yet -> full
+            self.assertEqual(first["mode"], "full")
+            self.assertEqual(first["watermark"], "2024-01-02T07:00:00")
+
+            self.assertEqual(run_training("incremental")["mode"], "incremental")  # held-out rows
+
+            asyncio.run(self._add_late_outcomes())
+            second = run_training("incremental")
+            self.assertEqual(second["mode"], "incremental")
+            self.assertEqual(second["num_boost_round"], 5 + 2 + 2)
+
+            checkpoint = load_checkpoint()
+            self.assertEqual(checkpoint["incremental_runs"], 2)
+            self.assertEqual(checkpoint["model_version"], second["model_version"])
+
+            metrics = asyncio.run(self._metrics(second["model_version"]))
+            self.assertEqual(metrics.training_mode, "incremental")
+            self.assertEqual(metrics.n_train_rows, second["rows"])
+
+            self.assertEqual(run_training("incremental")["mode"], "incremental")  # newest label still held out
+
+    def test_schema_change_falls_back_to_full_retrain(self):
+        with self._paths():
+            run_training("full")
+            path = checkpoint_path(settings.MODEL_PATH)
+            checkpoint = json.loads(path.read_text())
+            checkpoint["schema_hash"] = "stale"
+            path.write_text(json.dumps(checkpoint))
+
+            result = run_training("incremental")
+
+            self.assertEqual(result["mode"], "full")
+            self.assertEqual(result["num_boost_round"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from app.config import settings
+from app.ml import training_runner
+
+
+class TestTrainingRunLock(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.lock_file = os.path.join(self.tmp_dir, "training.lock")
+        self.status_file = os.path.join(self.tmp_dir, "training_status.json")
+        patcher = patch.multiple(settings, TRAINING_LOCK_FILE=self.lock_file, TRAINING_STATUS_FILE=self.status_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp_dir, True)
+
+    def test_a_run_held_by_another_worker_blocks_this_one(self):
+        with open(self.lock_file, "a") as other_worker:
+            fcntl.flock(other_worker, fcntl.LOCK_EX)
+            self.assertTrue(training_runner.is_training_running())
+            with patch.object(training_runner, "_run_child") as run_child:
+                with self.assertRaises(training_runner.TrainingAlreadyRunning):
+                    training_runner.run_training_subprocess("full")
+            run_child.assert_not_called()
+            self.assertFalse(training_runner.start_training_in_background("full"))
+            fcntl.flock(other_worker, fcntl.LOCK_UN)
+
+        self.assertFalse(training_runner.is_training_running())
+        with patch.object(training_runner, "_run_child", return_value={"mode": "full"}):
+            self.assertEqual(training_runner.run_training_subprocess("full"), {"mode": "full"})
+        self.assertFalse(training_runner.is_training_running())
+
+    def test_status_is_shared_through_the_status_file(self):
+        with patch.dict(training_runner.TRAINING_STATUS, clear=True):
+            training_runner._update_status(state="succeeded", model_version="v7")
+        self.assertEqual(training_runner.get_training_status()["model_version"], "v7")
+
+        # A worker died mid-run: nobody holds the lock any more
+        with open(self.status_file, "w") as f:
+            json.dump({"state": "running", "mode": "full"}, f)
+        self.assertEqual(training_runner.get_training_status()["state"], "interrupted")
+
+
+if __name__ == "__main__":
+    unittest.main()